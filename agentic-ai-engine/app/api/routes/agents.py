@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.agent_schemas import RunAgentsRequest, RunAgentsResponse
 
 router = APIRouter(prefix="/agents", tags=["agents"])
@@ -7,12 +11,71 @@ def get_orchestrator():
     from app.main import orchestrator
     return orchestrator
 
-@router.post("/run", response_model=RunAgentsResponse)
-async def run_agents(request: RunAgentsRequest):
+def require_llm_capacity():
+    """Rejects new agent work up front while the LLM admission queue is full."""
+    from app.main import llm
+    if llm.limiter.saturated():
+        raise HTTPException(
+            status_code=429,
+            detail="LLM capacity exhausted, retry later.",
+            headers={"Retry-After": "5"},
+        )
+
+def ndjson(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+async def stream_run(orch, request: RunAgentsRequest):
+    """
+    NDJSON lines for one run: a "step" record per agent as soon as it
+    finishes, then a "summary" record with the rest of RunAgentsResponse
+    (or an "error" record if the run itself failed).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    run = asyncio.create_task(orch.run(
+        goal=request.goal,
+        constraints=request.constraints,
+        context=request.context,
+        preferred_agents=request.preferred_agents,
+        timeout_s=request.timeout_s,
+        agent_timeouts=request.agent_timeouts,
+        emit=queue.put,
+    ))
+    run.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while (event := await queue.get()) is not None:
+            if event["type"] == "agent_step":
+                yield ndjson({"type": "step", "trace_id": event["trace_id"], **event["step"]})
+
+        try:
+            result = run.result()
+        except Exception as e:
+            yield ndjson({"type": "error", "error": f"{type(e).__name__}: {e}"})
+            return
+        yield ndjson({"type": "summary", **result.model_dump(mode="json", exclude={"steps"})})
+    finally:
+        run.cancel()
+
+
+@router.post("/run", response_model=RunAgentsResponse, dependencies=[Depends(require_llm_capacity)])
+async def run_agents(request: RunAgentsRequest, http_request: Request, stream: bool = False):
+    """
+    Runs the agents and answers with the whole RunAgentsResponse, or, with
+    ?stream=true or Accept: application/x-ndjson, streams it as NDJSON.
+    """
     orch = get_orchestrator()
+    if stream or "application/x-ndjson" in http_request.headers.get("accept", ""):
+        return StreamingResponse(
+            stream_run(orch, request),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache"},
+        )
     return await orch.run(
         goal=request.goal,
         constraints=request.constraints,
         context=request.context,
-        preferred_agents=request.preferred_agents
+        preferred_agents=request.preferred_agents,
+        timeout_s=request.timeout_s,
+        agent_timeouts=request.agent_timeouts,
     )
@@ -1,4 +1,7 @@
+import json
 import os
+from typing import Dict, List
+
 from pydantic import BaseModel
 
 class Settings(BaseModel):
@@ -9,6 +12,109 @@ class Settings(BaseModel):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-5")
 
+    # Shared keep-alive pool used by every async LLM call in a worker
+    LLM_POOL_SIZE: int = int(os.getenv("LLM_POOL_SIZE", "20"))
+    LLM_KEEPALIVE_S: float = float(os.getenv("LLM_KEEPALIVE_S", "30"))
+    LLM_TIMEOUT_S: float = float(os.getenv("LLM_TIMEOUT_S", "110"))
+
+    # Deadline for one agent inside Orchestrator.run; AGENT_TIMEOUTS overrides
+    # it per agent (e.g. "smart_program=110,economy=45"), a request can lower
+    # it further. Keep it under gunicorn's --timeout so partial results return.
+    AGENT_TIMEOUT_S: float = float(os.getenv("AGENT_TIMEOUT_S", "100"))
+    AGENT_TIMEOUTS: Dict[str, float] = {
+        k.strip(): float(v) for k, v in (
+            item.split("=", 1) for item in os.getenv("AGENT_TIMEOUTS", "").split(",") if "=" in item
+        )
+    }
+
+    # Per-model admission control: concurrent upstream calls per model
+    # (LLM_MODEL_CONCURRENCY overrides, e.g. "gpt-5=4,gpt-5-mini=16"),
+    # and how many calls may wait before new work is shed with a 429
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_MODEL_CONCURRENCY: Dict[str, int] = {
+        k.strip(): int(v) for k, v in (
+            item.split("=", 1) for item in os.getenv("LLM_MODEL_CONCURRENCY", "").split(",") if "=" in item
+        )
+    }
+    LLM_QUEUE_MAX: int = int(os.getenv("LLM_QUEUE_MAX", "32"))
+    LLM_QUEUE_MAX_WAIT_S: float = float(os.getenv("LLM_QUEUE_MAX_WAIT_S", "30"))
+
+    # AgentRouter launches agents whose keyword score (0..1) reaches this
+    ROUTER_THRESHOLD: float = float(os.getenv("ROUTER_THRESHOLD", "0.5"))
+
+    # Prompt size cap in tokens (system + schema + training data + goal);
+    # LLM_PROMPT_BUDGETS overrides it per model, e.g. "gpt-5-mini=12000"
+    LLM_PROMPT_BUDGET: int = int(os.getenv("LLM_PROMPT_BUDGET", "16000"))
+    LLM_PROMPT_BUDGETS: Dict[str, int] = {
+        k.strip(): int(v) for k, v in (
+            item.split("=", 1) for item in os.getenv("LLM_PROMPT_BUDGETS", "").split(",") if "=" in item
+        )
+    }
+
+    # Model cascade: agents try their cheap tier first and escalate only when
+    # the output fails validation. LLM_CASCADES overrides an agent's tiers,
+    # e.g. '{"economy": ["gpt-5-mini:low", "gpt-5:high"]}'
+    LLM_CASCADE_ENABLED: bool = os.getenv("LLM_CASCADE_ENABLED", "true").lower() == "true"
+    LLM_CASCADES: Dict[str, List[str]] = json.loads(os.getenv("LLM_CASCADES", "{}") or "{}")
+    # Assumed latency of an agent's top tier until it has been observed,
+    # for cascade.<agent>.latency_saved_s when the cheap tier is kept
+    LLM_TOP_TIER_LATENCY_S: float = float(os.getenv("LLM_TOP_TIER_LATENCY_S", "20"))
+
+    # Targeted repair of invalid agent JSON: the payload and the validator
+    # error go to a low-effort model, at most LLM_REPAIR_ATTEMPTS times
+    LLM_REPAIR_ATTEMPTS: int = int(os.getenv("LLM_REPAIR_ATTEMPTS", "2"))
+    LLM_REPAIR_MODEL: str = os.getenv("LLM_REPAIR_MODEL", "gpt-5-mini")
+    LLM_REPAIR_EFFORT: str = os.getenv("LLM_REPAIR_EFFORT", "low")
+
+    # LLM response cache: in-memory LRU per worker + SQLite shared by workers
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+    LLM_CACHE_MEMORY_ENTRIES: int = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_TTL_S: float = float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+    LLM_CACHE_DISABLED_AGENTS: List[str] = [
+        a.strip() for a in os.getenv("LLM_CACHE_DISABLED_AGENTS", "").split(",") if a.strip()
+    ]
+
+    # Training corpus is held in memory; changed files are re-read at most
+    # this often (0 disables the check)
+    TRAINING_CORPUS_CHECK_S: float = float(os.getenv("TRAINING_CORPUS_CHECK_S", "30"))
+    # Output of `python -m app.services.training_compact`; used when present
+    TRAINING_COMPACT_PATH: str = os.getenv("TRAINING_COMPACT_PATH", ".cache/training_compact.json")
+
+    # BM25 chunk index over the corpus, persisted between restarts; agents
+    # get at most TRAINING_TOP_K chunks within TRAINING_BUDGET_TOKENS
+    TRAINING_INDEX_PATH: str = os.getenv("TRAINING_INDEX_PATH", ".cache/training_index.json")
+    TRAINING_CHUNK_CHARS: int = int(os.getenv("TRAINING_CHUNK_CHARS", "1500"))
+    TRAINING_TOP_K: int = int(os.getenv("TRAINING_TOP_K", "8"))
+    TRAINING_BUDGET_TOKENS: int = int(os.getenv("TRAINING_BUDGET_TOKENS", "5000"))
+
+    # POST /agents/jobs: runs go to JOB_WORKERS background tasks per worker
+    # process (at most JOB_QUEUE_MAX waiting) and are kept in SQLite for
+    # JOB_TTL_S. Agents in a job get JOB_AGENT_TIMEOUT_S instead of
+    # AGENT_TIMEOUT_S, since no HTTP request is held open.
+    JOBS_PATH: str = os.getenv("JOBS_PATH", ".cache/jobs.sqlite3")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_QUEUE_MAX: int = int(os.getenv("JOB_QUEUE_MAX", "50"))
+    JOB_TTL_S: float = float(os.getenv("JOB_TTL_S", "604800"))
+    JOB_AGENT_TIMEOUT_S: float = float(os.getenv("JOB_AGENT_TIMEOUT_S", "600"))
+    # GET /agents/jobs/{id}/events checks for progress made by other
+    # workers this often
+    JOB_POLL_S: float = float(os.getenv("JOB_POLL_S", "0.5"))
+
+    # /agents/stream batches agent_delta frames per agent at this interval
+    SSE_DELTA_FLUSH_MS: float = float(os.getenv("SSE_DELTA_FLUSH_MS", "100"))
+    # Each streamed run keeps its last SSE_BUFFER_EVENTS events; a client
+    # reconnecting with Last-Event-ID within SSE_RESUME_GRACE_S resumes the
+    # run, which is cancelled once nobody has been attached for that long
+    SSE_BUFFER_EVENTS: int = int(os.getenv("SSE_BUFFER_EVENTS", "5000"))
+    SSE_RESUME_GRACE_S: float = float(os.getenv("SSE_RESUME_GRACE_S", "60"))
+
+    # Event-loop lag monitor (reported on /debug/loop)
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL_S: float = float(os.getenv("LOOP_MONITOR_INTERVAL_S", "0.1"))
+    LOOP_STALL_THRESHOLD_S: float = float(os.getenv("LOOP_STALL_THRESHOLD_S", "0.1"))
+
     GITHUB_CLIENT_ID: str = os.getenv("GITHUB_CLIENT_ID", "")
     GITHUB_CLIENT_SECRET: str = os.getenv("GITHUB_CLIENT_SECRET", "")
 
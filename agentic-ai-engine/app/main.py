@@ -1,12 +1,21 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import gc
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api import api_router
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
 from app.services.llm_client import LLMClient
+from app.services.llm_limiter import LLMOverloaded
 from app.services.router import AgentRouter
+from app.services.jobs import JobManager, JobStore
+from app.services.live_runs import live_runs
 from app.services.orchestrator import Orchestrator
 from app.services.agents import (
     SmartProgramAgent,
@@ -16,7 +25,19 @@ from app.services.agents import (
     IndexerAgent,
 )
 
-app = FastAPI(title="Agentic AI Engine")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    await jobs.start()
+    yield
+    await jobs.stop()
+    await loop_monitor.stop()
+    await llm.aclose()
+
+
+app = FastAPI(title="Agentic AI Engine", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +48,15 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after_s))},
+    )
+
+
 llm = LLMClient()
 router = AgentRouter()
 
@@ -40,8 +70,21 @@ agents = {
 
 orchestrator = Orchestrator(agents, router)
 
+jobs = JobManager(
+    orchestrator,
+    JobStore(settings.JOBS_PATH, settings.JOB_TTL_S),
+    workers=settings.JOB_WORKERS,
+    queue_max=settings.JOB_QUEUE_MAX,
+    hub=live_runs,
+)
+
 app.include_router(api_router)
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+# Everything imported so far (the training corpus included) lives for the
+# whole process; freezing it keeps the GC from touching those pages, so
+# workers forked by `gunicorn --preload` keep sharing them.
+gc.freeze()
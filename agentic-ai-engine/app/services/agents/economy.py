@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import re
 from typing import Any, Dict, Optional, Tuple, List
 
-from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse, ModelTier
+from app.services.prompt_budget import PromptPart
+from app.utils.normalize import as_int, as_number, rescale_percents, uint_string
+
+# Percent totals this close to 100 are rescaled locally instead of rejected.
+_PERCENT_RESCALE_TOLERANCE = 2.0
 
 
 def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
@@ -39,6 +43,87 @@ def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _normalize_tokenomics(payload: Dict[str, Any]) -> List[str]:
+    """
+    Deterministic fixups for near-valid tokenomics, applied in place:
+    numeric strings become numbers, total_supply becomes a plain digit
+    string, and percents that sum to within the tolerance of 100 are
+    rescaled.
+    """
+    fixups: List[str] = []
+    t = payload.get("tokenomics")
+    if not isinstance(t, dict):
+        return fixups
+
+    if isinstance(t.get("decimals"), (str, float)) and as_int(t["decimals"]) is not None:
+        fixups.append(f"tokenomics.decimals {t['decimals']!r} -> {as_int(t['decimals'])}")
+        t["decimals"] = as_int(t["decimals"])
+
+    supply = t.get("total_supply")
+    if supply is not None and uint_string(supply) is not None and supply != uint_string(supply):
+        fixups.append(f"tokenomics.total_supply {supply!r} -> {uint_string(supply)!r}")
+        t["total_supply"] = uint_string(supply)
+
+    dist = t.get("distribution")
+    if not isinstance(dist, list):
+        return fixups
+
+    for i, row in enumerate(dist):
+        if not isinstance(row, dict):
+            continue
+        if isinstance(row.get("percent"), str) and as_number(row["percent"]) is not None:
+            fixups.append(f"distribution[{i}].percent {row['percent']!r} -> {as_number(row['percent'])}")
+            row["percent"] = as_number(row["percent"])
+        vest = row.get("vesting")
+        if isinstance(vest, dict):
+            for vk in ("cliff_months", "duration_months"):
+                if isinstance(vest.get(vk), (str, float)) and as_int(vest[vk]) is not None:
+                    fixups.append(f"distribution[{i}].vesting.{vk} {vest[vk]!r} -> {as_int(vest[vk])}")
+                    vest[vk] = as_int(vest[vk])
+
+    percents = [row.get("percent") if isinstance(row, dict) else None for row in dist]
+    if all(isinstance(p, (int, float)) and not isinstance(p, bool) and p > 0 for p in percents) and percents:
+        total = sum(percents)
+        if 0.01 < abs(total - 100.0) <= _PERCENT_RESCALE_TOLERANCE:
+            for row, p in zip(dist, rescale_percents(percents)):
+                row["percent"] = p
+            fixups.append(f"distribution percents rescaled from {round(total, 4)} to 100")
+
+    return fixups
+
+
+def _validate_distribution_row(i: int, row: Any) -> Tuple[bool, str]:
+    if not isinstance(row, dict):
+        return False, f"distribution[{i}] must be object."
+    for k in ["category", "percent", "rationale", "vesting"]:
+        if k not in row:
+            return False, f"distribution[{i}] missing '{k}'."
+
+    if not isinstance(row["category"], str) or not row["category"].strip():
+        return False, f"distribution[{i}].category must be non-empty string."
+    if not isinstance(row["percent"], (int, float)):
+        return False, f"distribution[{i}].percent must be number."
+    if row["percent"] <= 0:
+        return False, f"distribution[{i}].percent must be > 0."
+    if not isinstance(row["rationale"], str) or not row["rationale"].strip():
+        return False, f"distribution[{i}].rationale must be non-empty string."
+
+    vest = row["vesting"]
+    if not isinstance(vest, dict):
+        return False, f"distribution[{i}].vesting must be object."
+    for vk in ["type", "cliff_months", "duration_months"]:
+        if vk not in vest:
+            return False, f"distribution[{i}].vesting missing '{vk}'."
+    if not isinstance(vest["type"], str) or not vest["type"].strip():
+        return False, f"distribution[{i}].vesting.type must be string."
+    if not isinstance(vest["cliff_months"], int) or vest["cliff_months"] < 0:
+        return False, f"distribution[{i}].vesting.cliff_months must be int >= 0."
+    if not isinstance(vest["duration_months"], int) or vest["duration_months"] < 0:
+        return False, f"distribution[{i}].vesting.duration_months must be int >= 0."
+
+    return True, "ok"
+
+
 def _validate_tokenomics(payload: Dict[str, Any]) -> Tuple[bool, str]:
     """
     Strict tokenomics schema validation.
@@ -87,34 +172,9 @@ def _validate_tokenomics(payload: Dict[str, Any]) -> Tuple[bool, str]:
 
     total = 0
     for i, row in enumerate(dist):
-        if not isinstance(row, dict):
-            return False, f"distribution[{i}] must be object."
-        for k in ["category", "percent", "rationale", "vesting"]:
-            if k not in row:
-                return False, f"distribution[{i}] missing '{k}'."
-
-        if not isinstance(row["category"], str) or not row["category"].strip():
-            return False, f"distribution[{i}].category must be non-empty string."
-        if not isinstance(row["percent"], (int, float)):
-            return False, f"distribution[{i}].percent must be number."
-        if row["percent"] <= 0:
-            return False, f"distribution[{i}].percent must be > 0."
-        if not isinstance(row["rationale"], str) or not row["rationale"].strip():
-            return False, f"distribution[{i}].rationale must be non-empty string."
-
-        vest = row["vesting"]
-        if not isinstance(vest, dict):
-            return False, f"distribution[{i}].vesting must be object."
-        for vk in ["type", "cliff_months", "duration_months"]:
-            if vk not in vest:
-                return False, f"distribution[{i}].vesting missing '{vk}'."
-        if not isinstance(vest["type"], str) or not vest["type"].strip():
-            return False, f"distribution[{i}].vesting.type must be string."
-        if not isinstance(vest["cliff_months"], int) or vest["cliff_months"] < 0:
-            return False, f"distribution[{i}].vesting.cliff_months must be int >= 0."
-        if not isinstance(vest["duration_months"], int) or vest["duration_months"] < 0:
-            return False, f"distribution[{i}].vesting.duration_months must be int >= 0."
-
+        ok, reason = _validate_distribution_row(i, row)
+        if not ok:
+            return False, reason
         total += float(row["percent"])
 
     if abs(total - 100.0) > 0.01:
@@ -134,6 +194,11 @@ def _validate_tokenomics(payload: Dict[str, Any]) -> Tuple[bool, str]:
 
 class EconomyAgent(BaseAgent):
     name = "economy"
+    partial_paths = ("tokenomics.distribution.*",)
+    model_tiers = (ModelTier("gpt-5-mini", "low"), ModelTier("gpt-5", "high"))
+
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        return _validate_distribution_row(path[-1], value)
 
     async def run(self, req: AgentRequest) -> AgentResponse:
         system_prompt = (
@@ -144,34 +209,31 @@ class EconomyAgent(BaseAgent):
             "Explain the rationale per category."
         )
 
-        user_prompt = f"""
-USER PROMPT:
-{req.goal}
-
+        schema = """
 Return STRICT JSON ONLY with this exact schema:
 
-{{
-  "tokenomics": {{
+{
+  "tokenomics": {
     "name": "Token name",
     "symbol": "SYMBOL",
     "total_supply": "1000000000",
     "decimals": 18,
     "distribution": [
-      {{
+      {
         "category": "Community & Incentives",
         "percent": 40,
         "rationale": "1-2 sentences explaining why this percent fits the use case.",
-        "vesting": {{
+        "vesting": {
           "type": "none|linear|cliff+linear",
           "cliff_months": 0,
           "duration_months": 0
-        }}
-      }}
+        }
+      }
     ],
     "assumptions": ["Short bullet assumptions derived from the user prompt."],
     "notes": "Any important caveats or suggestions."
-  }}
-}}
+  }
+}
 
 Rules:
 - Output must be VALID JSON (double quotes).
@@ -181,32 +243,44 @@ Rules:
 - Do not add any keys outside the schema.
 """.strip()
 
-        raw = await asyncio.to_thread(
-            self.llm.chat,
-            model="gpt-5",
+        packed = self.pack_prompt(
+            PromptPart("system", system_prompt, required=True),
+            PromptPart("schema", schema, required=True),
+            PromptPart("goal", req.goal),
+        )
+        user_prompt = f"USER PROMPT:\n{packed['goal']}\n\n{schema}"
+
+        gen = await self.generate(
+            req,
             system=system_prompt,
             user=user_prompt,
-            reasoning_effort="high",
+            parse=_extract_json_object,
+            validate=_validate_tokenomics,
+            normalize=_normalize_tokenomics,
+            prompt_tokens=packed.total,
+            schema=schema,
         )
+        raw = gen.text
+        payload = gen.payload
 
-        payload = _extract_json_object(raw)
         if payload is None:
             return AgentResponse(
                 agent=self.name,
                 summary="Agent returned non-JSON output (cannot parse tokenomics).",
-                result={"ok": False, "raw": raw},
+                result={"ok": False, **gen.meta, "raw": raw},
             )
 
-        ok, reason = _validate_tokenomics(payload)
-        if not ok:
+        if not gen.ok:
+            reason = gen.reason
+
             return AgentResponse(
                 agent=self.name,
                 summary=f"Invalid tokenomics JSON: {reason}",
-                result={"ok": False, "reason": reason, "payload": payload, "raw": raw},
+                result={"ok": False, **gen.meta, "reason": reason, "payload": payload, "raw": raw},
             )
 
         return AgentResponse(
             agent=self.name,
             summary="Generated tokenomics JSON (distribution + rationale) for gateway/use-case.",
-            result={"ok": True, **payload},
+            result={"ok": True, **gen.meta, **payload},
         )
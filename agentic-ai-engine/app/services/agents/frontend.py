@@ -1,17 +1,26 @@
 from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.services.prompt_budget import PromptPart
 
 class FrontendAgent(BaseAgent):
     name = "frontend"
 
     async def run(self, req: AgentRequest) -> AgentResponse:
-        output = self.llm.chat(
+        system = "You are a frontend React and UX expert."
+        packed = self.pack_prompt(
+            PromptPart("system", system, required=True),
+            PromptPart("goal", req.goal),
             model="gpt-5.1",
-            system="You are a frontend React and UX expert.",
-            user=req.goal
+        )
+
+        res = await self.complete(
+            req,
+            model="gpt-5.1",
+            system=system,
+            user=packed["goal"]
         )
 
         return AgentResponse(
             agent=self.name,
             summary="Frontend UI design",
-            result={"ui_design": output}
+            result={"ui_design": res.text, "cached": res.cached, "prompt_tokens": packed.total}
         )
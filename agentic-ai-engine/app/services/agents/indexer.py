@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse, ModelTier
+from app.services.prompt_budget import PromptPart
+from app.utils.normalize import as_number
 
 
 def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
@@ -39,6 +40,48 @@ def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _normalize_risk_payload(payload: Dict[str, Any]) -> List[str]:
+    """
+    Deterministic fixups applied in place: numeric strings for scores
+    become numbers, and risk_level is lower-cased.
+    """
+    fixups: List[str] = []
+    r = payload.get("risk_analysis")
+    if not isinstance(r, dict):
+        return fixups
+
+    score = r.get("overall_risk_score")
+    if isinstance(score, str) and as_number(score) is not None:
+        fixups.append(f"overall_risk_score {score!r} -> {as_number(score)}")
+        r["overall_risk_score"] = as_number(score)
+
+    level = r.get("risk_level")
+    if isinstance(level, str) and level != level.strip().lower() and level.strip().lower() in {"low", "medium", "high"}:
+        fixups.append(f"risk_level {level!r} -> {level.strip().lower()!r}")
+        r["risk_level"] = level.strip().lower()
+
+    dims = r.get("dimensions")
+    if isinstance(dims, dict):
+        for k, v in dims.items():
+            if isinstance(v, str) and as_number(v) is not None:
+                fixups.append(f"dimensions.{k} {v!r} -> {as_number(v)}")
+                dims[k] = as_number(v)
+
+    return fixups
+
+
+def _validate_trend(t: Any) -> Tuple[bool, str]:
+    if not all(k in t for k in ("name", "unit", "series")):
+        return False, "Each trend must have name, unit, series."
+    if not isinstance(t["series"], list) or not t["series"]:
+        return False, "trend.series must be non-empty array."
+    for p in t["series"]:
+        if not all(k in p for k in ("t", "v")):
+            return False, "Each series point must have t, v."
+
+    return True, "ok"
+
+
 def _validate_risk_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     if "risk_analysis" not in payload or not isinstance(payload["risk_analysis"], dict):
         return False, "Missing 'risk_analysis' object."
@@ -78,13 +121,9 @@ def _validate_risk_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
         return False, "trend_indicators must be non-empty array."
 
     for t in trends:
-        if not all(k in t for k in ("name", "unit", "series")):
-            return False, "Each trend must have name, unit, series."
-        if not isinstance(t["series"], list) or not t["series"]:
-            return False, "trend.series must be non-empty array."
-        for p in t["series"]:
-            if not all(k in p for k in ("t", "v")):
-                return False, "Each series point must have t, v."
+        ok, reason = _validate_trend(t)
+        if not ok:
+            return False, reason
 
     if not isinstance(r["key_risks"], list):
         return False, "key_risks must be array."
@@ -109,6 +148,13 @@ class IndexerAgent(BaseAgent):
     """
 
     name = "indexer"
+    partial_paths = ("risk_analysis.trend_indicators.*",)
+    model_tiers = (ModelTier("gpt-5-mini", "low"), ModelTier("gpt-5.1", "high"))
+
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        if not isinstance(value, dict):
+            return False, "Each trend must be an object."
+        return _validate_trend(value)
 
     async def run(self, req: AgentRequest) -> AgentResponse:
         system_prompt = (
@@ -118,51 +164,48 @@ class IndexerAgent(BaseAgent):
             "All scores must be numeric and suitable for visualization."
         )
 
-        user_prompt = f"""
-USER CONTEXT:
-{req.goal}
-
+        schema = """
 Analyze the risk profile and trends of this use case.
 
 Return STRICT JSON ONLY with this exact schema:
 
-{{
-  "risk_analysis": {{
+{
+  "risk_analysis": {
     "overall_risk_score": 0-100,
     "risk_level": "low|medium|high",
-    "dimensions": {{
+    "dimensions": {
       "market": 0-100,
       "liquidity": 0-100,
       "technical": 0-100,
       "governance": 0-100,
       "regulatory": 0-100
-    }},
+    },
     "trend_indicators": [
-      {{
+      {
         "name": "indicator_name",
         "unit": "index|percent|score",
         "series": [
-          {{ "t": "time_label", "v": number }}
+          { "t": "time_label", "v": number }
         ]
-      }}
+      }
     ],
     "key_risks": [
-      {{
+      {
         "category": "Market|Liquidity|Technical|Governance|Regulatory",
         "severity": "low|medium|high",
         "description": "Concise professional explanation"
-      }}
+      }
     ],
     "mitigations": [
-      {{
+      {
         "risk": "Short risk name",
         "action": "Concrete mitigation suggestion"
-      }}
+      }
     ],
     "assumptions": ["Assumptions used in this analysis"],
     "notes": "Important caveats or interpretation notes"
-  }}
-}}
+  }
+}
 
 Rules:
 - Output MUST be valid JSON (double quotes).
@@ -171,32 +214,44 @@ Rules:
 - Do not add any keys outside the schema.
 """.strip()
 
-        raw = await asyncio.to_thread(
-            self.llm.chat,
-            model="gpt-5.1",
+        packed = self.pack_prompt(
+            PromptPart("system", system_prompt, required=True),
+            PromptPart("schema", schema, required=True),
+            PromptPart("goal", req.goal),
+        )
+        user_prompt = f"USER CONTEXT:\n{packed['goal']}\n\n{schema}"
+
+        gen = await self.generate(
+            req,
             system=system_prompt,
             user=user_prompt,
-            reasoning_effort="high",
+            parse=_extract_json_object,
+            validate=_validate_risk_payload,
+            normalize=_normalize_risk_payload,
+            prompt_tokens=packed.total,
+            schema=schema,
         )
+        raw = gen.text
+        payload = gen.payload
 
-        payload = _extract_json_object(raw)
         if payload is None:
             return AgentResponse(
                 agent=self.name,
                 summary="Agent returned non-JSON output (cannot parse risk analysis).",
-                result={"ok": False, "raw": raw},
+                result={"ok": False, **gen.meta, "raw": raw},
             )
 
-        ok, reason = _validate_risk_payload(payload)
-        if not ok:
+        if not gen.ok:
+            reason = gen.reason
+
             return AgentResponse(
                 agent=self.name,
                 summary=f"Invalid risk analysis JSON: {reason}",
-                result={"ok": False, "reason": reason, "payload": payload, "raw": raw},
+                result={"ok": False, **gen.meta, "reason": reason, "payload": payload, "raw": raw},
             )
 
         return AgentResponse(
             agent=self.name,
             summary="Generated structured risk and trend analysis (chart-ready).",
-            result={"ok": True, **payload},
+            result={"ok": True, **gen.meta, **payload},
         )
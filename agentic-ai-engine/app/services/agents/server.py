@@ -1,18 +1,27 @@
 from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.services.prompt_budget import PromptPart
 from app.utils.utils import load_training_files
 
 class ServerAgent(BaseAgent):
     name = "server"
 
     async def run(self, req: AgentRequest) -> AgentResponse:
-        output = self.llm.chat(
+        system = "You are a backend engineer specialized in APIs."
+        packed = self.pack_prompt(
+            PromptPart("system", system, required=True),
+            PromptPart("goal", req.goal),
             model="gpt-5.1",
-            system="You are a backend engineer specialized in APIs.",
-            user=req.goal
+        )
+
+        res = await self.complete(
+            req,
+            model="gpt-5.1",
+            system=system,
+            user=packed["goal"]
         )
 
         return AgentResponse(
             agent=self.name,
             summary="Backend API design",
-            result={"backend_design": output}
+            result={"backend_design": res.text, "cached": res.cached, "prompt_tokens": packed.total}
         )
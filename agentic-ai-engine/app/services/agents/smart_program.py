@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
-from app.services.training_config import get_training_dir
-from app.utils.utils import load_training_files
+from app.core.config import settings
+from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse, ModelTier
+from app.services.prompt_budget import PromptPart
+from app.services.training_config import get_training_subdir
+from app.services.training_index import format_chunk, training_index
 
 
 def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
@@ -53,6 +54,18 @@ def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _validate_file_entry(path: Any, content: Any) -> Tuple[bool, str]:
+    if not isinstance(path, str) or not isinstance(content, str):
+        return False, "All file paths and contents in 'files' must be strings."
+    # Security: forbid path traversal
+    if ".." in path.replace("\\", "/").split("/"):
+        return False, f"Forbidden path traversal in file path: {path}"
+    if path.startswith("/") or path.startswith("\\"):
+        return False, f"Absolute paths are not allowed: {path}"
+
+    return True, "ok"
+
+
 def _validate_pr_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     """
     Minimal validation for PR payload shape.
@@ -76,27 +89,32 @@ def _validate_pr_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
 
     # Validate file paths are strings and contents are strings
     for k, v in payload["files"].items():
-        if not isinstance(k, str) or not isinstance(v, str):
-            return False, "All file paths and contents in 'files' must be strings."
-        # Security: forbid path traversal
-        if ".." in k.replace("\\", "/").split("/"):
-            return False, f"Forbidden path traversal in file path: {k}"
-        if k.startswith("/") or k.startswith("\\"):
-            return False, f"Absolute paths are not allowed: {k}"
+        ok, reason = _validate_file_entry(k, v)
+        if not ok:
+            return False, reason
 
     return True, "ok"
 
 
 class SmartProgramAgent(BaseAgent):
     name = "smart_program"
+    partial_paths = ("files.*",)
+    model_tiers = (ModelTier("gpt-5-mini", "medium"), ModelTier("gpt-5", "high"))
 
-    async def run(self, req: AgentRequest) -> AgentResponse:
-        training_dir = get_training_dir(self.name)
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        return _validate_file_entry(path[-1], value)
 
-        training_data = (
-            load_training_files(training_dir, max_files=12, max_chars_total=20000)
+    async def run(self, req: AgentRequest) -> AgentResponse:
+        training_dir = get_training_subdir(self.name)
+        chunks = (
+            await training_index.asearch(
+                req.goal,
+                directory=training_dir,
+                k=settings.TRAINING_TOP_K,
+                budget_tokens=settings.TRAINING_BUDGET_TOKENS,
+            )
             if training_dir
-            else "(No training data configured for this agent.)"
+            else []
         )
 
         system_prompt = (
@@ -107,28 +125,22 @@ class SmartProgramAgent(BaseAgent):
         )
 
         # The crucial part: force the model to return a PR payload
-        user_prompt = f"""\
-INTERNAL TRAINING DATA (role-specific, authoritative):
-{training_data}
-
-USER GOAL:
-{req.goal}
-
+        schema = """\
 You must produce a Git-ready change set and PR metadata.
 
 Return STRICT JSON ONLY with this schema:
 
-{{
-  "pr": {{
+{
+  "pr": {
     "title": "short title",
     "body": "markdown description including what/why/how to test",
     "base": "main"
-  }},
-  "files": {{
+  },
+  "files": {
     "path/relative/to/repo/file1.ext": "FULL FILE CONTENTS",
     "path/relative/to/repo/file2.ext": "FULL FILE CONTENTS"
-  }}
-}}
+  }
+}
 
 Rules:
 - Do NOT include markdown fences.
@@ -139,30 +151,52 @@ Rules:
 - Ensure code compiles/runs (best effort) and include "How to test" in PR body.
 """
 
-        # Run sync OpenAI call in a thread so async server stays responsive
-        raw = await asyncio.to_thread(
-            self.llm.chat,
-            model="gpt-5",
+        packed = self.pack_prompt(
+            PromptPart("system", system_prompt, required=True),
+            PromptPart("schema", schema, required=True),
+            PromptPart("goal", req.goal, priority=1),
+            PromptPart("training", chunks=[format_chunk(c) for c in chunks]),
+        )
+        training_data = packed["training"] or (
+            "(No training .txt files found.)" if training_dir else "(No training data configured for this agent.)"
+        )
+
+        user_prompt = f"""\
+INTERNAL TRAINING DATA (role-specific, authoritative):
+{training_data}
+
+USER GOAL:
+{packed["goal"]}
+
+{schema}"""
+
+        gen = await self.generate(
+            req,
             system=system_prompt,
             user=user_prompt,
-            reasoning_effort="high",
+            parse=_extract_json_object,
+            validate=_validate_pr_payload,
+            prompt_tokens=packed.total,
+            schema=schema,
         )
+        raw = gen.text
+        payload = gen.payload
 
-        payload = _extract_json_object(raw)
         if payload is None:
             # Return raw for debugging
             return AgentResponse(
                 agent=self.name,
                 summary="Agent returned non-JSON output (cannot create PR payload).",
-                result={"ok": False, "raw": raw},
+                result={"ok": False, **gen.meta, "raw": raw},
             )
 
-        ok, reason = _validate_pr_payload(payload)
-        if not ok:
+        if not gen.ok:
+            reason = gen.reason
+
             return AgentResponse(
                 agent=self.name,
                 summary=f"Invalid PR payload: {reason}",
-                result={"ok": False, "reason": reason, "payload": payload, "raw": raw},
+                result={"ok": False, **gen.meta, "reason": reason, "payload": payload, "raw": raw},
             )
 
         # ✅ compatible with /pr/create endpoint: {title, body, base, files}
@@ -174,6 +208,7 @@ Rules:
             summary="Generated PR payload (title/body/files) ready for /pr/create.",
             result={
                 "ok": True,
+                **gen.meta,
                 "pr": {
                     "title": pr["title"],
                     "body": pr["body"],
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.agent_schemas import RunAgentsRequest
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """"<trace_id>:<seq>" -> (trace_id, seq); None for anything else."""
+    trace_id, sep, seq = (value or "").strip().rpartition(":")
+    if not sep or not trace_id or not seq.isdigit():
+        return None
+    return trace_id, int(seq)
+
+
+def run_key(request: RunAgentsRequest) -> str:
+    """
+    Identical requests share a key: the goal with case and whitespace
+    normalised, plus everything else in the request.
+    """
+    fields = request.model_dump(mode="json", exclude={"goal"})
+    goal = re.sub(r"\s+", " ", request.goal).strip().lower()
+    raw = json.dumps([goal, fields], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def step_event(step: Dict[str, Any]) -> Dict[str, Any]:
+    """agent_done / agent_error, the shape SSE clients already consume."""
+    if step["status"] == "ok":
+        return {
+            "type": "agent_done",
+            "agent": step["agent"],
+            "summary": step["summary"],
+            "result": step["result"],
+            "duration_s": step["duration_s"],
+        }
+    return {
+        "type": "agent_error",
+        "agent": step["agent"],
+        "status": step["status"],
+        "error": step["error"],
+        "duration_s": step["duration_s"],
+    }
+
+
+class LiveRun:
+    """
+    The events of one run, numbered from 1 and kept in a ring buffer of
+    the last `buffer_size`. Any number of subscribers read it at once;
+    each gets the backlog it hasn't seen and then the live events, so a
+    client that reconnects with Last-Event-ID picks up where it left off
+    and a second tab joins a run already in progress.
+
+    The run's task keeps going while nobody is attached; if no one
+    attaches for `grace_s` it is cancelled (or, once finished, dropped).
+    A pinned run (e.g. one a background job is waiting on) is never
+    cancelled for lack of subscribers.
+    """
+
+    def __init__(self, trace_id: str, buffer_size: int, grace_s: float, registry: "LiveRuns", key: Optional[str] = None):
+        self.trace_id = trace_id
+        self.key = key
+        self.grace_s = grace_s
+        self.task: Optional[asyncio.Task] = None
+        self.done = False
+        self.subscribers = 0
+        self._pins = 0
+        self._registry = registry
+        self._events: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=max(1, buffer_size))
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._grace: Optional[asyncio.TimerHandle] = None
+        # Nobody is attached until the first response starts streaming.
+        self._arm_grace()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._seq += 1
+        self._events.append((self._seq, event))
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    @property
+    def pinned(self) -> bool:
+        return self._pins > 0
+
+    def pin(self) -> None:
+        self._pins += 1
+        self._cancel_grace()
+
+    def unpin(self) -> None:
+        self._pins = max(0, self._pins - 1)
+        if self._pins == 0 and self.subscribers == 0:
+            self._arm_grace()
+
+    def close(self) -> None:
+        """No more events; the buffer stays readable for the grace period."""
+        self.done = True
+        self._wakeup.set()
+        # New identical requests start their own run from here on.
+        self._registry.release_key(self)
+        if self.subscribers == 0 and not self.pinned:
+            self._arm_grace()
+
+    async def events(self, after: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """(seq, event) for every event after `after`, live until the run closes."""
+        self.subscribers += 1
+        self._cancel_grace()
+        metrics.incr("sse.subscribers")
+        try:
+            while True:
+                wakeup = self._wakeup
+                oldest = self._events[0][0] if self._events else self._seq + 1
+                if after < oldest - 1:
+                    # Evicted from the ring buffer before this client came back.
+                    metrics.incr("sse.resume_gaps")
+                    yield after, {"type": "resume_gap", "trace_id": self.trace_id, "missed": oldest - 1 - after}
+                    after = oldest - 1
+
+                for seq, event in list(self._events):
+                    if seq > after:
+                        after = seq
+                        yield seq, event
+
+                if self.done and after >= self._seq:
+                    return
+                await wakeup.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.pinned:
+                self._arm_grace()
+
+    def _arm_grace(self) -> None:
+        self._cancel_grace()
+        self._grace = asyncio.get_running_loop().call_later(self.grace_s, self._expire)
+
+    def _cancel_grace(self) -> None:
+        if self._grace is not None:
+            self._grace.cancel()
+            self._grace = None
+
+    def _expire(self) -> None:
+        self._grace = None
+        if self.subscribers or self.pinned:
+            return
+        if not self.done and self.task is not None:
+            metrics.incr("sse.abandoned_runs")
+            self.task.cancel()
+        self._registry.discard(self)
+
+
+class LiveRuns:
+    """
+    The runs of this worker that can be subscribed to: by trace_id for as
+    long as they run or can be resumed, and by run_key() while in progress.
+    """
+
+    def __init__(self, buffer_size: int, grace_s: float):
+        self.buffer_size = buffer_size
+        self.grace_s = grace_s
+        self._runs: Dict[str, LiveRun] = {}
+        self._by_key: Dict[str, LiveRun] = {}
+
+    def get(self, trace_id: str) -> Optional[LiveRun]:
+        return self._runs.get(trace_id)
+
+    def by_key(self, key: str) -> Optional[LiveRun]:
+        """The run in progress for an identical request, if any."""
+        return self._by_key.get(key)
+
+    def create(self, trace_id: str, key: Optional[str] = None) -> LiveRun:
+        run = LiveRun(trace_id, self.buffer_size, self.grace_s, self, key)
+        self._runs[trace_id] = run
+        if key is not None:
+            self._by_key[key] = run
+        metrics.gauge("sse.live_runs", len(self._runs))
+        return run
+
+    def release_key(self, run: LiveRun) -> None:
+        if run.key is not None and self._by_key.get(run.key) is run:
+            del self._by_key[run.key]
+
+    def discard(self, run: LiveRun) -> None:
+        self.release_key(run)
+        if self._runs.get(run.trace_id) is run:
+            del self._runs[run.trace_id]
+        metrics.gauge("sse.live_runs", len(self._runs))
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+
+live_runs = LiveRuns(settings.SSE_BUFFER_EVENTS, settings.SSE_RESUME_GRACE_S)
@@ -1,5 +1,56 @@
-from openai import OpenAI
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 from app.core.config import settings
+from app.services.llm_cache import LLMCache, cache_key
+from app.services.llm_limiter import LLMLimiter
+from app.services.singleflight import SingleFlight
+
+
+@dataclass
+class LLMResult:
+    text: str
+    cached: bool = False
+    coalesced: bool = False
+    key: Optional[str] = None
+
+
+class DeltaFeed:
+    """
+    Text deltas of one upstream response. Any number of readers can
+    replay what has arrived so far and then follow the live stream.
+    """
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def push(self, delta: str) -> None:
+        self.chunks.append(delta)
+        self._wake()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def follow(self) -> AsyncIterator[str]:
+        i = 0
+        while True:
+            while i < len(self.chunks):
+                yield self.chunks[i]
+                i += 1
+            if self.closed:
+                return
+            await self._changed.wait()
+
 
 class LLMClient:
     def __init__(self):
@@ -8,14 +59,45 @@ class LLMClient:
 
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
-    def chat(
-        self,
-        *,
+        # One keep-alive connection pool shared by all agents in this worker,
+        # so concurrent calls don't go through the default thread pool.
+        self.aclient = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_POOL_SIZE,
+                    max_keepalive_connections=settings.LLM_POOL_SIZE,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_S,
+                ),
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_S, connect=10.0),
+            ),
+        )
+
+        self.cache = (
+            LLMCache(
+                path=settings.LLM_CACHE_PATH,
+                memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+                disk_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_s=settings.LLM_CACHE_TTL_S,
+            )
+            if settings.LLM_CACHE_ENABLED
+            else None
+        )
+        self.inflight = SingleFlight("llm.singleflight")
+        self.limiter = LLMLimiter(
+            default_limit=settings.LLM_MAX_CONCURRENCY,
+            max_queue=settings.LLM_QUEUE_MAX,
+            max_wait_s=settings.LLM_QUEUE_MAX_WAIT_S,
+            limits=settings.LLM_MODEL_CONCURRENCY,
+        )
+
+    @staticmethod
+    def _request_kwargs(
         model: str,
         system: str,
         user: str,
-        reasoning_effort: str | None = None
-    ) -> str:
+        reasoning_effort: str | None,
+    ) -> dict:
         kwargs = {
             "model": model,
             "instructions": system,
@@ -25,5 +107,105 @@ class LLMClient:
         if reasoning_effort is not None:
             kwargs["reasoning"] = {"effort": reasoning_effort}
 
+        return kwargs
+
+    def chat(
+        self,
+        *,
+        model: str,
+        system: str,
+        user: str,
+        reasoning_effort: str | None = None
+    ) -> str:
+        kwargs = self._request_kwargs(model, system, user, reasoning_effort)
         response = self.client.responses.create(**kwargs)
         return response.output_text
+
+    async def _stream(self, kwargs: dict, feed: DeltaFeed, priority: str) -> str:
+        try:
+            async with self.limiter.slot(kwargs["model"], priority):
+                stream = await self.aclient.responses.create(**kwargs, stream=True)
+                async with stream:
+                    async for event in stream:
+                        if event.type == "response.output_text.delta":
+                            feed.push(event.delta)
+                        elif event.type in ("response.completed", "response.incomplete"):
+                            return event.response.output_text
+                        elif event.type in ("response.failed", "error"):
+                            raise RuntimeError(f"LLM stream failed: {event}")
+                return "".join(feed.chunks)
+        finally:
+            feed.close()
+
+    async def acomplete(
+        self,
+        *,
+        model: str,
+        system: str,
+        user: str,
+        reasoning_effort: str | None = None,
+        cache: bool = True,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        priority: str = "batch",
+    ) -> LLMResult:
+        """
+        Upstream calls are always streamed; `on_delta` (optional) receives
+        the text deltas as they arrive, or the whole text once on a cache hit.
+        `priority` picks the admission lane ("interactive" or "batch");
+        raises LLMOverloaded when the model's queue is saturated.
+        """
+        key = cache_key(model, system, user, reasoning_effort)
+        use_cache = cache and self.cache is not None
+
+        if use_cache:
+            hit = await self.cache.get(key)
+            if hit is not None:
+                if on_delta is not None:
+                    await on_delta(hit)
+                return LLMResult(text=hit, cached=True, key=key)
+
+        async def follow(feed: DeltaFeed) -> None:
+            async for delta in feed.follow():
+                await on_delta(delta)
+
+        # Identical prompts already in flight share one upstream call;
+        # followers replay its deltas from the start.
+        kwargs = self._request_kwargs(model, system, user, reasoning_effort)
+        feed = DeltaFeed()
+        text, coalesced = await self.inflight.do(
+            key,
+            lambda: self._stream(kwargs, feed, priority),
+            state=feed,
+            follow=follow if on_delta is not None else None,
+        )
+
+        if use_cache and not coalesced and text:
+            await self.cache.put(key, text)
+
+        return LLMResult(text=text, cached=False, coalesced=coalesced, key=key if use_cache else None)
+
+    async def achat(
+        self,
+        *,
+        model: str,
+        system: str,
+        user: str,
+        reasoning_effort: str | None = None,
+        cache: bool = True,
+    ) -> str:
+        result = await self.acomplete(
+            model=model,
+            system=system,
+            user=user,
+            reasoning_effort=reasoning_effort,
+            cache=cache,
+        )
+        return result.text
+
+    async def forget(self, result: LLMResult) -> None:
+        """Drops a cached response, e.g. when it failed validation."""
+        if result.key is not None and self.cache is not None:
+            await self.cache.delete(result.key)
+
+    async def aclose(self) -> None:
+        await self.aclient.close()
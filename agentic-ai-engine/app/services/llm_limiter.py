@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List
+
+from app.core.metrics import metrics
+
+# Lower index is served first.
+PRIORITIES = ("interactive", "batch")
+
+
+class LLMOverloaded(Exception):
+    """Raised instead of queueing when a model's admission queue is saturated."""
+
+    def __init__(self, model: str, reason: str, retry_after_s: float = 5.0):
+        super().__init__(f"LLM capacity exhausted for '{model}': {reason}")
+        self.model = model
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class _ModelQueue:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.lanes: List[Deque[asyncio.Future]] = [deque() for _ in PRIORITIES]
+
+    def depth(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+
+class LLMLimiter:
+    """
+    Per-model concurrency limiter with priority lanes.
+
+    Each model gets `limit` concurrent upstream calls. Callers beyond that
+    wait in a FIFO lane per priority; a freed slot goes to the oldest
+    interactive waiter before any batch waiter. A caller is shed with
+    LLMOverloaded when the queue already holds `max_queue` waiters or it
+    has waited `max_wait_s` without getting a slot.
+    """
+
+    def __init__(
+        self,
+        default_limit: int,
+        max_queue: int,
+        max_wait_s: float,
+        limits: Dict[str, int] | None = None,
+    ):
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.limits = dict(limits or {})
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    def _queue(self, model: str) -> _ModelQueue:
+        q = self._queues.get(model)
+        if q is None:
+            q = self._queues[model] = _ModelQueue(max(1, self.limits.get(model, self.default_limit)))
+        return q
+
+    def _publish(self, model: str, q: _ModelQueue) -> None:
+        metrics.gauge(f"llm.limiter.{model}.active", q.active)
+        metrics.gauge(f"llm.limiter.{model}.queued", q.depth())
+
+    def saturated(self) -> bool:
+        """True when any model's queue is full; used to reject work up front."""
+        return any(q.depth() >= self.max_queue for q in self._queues.values())
+
+    def _shed(self, model: str, q: _ModelQueue, reason: str) -> LLMOverloaded:
+        metrics.incr(f"llm.limiter.{model}.shed")
+        self._publish(model, q)
+        return LLMOverloaded(model, reason)
+
+    def _release(self, model: str, q: _ModelQueue) -> None:
+        # Hand the slot straight to the next waiter so nobody can barge in.
+        for lane in q.lanes:
+            if lane:
+                lane.popleft().set_result(None)
+                self._publish(model, q)
+                return
+        q.active -= 1
+        self._publish(model, q)
+
+    async def _acquire(self, model: str, priority: str) -> None:
+        q = self._queue(model)
+        t0 = time.perf_counter()
+
+        if q.active < q.limit and q.depth() == 0:
+            q.active += 1
+        else:
+            if q.depth() >= self.max_queue:
+                raise self._shed(model, q, f"{q.depth()} calls already queued")
+
+            fut = asyncio.get_running_loop().create_future()
+            lane = q.lanes[PRIORITIES.index(priority) if priority in PRIORITIES else len(PRIORITIES) - 1]
+            lane.append(fut)
+            self._publish(model, q)
+
+            try:
+                await asyncio.wait({fut}, timeout=self.max_wait_s)
+            except asyncio.CancelledError:
+                if fut.done():
+                    self._release(model, q)
+                else:
+                    fut.cancel()
+                    lane.remove(fut)
+                    self._publish(model, q)
+                raise
+
+            if not fut.done():
+                fut.cancel()
+                lane.remove(fut)
+                raise self._shed(model, q, f"no slot within {self.max_wait_s:g}s")
+
+        metrics.observe(f"llm.limiter.{model}.wait_s", time.perf_counter() - t0)
+        self._publish(model, q)
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: str = "batch") -> AsyncIterator[None]:
+        await self._acquire(model, priority)
+        try:
+            yield
+        finally:
+            self._release(model, self._queue(model))
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        return {
+            model: {
+                "limit": q.limit,
+                "active": q.active,
+                **{f"queued_{name}": len(lane) for name, lane in zip(PRIORITIES, q.lanes)},
+            }
+            for model, q in self._queues.items()
+        }
@@ -1,12 +1,45 @@
 import asyncio
+import logging
+import time
 import uuid
+from dataclasses import replace
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.services.agent_base import AgentRequest
+from app.services.llm_limiter import LLMOverloaded
 from app.models.agent_schemas import AgentStep, RunAgentsResponse, AgentName
 from app.services.router import AgentRouter
 
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def plan(agents: Dict[AgentName, Any], targets: List[AgentName]) -> Dict[AgentName, List[AgentName]]:
+    """
+    Dependency graph restricted to `targets`: agent -> the targets it
+    waits for (its `depends_on` entries that are being run), in an order
+    where every agent comes after its dependencies.
+    """
+    deps = {
+        name: [d for d in getattr(agents[name], "depends_on", ()) if d in targets and d != name]
+        for name in targets
+    }
+
+    ordered: Dict[AgentName, List[AgentName]] = {}
+    while len(ordered) < len(deps):
+        ready = [name for name in targets if name not in ordered and all(d in ordered for d in deps[name])]
+        if not ready:
+            cycle = sorted(name for name in targets if name not in ordered)
+            raise ValueError(f"Agent dependency cycle among: {cycle}")
+        for name in ready:
+            ordered[name] = deps[name]
+    return ordered
+
+
 class Orchestrator:
     def __init__(self, agents: Dict[AgentName, Any], router: AgentRouter):
         self.agents = agents
@@ -15,42 +48,153 @@ class Orchestrator:
     async def _run_agent(self, agent, req: AgentRequest):
         return await agent.run(req)
 
-    async def run(self, goal, constraints, context, preferred_agents):
-        trace_id = str(uuid.uuid4())
+    @staticmethod
+    def timeout_for(
+        name: AgentName,
+        timeout_s: Optional[float] = None,
+        agent_timeouts: Optional[Dict[str, float]] = None,
+        max_timeout_s: Optional[float] = None,
+    ) -> float:
+        """
+        The agent's deadline: the server setting (or `max_timeout_s` in its
+        place, e.g. for background jobs), lowered by the request's.
+        """
+        limit = max_timeout_s or settings.AGENT_TIMEOUTS.get(name, settings.AGENT_TIMEOUT_S)
+        requested = (agent_timeouts or {}).get(name, timeout_s)
+        return min(limit, requested) if requested else limit
+
+    async def run(
+        self,
+        goal,
+        constraints,
+        context,
+        preferred_agents,
+        timeout_s: Optional[float] = None,
+        agent_timeouts: Optional[Dict[str, float]] = None,
+        emit: Optional[Emit] = None,
+        deltas: bool = False,
+        priority: str = "batch",
+        trace_id: Optional[str] = None,
+        max_timeout_s: Optional[float] = None,
+    ):
+        """
+        Runs the routed agents and returns the whole run. This is the one
+        engine behind /agents/run, its NDJSON mode and /agents/stream.
+
+        With `emit`, progress is also sent as events while the run goes on:
+        "router_update" once routed, "agent_start" when an agent begins and
+        "agent_step" the moment it is ready, in completion order. `deltas`
+        additionally forwards the agents' own agent_delta/agent_partial
+        events. `priority` is the LLM admission lane for every agent.
+        `max_timeout_s` replaces the server's per-agent deadline.
+        """
+        trace_id = trace_id or str(uuid.uuid4())
         started_at = datetime.utcnow()
 
         artifacts: Dict[str, Any] = {}
-        steps: List[AgentStep] = []
 
-        targets = self.router.route(goal, preferred_agents)
+        targets, scores = self.router.decide(goal, preferred_agents)
+        graph = plan(self.agents, targets)
 
         req = AgentRequest(
             trace_id=trace_id,
             goal=goal,
             constraints=constraints,
             context=context,
-            artifacts=artifacts
+            artifacts=artifacts,
+            emit=emit if deltas else None,
+            priority=priority,
         )
 
-        tasks = [
-            self._run_agent(self.agents[name], req)
-            for name in targets
-        ]
+        if emit is not None:
+            await emit({
+                "type": "router_update",
+                "trace_id": trace_id,
+                "message": "Routing completed",
+                "targets": targets,
+                "scores": scores,
+            })
 
-        responses = await asyncio.gather(*tasks)
+        # Every agent starts as soon as the agents it depends on have
+        # finished, and sees only their results in req.artifacts. A dependency
+        # that timed out or failed is simply missing from them.
+        tasks: Dict[AgentName, "asyncio.Task[AgentStep]"] = {}
+        failures: List[BaseException] = []
 
-        for response in responses:
-            steps.append(
-                AgentStep(
-                    agent=response.agent,
-                    summary=response.summary,
-                    result=response.result
+        async def run_node(name: AgentName) -> AgentStep:
+            inputs = graph[name]
+            if inputs:
+                await asyncio.wait([tasks[d] for d in inputs])
+            node_req = replace(req, artifacts={d: artifacts[d] for d in inputs if d in artifacts})
+            timeout = self.timeout_for(name, timeout_s, agent_timeouts, max_timeout_s)
+            if emit is not None:
+                await emit({"type": "agent_start", "trace_id": trace_id, "agent": name})
+
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._run_agent(self.agents[name], node_req), timeout)
+            except asyncio.TimeoutError:
+                duration = round(time.perf_counter() - started, 3)
+                metrics.incr(f"agent.{name}.timeouts")
+                logger.warning("%s: agent %s timed out after %.1fs", trace_id, name, timeout)
+                return AgentStep(
+                    agent=name,
+                    summary=f"Timed out after {timeout:g}s.",
+                    result={},
+                    status="timeout",
+                    duration_s=duration,
+                    error=f"timeout after {timeout:g}s",
                 )
-            )
+            except Exception as e:
+                duration = round(time.perf_counter() - started, 3)
+                failures.append(e)
+                metrics.incr(f"agent.{name}.errors")
+                logger.exception("%s: agent %s failed", trace_id, name)
+                return AgentStep(
+                    agent=name,
+                    summary="Agent failed.",
+                    result={},
+                    status="error",
+                    duration_s=duration,
+                    error=f"{type(e).__name__}: {e}",
+                )
+
+            duration = round(time.perf_counter() - started, 3)
+            metrics.observe(f"agent.{name}.duration_s", duration)
             artifacts[response.agent] = response.result
             req.context.setdefault("agent_summaries", []).append(
                 {response.agent: response.summary}
             )
+            return AgentStep(
+                agent=response.agent,
+                summary=response.summary,
+                result=response.result,
+                duration_s=duration,
+            )
+
+        for name in graph:
+            tasks[name] = asyncio.create_task(run_node(name))
+
+        done: Dict[str, AgentStep] = {}
+        try:
+            for next_step in asyncio.as_completed(list(tasks.values())):
+                step = await next_step
+                done[step.agent] = step
+                if emit is not None:
+                    await emit({
+                        "type": "agent_step",
+                        "trace_id": trace_id,
+                        "step": step.model_dump(mode="json"),
+                    })
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        steps = [done[name] for name in targets]
+
+        # Nothing ran because the LLM queue was full: let the 429 handler answer.
+        if failures and len(failures) == len(steps) and all(isinstance(e, LLMOverloaded) for e in failures):
+            raise failures[0]
 
         finished_at = datetime.utcnow()
 
@@ -59,6 +203,7 @@ class Orchestrator:
             started_at=started_at,
             finished_at=finished_at,
             targets=targets,
+            scores=scores,
             steps=steps,
             artifacts=artifacts,
             context=req.context
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # in requirements.txt; the heuristic below is only a fallback
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+_FALLBACK_ENCODING = "o200k_base"
+
+# Words, digit runs and single punctuation marks: BPE vocabularies split
+# code roughly along these lines.
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\w\s]|\n")
+
+
+# Set once an encoding could not be loaded (tiktoken downloads them on
+# first use): lru_cache doesn't cache exceptions, so without it every
+# count would retry the download and wait out a network timeout.
+_encoding_failed = False
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+
+
+def _estimate(text: str) -> int:
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += math.ceil(len(piece) / 4) if piece[0].isalnum() else 1
+    return tokens
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Tokens `text` costs for `model`: exact with tiktoken installed, else a
+    code-aware estimate (punctuation-heavy Rust/TS costs far more than
+    len/4 suggests).
+    """
+    if not text:
+        return 0
+    global _encoding_failed
+    if tiktoken is not None and not _encoding_failed:
+        try:
+            encoding = _encoding(model or "")
+        except Exception:
+            logger.warning("tiktoken encoding unavailable, estimating token counts", exc_info=True)
+            _encoding_failed = True
+        else:
+            return len(encoding.encode(text, disallowed_special=()))
+    return _estimate(text)
+
+
+def budget_for(model: str) -> int:
+    return settings.LLM_PROMPT_BUDGETS.get(model, settings.LLM_PROMPT_BUDGET)
+
+
+@dataclass
+class PromptPart:
+    """
+    One section of a prompt. `chunks` are optional units (e.g. retrieved
+    training chunks), best first; they are dropped from the end before any
+    `text` is cut. Required parts are never trimmed; among the rest the
+    lowest `priority` goes first.
+    """
+    name: str
+    text: str = ""
+    chunks: Sequence[str] = ()
+    priority: int = 0
+    required: bool = False
+
+
+@dataclass
+class PackedPrompt:
+    parts: Dict[str, str]
+    tokens: Dict[str, int]
+    budget: int
+    trimmed: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return sum(self.tokens.values())
+
+    def __getitem__(self, name: str) -> str:
+        return self.parts[name]
+
+
+_TRIM_MARK = "\n[...trimmed...]"
+
+
+def _cut(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """Longest prefix of `text` (plus a marker) within `max_tokens`."""
+    if max_tokens <= count_tokens(_TRIM_MARK, model):
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid] + _TRIM_MARK, model) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + _TRIM_MARK if lo else ""
+
+
+def pack(parts: Sequence[PromptPart], budget: int, model: Optional[str] = None) -> PackedPrompt:
+    """
+    Fits `parts` into `budget` tokens, trimming optional parts by priority.
+    If the required parts alone exceed the budget they are kept whole and
+    the result is simply over budget.
+    """
+    texts: Dict[str, str] = {}
+    kept: Dict[str, List[str]] = {}
+    tokens: Dict[str, int] = {}
+    chunk_tokens: Dict[str, List[int]] = {}
+
+    for p in parts:
+        texts[p.name] = p.text
+        kept[p.name] = list(p.chunks)
+        chunk_tokens[p.name] = [count_tokens(c, model) for c in p.chunks]
+        tokens[p.name] = count_tokens(p.text, model) + sum(chunk_tokens[p.name])
+
+    trimmed: List[str] = []
+    over = sum(tokens.values()) - budget
+
+    for p in sorted((p for p in parts if not p.required), key=lambda p: p.priority):
+        if over <= 0:
+            break
+        while kept[p.name] and over > 0:
+            kept[p.name].pop()
+            cost = chunk_tokens[p.name].pop()
+            tokens[p.name] -= cost
+            over -= cost
+        if over > 0 and texts[p.name]:
+            text_tokens = count_tokens(texts[p.name], model)
+            texts[p.name] = _cut(texts[p.name], text_tokens - over, model)
+            cut_tokens = count_tokens(texts[p.name], model)
+            tokens[p.name] += cut_tokens - text_tokens
+            over += cut_tokens - text_tokens
+        trimmed.append(p.name)
+
+    rendered = {name: texts[name] + "".join(kept[name]) for name in texts}
+    return PackedPrompt(parts=rendered, tokens=tokens, budget=budget, trimmed=trimmed)
@@ -1,89 +1,134 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
 from app.models.agent_schemas import AgentName
+from app.utils.keywords import KeywordMatcher
+
+
+
+# Each agent has strong keywords (one is enough to launch it) and weak ones
+# (generic words that only count together with other evidence).
+_STRONG = 0.8
+_WEAK = 0.35
+
+_SMART_PROGRAM_KEYWORDS = [
+    "smart program", "smart_program", "contract", "smart contract", "program",
+    "rust", "gear", "vara", "sails"
+]
+_SMART_PROGRAM_WEAK = [
+    "algorithm", "optimize", "refactor", "bug", "fix", "tests", "unit test",
+    "performance", "design pattern", "clean architecture", "best practice",
+    "implement", "build"
+]
+
+_FRONTEND_KEYWORDS = [
+    "ui", "frontend", "react", "vue", "css", "recharts", "tailwind"
+]
+_FRONTEND_WEAK = [
+    "component", "screen", "layout", "dashboard", "chart", "charts", "responsive"
+]
+
+_SERVER_KEYWORDS = [
+    "api", "backend", "server", "endpoint", "fastapi", "database",
+    "jwt", "middleware", "pydantic", "webhook"
+]
+_SERVER_WEAK = ["db", "auth", "cors", "schema"]
+
+# --- Indexer agent is now Risk Agent ---
+_RISK_KEYWORDS = [
+    # Core risk terms
+    "risk", "risks", "risk analysis", "risk assessment", "risk management",
+    "threat", "threats", "vulnerability", "vulnerabilities", "attack", "attacks",
+    "exploit", "exploits", "security", "audit", "auditing",
+    "mitigation", "mitigations", "risk score", "risk scoring",
+
+    # DeFi / market risk
+    "market risk", "volatility", "drawdown", "liquidity risk",
+    "slippage", "impermanent loss", "il", "depeg", "peg risk", "oracle risk",
+    "price manipulation", "front running", "mev", "sandwich", "wash trading",
+
+    # Protocol / technical risk
+    "technical risk", "smart contract risk", "bug bounty", "dependency risk",
+    "upgrade risk", "admin key risk", "privileged", "centralization risk",
+    "governance risk", "governance attack", "treasury risk",
+
+    # Regulatory / compliance risk
+    "regulatory", "compliance", "sanctions", "kyc", "aml",
+
+    # Trend / monitoring / analytics language
+    "market sentiment", "stress test", "tail risk", "early warning", "risk dashboard"
+]
+_RISK_WEAK = [
+    "incident", "exposure", "liquidity", "legal",
+    "trend", "trends", "signal", "signals", "indicator", "indicators",
+    "sentiment", "correlation", "macro", "scenario", "scenarios", "monitoring", "heatmap",
+    # Keep backwards compatibility with old indexer keywords too
+    "rag", "embedding", "index", "vector", "retrieval", "search", "chunk"
+]
+
+_TOKENOMICS_KEYWORDS = [
+    "tokenomics", "distribution", "allocation", "vesting", "emissions",
+    "inflation", "circulating", "total supply", "airdrop"
+]
+_TOKENOMICS_WEAK = [
+    "unlock", "supply", "staking", "rewards", "incentives", "treasury", "token"
+]
+
+# agent -> (strong keywords, weak keywords), in launch order
+_ROUTES: Dict[AgentName, Tuple[List[str], List[str]]] = {
+    "smart_program": (_SMART_PROGRAM_KEYWORDS, _SMART_PROGRAM_WEAK),
+    "frontend": (_FRONTEND_KEYWORDS, _FRONTEND_WEAK),
+    "server": (_SERVER_KEYWORDS, _SERVER_WEAK),
+    "indexer": (_RISK_KEYWORDS, _RISK_WEAK),
+    "economy": (_TOKENOMICS_KEYWORDS, _TOKENOMICS_WEAK),
+}
+
+_WEIGHTS: Dict[str, Dict[str, float]] = {
+    agent: {**{k: _WEAK for k in weak}, **{k: _STRONG for k in strong}}
+    for agent, (strong, weak) in _ROUTES.items()
+}
+
+# Built once at import; matches on token boundaries ("il" is not in "build")
+KEYWORDS = KeywordMatcher({agent: strong + weak for agent, (strong, weak) in _ROUTES.items()})
 
 
 class AgentRouter:
-    def route(self, goal: str, preferred: Optional[List[AgentName]] = None) -> List[AgentName]:
-       
+    """
+    Scores every agent against the goal and launches those at or above
+    `threshold`. A score combines the weights of the agent's keyword hits
+    as 1 - prod(1 - w): one strong hit or two weak ones clear the default
+    threshold, a single generic word ("build", "fix") does not.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = settings.ROUTER_THRESHOLD if threshold is None else threshold
+
+    def score(self, goal: str) -> Dict[AgentName, float]:
+        scores: Dict[AgentName, float] = {}
+        for agent, keywords in KEYWORDS.matches(goal).items():
+            miss = 1.0
+            for kw in keywords:
+                miss *= 1.0 - _WEIGHTS[agent][kw]
+            scores[agent] = round(1.0 - miss, 3)
+        return {agent: scores.get(agent, 0.0) for agent in _ROUTES}
+
+    def decide(
+        self,
+        goal: str,
+        preferred: Optional[List[AgentName]] = None,
+    ) -> Tuple[List[AgentName], Dict[AgentName, float]]:
+        """(agents to launch, score per agent)."""
+        scores = self.score(goal)
+
         if preferred:
-            agents = list(dict.fromkeys(preferred + ["economy"]))
-            return agents
-
-        g = (goal or "").lower()
-        agents: List[AgentName] = []
-
-       
-        if any(k in g for k in [
-            "smart program", "smart_program", "contract", "smart contract", "program",
-            "algorithm", "optimize", "refactor", "bug", "fix", "tests", "unit test",
-            "performance", "design pattern", "clean architecture", "best practice",
-            "implement", "build", "rust", "gear", "vara", "sails"
-        ]):
-            agents.append("smart_program")
-
-        # --- Frontend agent ---
-        if any(k in g for k in [
-            "ui", "frontend", "react", "vue", "css", "component", "screen", "layout",
-            "dashboard", "chart", "charts", "recharts", "tailwind", "responsive"
-        ]):
-            agents.append("frontend")
-
-        # --- Server agent ---
-        if any(k in g for k in [
-            "api", "backend", "server", "endpoint", "fastapi", "db", "database",
-            "auth", "jwt", "cors", "middleware", "schema", "pydantic", "webhook"
-        ]):
-            agents.append("server")
-
-        # --- Indexer agent is now Risk Agent ---
-        risk_keywords = [
-            # Core risk terms
-            "risk", "risks", "risk analysis", "risk assessment", "risk management",
-            "threat", "threats", "vulnerability", "vulnerabilities", "attack", "attacks",
-            "exploit", "exploits", "security", "audit", "auditing", "incident",
-            "mitigation", "mitigations", "exposure", "risk score", "risk scoring",
-
-            # DeFi / market risk
-            "market risk", "volatility", "drawdown", "liquidity risk", "liquidity",
-            "slippage", "impermanent loss", "il", "depeg", "peg risk", "oracle risk",
-            "price manipulation", "front running", "mev", "sandwich", "wash trading",
-
-            # Protocol / technical risk
-            "technical risk", "smart contract risk", "bug bounty", "dependency risk",
-            "upgrade risk", "admin key risk", "privileged", "centralization risk",
-            "governance risk", "governance attack", "treasury risk",
-
-            # Regulatory / compliance risk
-            "regulatory", "compliance", "legal", "sanctions", "kyc", "aml",
-
-            # Trend / monitoring / analytics language
-            "trend", "trends", "signal", "signals", "indicator", "indicators",
-            "sentiment", "market sentiment", "correlation", "macro", "stress test",
-            "scenario", "scenarios", "tail risk", "early warning", "monitoring",
-            "risk dashboard", "heatmap"
-        ]
-
-        # Keep backwards compatibility with old indexer keywords too
-        legacy_indexer_keywords = ["rag", "embedding", "index", "vector", "retrieval", "search", "chunk"]
-
-        if any(k in g for k in risk_keywords) or any(k in g for k in legacy_indexer_keywords):
-            agents.append("indexer")
-
-    
-        tokenomics_keywords = [
-            "tokenomics", "distribution", "allocation", "vesting", "unlock",
-            "emissions", "inflation", "supply", "circulating", "total supply",
-            "staking", "rewards", "incentives", "treasury", "airdrop"
-        ]
-        if any(k in g for k in tokenomics_keywords):
-            agents.append("economy")
-        else:
-            
-            agents.append("economy")
-
-       
-        if agents == ["economy"]:
-            agents = ["smart_program", "economy"]
-
-       
-        return list(dict.fromkeys(agents))
+            return list(dict.fromkeys(preferred)), scores
+
+        agents = [agent for agent, score in scores.items() if score >= self.threshold]
+        if not agents:
+            # Nothing is confident enough: run the single best guess, and the
+            # general-purpose program agent when there is no signal at all.
+            best = max(scores, key=lambda agent: scores[agent])
+            agents = [best if scores[best] > 0 else "smart_program"]
+        return agents, scores
+
+    def route(self, goal: str, preferred: Optional[List[AgentName]] = None) -> List[AgentName]:
+        return self.decide(goal, preferred)[0]
@@ -0,0 +1,239 @@
+"""
+Offline compaction of the training corpus.
+
+    python -m app.services.training_compact [--out PATH]
+
+Strips comments and redundant whitespace from every training file, drops
+blocks that are near-duplicates of a block seen earlier (MinHash over
+token shingles, LSH-bucketed), and writes the result to
+TRAINING_COMPACT_PATH. TrainingCorpus serves a file's compacted text in
+place of the original for as long as the original's content hash matches
+the one recorded here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.prompt_budget import count_tokens
+from app.services.training_config import TRAINING_DIRS, TRAINING_ROOT, get_training_subdir
+
+_FORMAT = 1
+
+# String/char literals are copied verbatim so "//" inside them survives.
+# A lone Rust lifetime ('a) has no closing quote on its line and falls
+# through; two on one line just keep whatever sits between them.
+_LITERAL = re.compile(r'"(?:\\.|[^"\\])*"|`(?:\\.|[^`\\])*`|\'(?:\\.|[^\'\\\n])*\'')
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_SCAN = re.compile(f"{_LITERAL.pattern}|{_COMMENT.pattern}", re.DOTALL)
+
+_SHINGLE = 5
+_PERMUTATIONS = 64
+_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.7 Jaccard almost always collide
+_PRIME = (1 << 61) - 1
+_MIN_BLOCK_TOKENS = 12  # shorter blocks ("}" etc.) are never deduped
+
+
+def strip_comments(text: str) -> str:
+    def keep(m: re.Match) -> str:
+        s = m.group(0)
+        if s.startswith("//"):
+            return ""
+        if s.startswith("/*"):
+            return "\n" * s.count("\n")
+        return s
+
+    return _SCAN.sub(keep, text)
+
+
+def squeeze_whitespace(text: str) -> str:
+    """Right-strips lines and collapses runs of blank lines into one."""
+    out: List[str] = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip("\n")
+
+
+def compact_text(text: str) -> str:
+    return squeeze_whitespace(strip_comments(text))
+
+
+class MinHasher:
+    def __init__(self, permutations: int = _PERMUTATIONS, seed: int = 1):
+        rnd = hashlib.sha256(str(seed).encode()).digest()
+        params: List[Tuple[int, int]] = []
+        for i in range(permutations):
+            h = hashlib.sha256(rnd + i.to_bytes(4, "big")).digest()
+            params.append((int.from_bytes(h[:8], "big") % _PRIME or 1, int.from_bytes(h[8:16], "big") % _PRIME))
+        self._params = params
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in set(shingles)]
+        if not hashes:
+            return ()
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._params)
+
+
+def _shingles(text: str) -> List[str]:
+    words = re.findall(r"\w+|[^\w\s]", text)
+    return [" ".join(words[i:i + _SHINGLE]) for i in range(max(1, len(words) - _SHINGLE + 1))] if words else []
+
+
+def _similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """Remembers MinHash signatures; finds an earlier one above `threshold`."""
+
+    def __init__(self, threshold: float = 0.85):
+        self.threshold = threshold
+        self._hasher = MinHasher()
+        self._rows = _PERMUTATIONS // _BANDS
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._signatures: List[Tuple[int, ...]] = []
+
+    def seen(self, text: str) -> bool:
+        """True if `text` nearly duplicates an earlier text; else records it."""
+        sig = self._hasher.signature(_shingles(text))
+        if not sig:
+            return False
+        bands = [(b, sig[b * self._rows:(b + 1) * self._rows]) for b in range(_BANDS)]
+        candidates = {i for band in bands for i in self._buckets.get(band, ())}
+        if any(_similarity(sig, self._signatures[i]) >= self.threshold for i in candidates):
+            return True
+        idx = len(self._signatures)
+        self._signatures.append(sig)
+        for band in bands:
+            self._buckets[band].append(idx)
+        return False
+
+
+def _natural_key(path: str) -> List[object]:
+    return [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", path)]
+
+
+def compact_corpus(files: Dict[str, str], threshold: float = 0.85) -> Dict[str, Optional[str]]:
+    """
+    Compacts every file and drops blocks (blank-line separated) that nearly
+    duplicate an earlier block, in natural path order. A file left with
+    nothing maps to None.
+    """
+    dupes = NearDuplicateIndex(threshold)
+    out: Dict[str, Optional[str]] = {}
+
+    for rel in sorted(files, key=_natural_key):
+        kept: List[str] = []
+        for block in compact_text(files[rel]).split("\n\n"):
+            if len(re.findall(r"\w+|[^\w\s]", block)) >= _MIN_BLOCK_TOKENS and dupes.seen(block):
+                continue
+            kept.append(block)
+        text = "\n\n".join(b for b in kept if b.strip())
+        out[rel] = text or None
+    return out
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()
+
+
+def _read_tree(root: str) -> Dict[str, str]:
+    files: Dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(root):
+        for fn in filenames:
+            if fn.lower().endswith(".txt"):
+                full = os.path.join(dirpath, fn)
+                with open(full, "r", encoding="utf-8", errors="ignore") as f:
+                    files[os.path.relpath(full, root).replace(os.sep, "/")] = f.read()
+    return files
+
+
+def token_report(raw: Dict[str, str], compact: Dict[str, Optional[str]]) -> Dict[str, Dict[str, int]]:
+    """Tokens before/after compaction per agent with a training directory."""
+    report: Dict[str, Dict[str, int]] = {}
+    for agent in TRAINING_DIRS:
+        subdir = get_training_subdir(agent)
+        prefix = subdir + "/" if subdir else ""
+        rels = [rel for rel in raw if prefix and rel.startswith(prefix)]
+        if not rels:
+            continue
+        before = sum(count_tokens(raw[rel]) for rel in rels)
+        after = sum(count_tokens(compact.get(rel) or "") for rel in rels)
+        report[agent] = {"files": len(rels), "tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+    before = sum(count_tokens(t) for t in raw.values())
+    after = sum(count_tokens(t or "") for t in compact.values())
+    report["*"] = {"files": len(raw), "tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+    return report
+
+
+def build_artifact(root: str, out_path: str, threshold: float = 0.85) -> Dict[str, Dict[str, int]]:
+    raw = _read_tree(root)
+    compact = compact_corpus(raw, threshold)
+    report = token_report(raw, compact)
+
+    data = {
+        "format": _FORMAT,
+        "files": {rel: {"sha1": _sha1(raw[rel]), "text": compact[rel]} for rel in sorted(raw)},
+        "report": report,
+    }
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=0)
+    os.replace(tmp, out_path)
+    return report
+
+
+def load_artifact(path: str) -> Dict[str, Tuple[str, Optional[str]]]:
+    """rel path -> (sha1 of the original, compacted text or None if dropped)."""
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != _FORMAT:
+        return {}
+    return {rel: (entry["sha1"], entry["text"]) for rel, entry in data.get("files", {}).items()}
+
+
+def compacted_text(artifact: Dict[str, Tuple[str, Optional[str]]], rel: str, raw: str) -> Tuple[bool, Optional[str]]:
+    """
+    (True, text-or-None) when the artifact covers this exact file content,
+    (False, None) when it doesn't (new or edited since compaction).
+    """
+    entry = artifact.get(rel)
+    if entry is None or entry[0] != _sha1(raw):
+        return False, None
+    return True, entry[1]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compact the agents' training corpus.")
+    parser.add_argument("--root", default=TRAINING_ROOT)
+    parser.add_argument("--out", default=settings.TRAINING_COMPACT_PATH)
+    parser.add_argument("--threshold", type=float, default=0.85, help="MinHash similarity treated as duplicate")
+    args = parser.parse_args(argv)
+
+    report = build_artifact(args.root, args.out, args.threshold)
+    print(f"wrote {args.out}")
+    for agent, row in report.items():
+        pct = 100 * row["tokens_saved"] / row["tokens_before"] if row["tokens_before"] else 0.0
+        print(
+            f"{'all' if agent == '*' else agent:<16} {row['files']:>4} files  "
+            f"{row['tokens_before']:>8} -> {row['tokens_after']:>8} tokens  ({pct:.1f}% saved)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ TRAINING_DIRS: Dict[str, str] = {
     "economy": "agents/training_data/economy_data",    
 }
 
+# Every TRAINING_DIRS entry lives under this directory.
+TRAINING_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents", "training_data")
+
+
 def project_root() -> str:
    
     return os.path.abspath(os.getcwd())
@@ -20,3 +24,11 @@ def get_training_dir(agent_name: str) -> str:
        
         return ""
     return os.path.join(project_root(), rel)
+
+
+def get_training_subdir(agent_name: str) -> str:
+    """The agent's training directory relative to TRAINING_ROOT ("" if none)."""
+    rel = TRAINING_DIRS.get(agent_name)
+    if not rel:
+        return ""
+    return rel.replace("\\", "/").split("training_data/", 1)[-1].strip("/")
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.training_compact import compacted_text, load_artifact
+from app.services.training_config import TRAINING_ROOT
+
+
+@dataclass(frozen=True)
+class CorpusFile:
+    path: str  # relative to the corpus root, "/"-separated
+    text: str
+    mtime_ns: int
+    size: int
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+
+class TrainingCorpus:
+    """
+    Every training .txt file under `root`, read once and kept in memory.
+
+    The corpus is loaded at import time, so with `gunicorn --preload` the
+    master reads it once and the workers share those pages copy-on-write.
+    The file map is replaced wholesale and never mutated; readers keep
+    whatever snapshot they got. At most every `check_interval_s` a lookup
+    stats the tree and re-reads only the files whose mtime or size changed.
+    That blocks, so lookups from async code go through a thread (see
+    TrainingIndex.asearch).
+
+    When `compact_path` points at an artifact from training_compact, files
+    it covers are served compacted (or skipped as duplicates); everything
+    is re-read when the artifact itself changes.
+    """
+
+    def __init__(self, root: str, check_interval_s: float = 30.0, compact_path: str = ""):
+        self.root = root
+        self.check_interval_s = check_interval_s
+        self.compact_path = compact_path
+        self.version = 0
+        self._files: Mapping[str, CorpusFile] = MappingProxyType({})
+        # (mtime_ns, size) of every file read, including ones compaction dropped
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._compact: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._compact_stamp: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        found: Dict[str, os.stat_result] = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for fn in filenames:
+                if not fn.lower().endswith(".txt"):
+                    continue
+                full = os.path.join(dirpath, fn)
+                try:
+                    found[os.path.relpath(full, self.root).replace(os.sep, "/")] = os.stat(full)
+                except OSError:
+                    continue
+        return found
+
+    def _reload_compact(self) -> bool:
+        """Re-reads the compaction artifact if it changed; True if it did."""
+        try:
+            st = os.stat(self.compact_path) if self.compact_path else None
+        except OSError:
+            st = None
+        stamp = (st.st_mtime_ns, st.st_size) if st is not None else None
+        if stamp == self._compact_stamp:
+            return False
+        self._compact = load_artifact(self.compact_path) if stamp is not None else {}
+        self._compact_stamp = stamp
+        return True
+
+    def refresh(self) -> int:
+        """Re-reads new or changed files; returns how many files changed."""
+        with self._lock:
+            reread_all = self._reload_compact()
+            stats = self._scan()
+            current = self._files
+            files: Dict[str, CorpusFile] = {}
+            stamps: Dict[str, Tuple[int, int]] = {}
+            changed = len(set(self._stamps) - set(stats))
+
+            for rel, st in sorted(stats.items()):
+                stamp = (st.st_mtime_ns, st.st_size)
+                if not reread_all and self._stamps.get(rel) == stamp:
+                    stamps[rel] = stamp
+                    if rel in current:
+                        files[rel] = current[rel]
+                    continue
+                try:
+                    with open(os.path.join(self.root, rel), "r", encoding="utf-8", errors="ignore") as f:
+                        text = f.read()
+                except OSError:
+                    continue
+                stamps[rel] = stamp
+                changed += 1
+
+                covered, compact = compacted_text(self._compact, rel, text)
+                if covered:
+                    if compact is None:
+                        continue  # a near-duplicate of another file
+                    text = compact
+                files[rel] = CorpusFile(rel, text, st.st_mtime_ns, st.st_size)
+
+            self._stamps = stamps
+            if changed:
+                self._files = MappingProxyType(files)
+                self.version += 1
+                metrics.incr("training_corpus.reloaded_files", changed)
+                metrics.gauge("training_corpus.files", len(files))
+                metrics.gauge("training_corpus.chars", sum(len(f.text) for f in files.values()))
+
+            self._checked_at = time.monotonic()
+            return changed
+
+    def _maybe_refresh(self) -> None:
+        if self.check_interval_s > 0 and time.monotonic() - self._checked_at >= self.check_interval_s:
+            if self._lock.locked():
+                return  # another thread is refreshing; serve the current snapshot
+            self.refresh()
+
+    def snapshot(self) -> Mapping[str, CorpusFile]:
+        self._maybe_refresh()
+        return self._files
+
+    def files(self, directory: str, recursive: bool = False) -> List[CorpusFile]:
+        """Files in `directory` (relative to the root), sorted by path."""
+        prefix = directory.strip("/") + "/" if directory.strip("/") else ""
+        return [
+            f for rel, f in self.snapshot().items()
+            if rel.startswith(prefix) and (recursive or "/" not in rel[len(prefix):])
+        ]
+
+
+training_corpus = TrainingCorpus(
+    TRAINING_ROOT,
+    check_interval_s=settings.TRAINING_CORPUS_CHECK_S,
+    compact_path=settings.TRAINING_COMPACT_PATH,
+)
+training_corpus.refresh()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.prompt_budget import count_tokens
+from app.services.training_corpus import CorpusFile, TrainingCorpus, training_corpus
+
+# Bump when the chunking, tokenization or file layout changes.
+_FORMAT = 1
+
+_K1 = 1.2
+_B = 0.75
+
+_IDENT = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased identifier terms. snake_case and CamelCase identifiers also
+    yield their parts, so "FactoryService" matches a goal saying "factory".
+    """
+    terms: List[str] = []
+    for word in _IDENT.findall(text):
+        lower = word.lower()
+        if len(lower) > 1:
+            terms.append(lower)
+        parts = _CAMEL.findall(word)
+        if len(parts) > 1:
+            terms.extend(p.lower() for p in parts if len(p) > 1)
+    return terms
+
+
+@dataclass(frozen=True)
+class Chunk:
+    path: str  # corpus-relative file path
+    start_line: int  # 1-based, inclusive
+    end_line: int
+    text: str
+
+
+def _natural_key(path: str) -> List[object]:
+    # "services_data/2.data.txt" sorts before "services_data/10.data.txt"
+    return [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", path)]
+
+
+def chunk_file(f: CorpusFile, max_chars: int) -> List[Chunk]:
+    """
+    Splits a file on blank lines and packs consecutive blocks into chunks of
+    at most `max_chars`; a block longer than that is cut on line boundaries.
+    """
+    chunks: List[Chunk] = []
+    lines = f.text.splitlines()
+    buf: List[str] = []
+    buf_start = 0
+    buf_chars = 0
+
+    def flush(end: int) -> None:
+        nonlocal buf, buf_chars
+        text = "\n".join(buf).strip()
+        if text:
+            chunks.append(Chunk(f.path, buf_start + 1, end, text))
+        buf, buf_chars = [], 0
+
+    block_start = 0
+    for i in range(len(lines) + 1):
+        if i < len(lines) and lines[i].strip():
+            continue
+        block = lines[block_start:i]
+        block_chars = sum(len(line) + 1 for line in block)
+        if buf and buf_chars + block_chars > max_chars:
+            flush(block_start)
+        if not buf:
+            buf_start = block_start
+        for j, line in enumerate(block):
+            if buf and buf_chars + len(line) + 1 > max_chars:
+                flush(block_start + j)
+                buf_start = block_start + j
+            buf.append(line)
+            buf_chars += len(line) + 1
+        if buf and block:
+            buf.append("")
+        block_start = i + 1
+    flush(len(lines))
+    return chunks
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    chunks: List[Chunk]
+    postings: Mapping[str, List[Tuple[int, int]]]
+    lengths: List[int]
+    avg_len: float
+
+
+class TrainingIndex:
+    """
+    BM25 index over fixed-size chunks of the training corpus.
+
+    The index is rebuilt whenever the corpus changes and persisted to `path`
+    keyed by a hash of the corpus content, so a restart (or a second engine
+    process) with the same training data loads it instead of re-chunking.
+
+    Refreshing and rebuilding block, so async callers use asearch(), which
+    runs in a thread; a rebuilt index is swapped in as one _IndexState and
+    searches already running keep the one they started with.
+    """
+
+    def __init__(self, corpus: TrainingCorpus, path: str, chunk_chars: int = 1500):
+        self.corpus = corpus
+        self.path = path
+        self.chunk_chars = chunk_chars
+        self.signature = ""
+        self._corpus_version = -1
+        self._state = _IndexState([], {}, [], 0.0)
+        self._lock = threading.Lock()
+
+    def _signature(self, files: Mapping[str, CorpusFile]) -> str:
+        h = hashlib.sha1(f"{_FORMAT}:{self.chunk_chars}".encode())
+        for rel in sorted(files):
+            h.update(rel.encode())
+            h.update(b"\0")
+            h.update(files[rel].text.encode("utf-8", "ignore"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def ensure(self) -> None:
+        """Brings the index up to date with the corpus (load or rebuild)."""
+        files = self.corpus.snapshot()
+        if self.corpus.version == self._corpus_version:
+            return
+        with self._lock:
+            if self.corpus.version == self._corpus_version:
+                return
+            signature = self._signature(files)
+            if signature != self.signature and not self._load(signature):
+                self._build(files, signature)
+                self._save()
+            self._corpus_version = self.corpus.version
+
+    def _build(self, files: Mapping[str, CorpusFile], signature: str) -> None:
+        t0 = time.perf_counter()
+        chunks: List[Chunk] = []
+        for rel in sorted(files, key=_natural_key):
+            chunks.extend(chunk_file(files[rel], self.chunk_chars))
+
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths: List[int] = []
+        for i, chunk in enumerate(chunks):
+            terms = tokenize(chunk.text)
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings[term].append((i, tf))
+
+        self._install(signature, chunks, dict(postings), lengths)
+        metrics.observe("training_index.build_s", time.perf_counter() - t0)
+
+    def _install(self, signature: str, chunks: List[Chunk], postings, lengths: List[int]) -> None:
+        avg_len = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self._state = _IndexState(chunks, postings, lengths, avg_len)
+        self.signature = signature
+        metrics.gauge("training_index.chunks", len(chunks))
+
+    def _save(self) -> None:
+        data = {
+            "format": _FORMAT,
+            "signature": self.signature,
+            "chunks": [[c.path, c.start_line, c.end_line, c.text] for c in self._state.chunks],
+            "postings": self._state.postings,
+            "lengths": self._state.lengths,
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            # A read-only disk only costs us a rebuild on the next start.
+            metrics.incr("training_index.save_failed")
+
+    def _load(self, signature: str) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("format") != _FORMAT or data.get("signature") != signature:
+            return False
+
+        chunks = [Chunk(p, s, e, t) for p, s, e, t in data["chunks"]]
+        postings = {term: [(i, tf) for i, tf in plist] for term, plist in data["postings"].items()}
+        self._install(signature, chunks, postings, data["lengths"])
+        metrics.incr("training_index.loaded")
+        return True
+
+    def _scores(self, state: _IndexState, query: str, allowed: Optional[List[int]]) -> Dict[int, float]:
+        allowed_set = set(allowed) if allowed is not None else None
+        n = len(allowed) if allowed is not None else len(state.chunks)
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            plist = state.postings.get(term)
+            if not plist:
+                continue
+            if allowed_set is not None:
+                plist = [(i, tf) for i, tf in plist if i in allowed_set]
+                if not plist:
+                    continue
+            idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for i, tf in plist:
+                norm = _K1 * (1 - _B + _B * state.lengths[i] / (state.avg_len or 1))
+                scores[i] += idf * tf * (_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        directory: str = "",
+        k: int = 8,
+        budget_tokens: int = 5000,
+    ) -> List[Chunk]:
+        """
+        Top-`k` chunks under `directory` by BM25 score against `query`, cut
+        off once `budget_tokens` is spent. With no term overlap at all the
+        directory's first chunks (in natural file order) are returned.
+        """
+        self.ensure()
+        state = self._state
+        chunks = state.chunks
+        prefix = directory.strip("/") + "/" if directory.strip("/") else ""
+        allowed = [i for i, c in enumerate(chunks) if c.path.startswith(prefix)] if prefix else None
+
+        scores = self._scores(state, query, allowed)
+        if scores:
+            ranked: Iterable[int] = sorted(scores, key=lambda i: (-scores[i], i))
+            metrics.incr("training_index.hits")
+        else:
+            ranked = allowed if allowed is not None else range(len(chunks))
+            metrics.incr("training_index.misses")
+
+        picked: List[Chunk] = []
+        spent = 0
+        for i in ranked:
+            if len(picked) >= k:
+                break
+            cost = count_tokens(chunks[i].text)
+            if spent + cost > budget_tokens:
+                continue
+            picked.append(chunks[i])
+            spent += cost
+        return picked
+
+    async def asearch(self, query: str, directory: str = "", k: int = 8, budget_tokens: int = 5000) -> List[Chunk]:
+        """search() off the event loop: it may stat, re-read and re-index the corpus."""
+        return await asyncio.to_thread(self.search, query, directory, k, budget_tokens)
+
+
+def format_chunk(c: Chunk) -> str:
+    return f"\n\n--- FILE: {c.path} (lines {c.start_line}-{c.end_line}) ---\n{c.text}"
+
+
+training_index = TrainingIndex(
+    training_corpus,
+    settings.TRAINING_INDEX_PATH,
+    chunk_chars=settings.TRAINING_CHUNK_CHARS,
+)
+training_index.ensure()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+
+def _variants(word: str) -> Tuple[str, ...]:
+    # "contract" also matches "contracts", "index" "indexes"
+    return (word, word + "s", word + "es") if len(word) >= 3 and word[-1].isalpha() else (word,)
+
+
+class KeywordMatcher:
+    """
+    Token-boundary keyword matching for several named groups at once.
+
+    Everything is built once at construction: single-word keywords (and
+    their plurals) go into one set probed once per token of the text, and
+    phrases are indexed by their first word so only positions starting a
+    known phrase are compared. "il" therefore matches "IL risk" but not
+    "build", and "smart contract" needs both words in sequence.
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        self._words: Dict[str, List[Tuple[str, str]]] = {}
+        self._phrases: Dict[str, Dict[Tuple[str, ...], List[Tuple[str, str]]]] = {}
+
+        for group, keywords in groups.items():
+            for kw in keywords:
+                words = _TOKEN.findall(kw.lower())
+                if not words:
+                    continue
+                if len(words) == 1:
+                    targets = [self._words.setdefault(v, []) for v in _variants(words[0])]
+                else:
+                    by_first = self._phrases.setdefault(words[0], {})
+                    targets = [by_first.setdefault(tuple(words[1:-1]) + (v,), []) for v in _variants(words[-1])]
+                for owners in targets:
+                    if (group, kw) not in owners:
+                        owners.append((group, kw))
+
+        self._word_set = frozenset(self._words)
+
+    def matches(self, text: str) -> Dict[str, List[str]]:
+        """group -> distinct keywords found in `text`, in order of appearance."""
+        tokens = _TOKEN.findall((text or "").lower())
+        owners_hit: List[List[Tuple[str, str]]] = []
+
+        for i, tok in enumerate(tokens):
+            if tok in self._word_set:
+                owners_hit.append(self._words[tok])
+            rests = self._phrases.get(tok)
+            if rests is None:
+                continue
+            for rest, owners in rests.items():
+                if tuple(tokens[i + 1:i + 1 + len(rest)]) == rest:
+                    owners_hit.append(owners)
+
+        found: Dict[str, List[str]] = {}
+        for owners in owners_hit:
+            for group, kw in owners:
+                hits = found.setdefault(group, [])
+                if kw not in hits:
+                    hits.append(kw)
+        return found
+
+    def groups(self, text: str) -> Set[str]:
+        return set(self.matches(text))
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: AgentRouter.route vs the old substring scan.
+
+    PYTHONPATH=. python test/bench_router.py
+
+Prints the cost of one routing decision for both and the agent launches
+that token-boundary matching and score thresholds no longer make.
+"""
+
+import timeit
+from collections import Counter
+
+from app.services import router as r
+
+GOALS = [
+    "Build a staking dApp with a rewards dashboard",
+    "Build an NFT marketplace on Vara with royalties",
+    "Design the tokenomics and vesting schedule for a DAO treasury",
+    "Implement a lending protocol with liquidations and oracle price feeds",
+    "Create a multisig wallet program with a React UI",
+    "Write unit tests for the escrow contract",
+    "Add JWT auth and a webhook endpoint to the backend",
+    "Analyze impermanent loss and IL risk for our AMM pool",
+    "Make the landing page responsive with tailwind",
+    "Fix the build of the voting program",
+    "Ship a guild membership program with on-chain profiles",
+    "A quiz game where players earn tokens",
+    "Build a crowdfunding campaign contract with milestone payouts",
+    "Detailed audit of the bridge contract and exploit scenarios",
+    "Refactor the auction program for performance",
+    "Add a leaderboard chart to the game",
+    "Create an API to list user positions",
+    "Token distribution for a play-to-earn guild",
+    "Build a simple counter program in Rust",
+    "Dashboard for monitoring volatility and drawdown",
+]
+
+
+def legacy_route(goal):
+    """The substring scan AgentRouter.route used before KeywordMatcher."""
+    g = goal.lower()
+    agents = []
+    for agent in ("smart_program", "frontend", "server", "indexer"):
+        strong, weak = r._ROUTES[agent]
+        if any(k in g for k in list(strong + weak)):
+            agents.append(agent)
+    agents.append("economy")
+    if agents == ["economy"]:
+        agents = ["smart_program", "economy"]
+    return agents
+
+
+def main():
+    router = r.AgentRouter()
+    n = 2000
+
+    old_s = timeit.timeit(lambda: [legacy_route(g) for g in GOALS], number=n) / (n * len(GOALS))
+    new_s = timeit.timeit(lambda: [router.route(g) for g in GOALS], number=n) / (n * len(GOALS))
+    print(f"route(): substring scan {old_s * 1e6:.1f} us, KeywordMatcher {new_s * 1e6:.1f} us per goal")
+
+    dropped, added = Counter(), Counter()
+    old_total = new_total = 0
+    for goal in GOALS:
+        old, new = set(legacy_route(goal)), set(router.route(goal))
+        old_total += len(old)
+        new_total += len(new)
+        dropped.update(old - new)
+        added.update(new - old)
+        if old != new:
+            print(f"  {goal!r}: -{sorted(old - new)} +{sorted(new - old)}")
+
+    print(f"agent launches over {len(GOALS)} goals: {old_total} -> {new_total}")
+    print(f"  no longer launched: {dict(dropped)}")
+    print(f"  newly launched: {dict(added)}")
+
+
+if __name__ == "__main__":
+    main()
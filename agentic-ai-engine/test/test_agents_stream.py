@@ -0,0 +1,215 @@
+import asyncio
+import json
+
+import pytest
+
+from app.api.routes import agents_stream
+from app.models.agent_schemas import RunAgentsRequest
+from app.services.agent_base import AgentResponse
+from app.services.live_runs import LiveRuns
+from app.services.orchestrator import Orchestrator
+
+
+class StreamingAgent:
+    depends_on = ()
+
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.seen = None
+
+    async def run(self, req):
+        self.seen = req
+        await asyncio.sleep(self.delay)
+        if req.emit is not None:
+            await req.emit({"type": "agent_delta", "agent": self.name, "delta": "hi"})
+        return AgentResponse(agent=self.name, summary=self.name, result={"from": self.name})
+
+
+class FixedRouter:
+    def __init__(self, targets):
+        self.targets = targets
+
+    def decide(self, goal, preferred=None):
+        return preferred or self.targets, {}
+
+
+async def _frames(response):
+    return [chunk async for chunk in response.body_iterator]
+
+
+def _parse(frame):
+    event_id, data = frame.split("\n")[:2]
+    return event_id[len("id: "):], json.loads(data[len("data: "):])
+
+
+def _events(orch, run_request, monkeypatch):
+    monkeypatch.setattr(agents_stream, "get_orchestrator", lambda: orch)
+    monkeypatch.setattr(agents_stream, "require_llm_capacity", lambda: None)
+
+    async def collect():
+        return await _frames(agents_stream.sse_run(run_request))
+
+    return [_parse(frame)[1] for frame in asyncio.run(collect())]
+
+
+def test_stream_runs_the_full_request_through_the_orchestrator(monkeypatch):
+    agents = {"smart_program": StreamingAgent("smart_program", delay=0.02), "economy": StreamingAgent("economy")}
+    orch = Orchestrator(agents, FixedRouter(["smart_program", "economy"]))
+
+    events = _events(
+        orch,
+        RunAgentsRequest(goal="goal", constraints=["no std"], context={"user": "u1"}, preferred_agents=["economy"]),
+        monkeypatch,
+    )
+
+    kinds = [e["type"] for e in events if e["type"] != "progress_tick"]
+    assert kinds == ["router_update", "agent_start", "agent_delta", "agent_done", "done"]
+    assert events[0]["targets"] == ["economy"]
+    assert len({e["trace_id"] for e in events}) == 1
+    req = agents["economy"].seen
+    assert req.constraints == ["no std"] and req.context["user"] == "u1"
+    assert req.priority == "interactive"
+    assert agents["smart_program"].seen is None
+
+
+def test_deadlines_apply_to_the_stream_too(monkeypatch):
+    agents = {"smart_program": StreamingAgent("smart_program", delay=5), "economy": StreamingAgent("economy")}
+    orch = Orchestrator(agents, FixedRouter(["smart_program", "economy"]))
+
+    events = _events(orch, RunAgentsRequest(goal="goal", timeout_s=0.05), monkeypatch)
+
+    finished = {e["agent"]: e for e in events if e["type"] in ("agent_done", "agent_error")}
+    assert finished["economy"]["type"] == "agent_done"
+    assert finished["smart_program"]["status"] == "timeout"
+    assert events[-1]["type"] == "done"
+
+
+class CountingAgent(StreamingAgent):
+    runs = 0
+
+    async def run(self, req):
+        CountingAgent.runs += 1
+        return await super().run(req)
+
+
+def test_reconnect_with_last_event_id_resumes_the_same_run(monkeypatch):
+    agents = {"smart_program": CountingAgent("smart_program", delay=0.05), "economy": CountingAgent("economy")}
+    orch = Orchestrator(agents, FixedRouter(["smart_program", "economy"]))
+    monkeypatch.setattr(agents_stream, "get_orchestrator", lambda: orch)
+    monkeypatch.setattr(agents_stream, "require_llm_capacity", lambda: None)
+    CountingAgent.runs = 0
+
+    async def main():
+        first = agents_stream.sse_run(RunAgentsRequest(goal="goal"))
+        frames = []
+        async for frame in first.body_iterator:
+            frames.append(frame)
+            if len(frames) == 3:
+                break
+        await first.body_iterator.aclose()
+
+        # The client is gone; the run goes on without it.
+        last_id = _parse(frames[-1])[0]
+        await asyncio.sleep(0.1)
+        rest = await _frames(agents_stream.sse_run(RunAgentsRequest(goal="goal"), last_event_id=last_id))
+        return frames, rest
+
+    frames, rest = asyncio.run(main())
+
+    ids = [_parse(f)[0] for f in frames + rest]
+    trace_id = ids[0].rsplit(":", 1)[0]
+    assert ids == [f"{trace_id}:{n}" for n in range(1, len(ids) + 1)]
+    assert _parse(rest[-1])[1]["type"] == "done"
+    assert CountingAgent.runs == 2
+
+
+def test_abandoned_run_is_cancelled_after_the_grace_period(monkeypatch):
+    agents = {"economy": StreamingAgent("economy", delay=5)}
+    orch = Orchestrator(agents, FixedRouter(["economy"]))
+    monkeypatch.setattr(agents_stream, "get_orchestrator", lambda: orch)
+    monkeypatch.setattr(agents_stream, "require_llm_capacity", lambda: None)
+    monkeypatch.setattr(agents_stream, "live_runs", LiveRuns(buffer_size=100, grace_s=0.05))
+
+    async def main():
+        response = agents_stream.sse_run(RunAgentsRequest(goal="goal"))
+        first = await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+        trace_id = _parse(first)[0].rsplit(":", 1)[0]
+        task = agents_stream.live_runs.get(trace_id).task
+
+        await asyncio.sleep(0.2)
+        return task, agents_stream.live_runs.get(trace_id)
+
+    task, live = asyncio.run(main())
+
+    assert task.cancelled()
+    assert live is None
+
+
+def test_ring_buffer_reports_events_it_no_longer_has():
+    async def main():
+        live = LiveRuns(buffer_size=2, grace_s=60).create("t")
+        for n in range(5):
+            live.publish({"type": "tick", "n": n})
+        live.close()
+        return [item async for item in live.events(after=1)]
+
+    events = asyncio.run(main())
+
+    assert events[0][1] == {"type": "resume_gap", "trace_id": "t", "missed": 2}
+    assert [(seq, e["n"]) for seq, e in events[1:]] == [(4, 3), (5, 4)]
+
+
+def test_identical_requests_share_one_run(monkeypatch):
+    agents = {"economy": CountingAgent("economy", delay=0.05)}
+    orch = Orchestrator(agents, FixedRouter(["economy"]))
+    monkeypatch.setattr(agents_stream, "get_orchestrator", lambda: orch)
+    monkeypatch.setattr(agents_stream, "require_llm_capacity", lambda: None)
+    CountingAgent.runs = 0
+
+    async def main():
+        first = agents_stream.sse_run(RunAgentsRequest(goal="Design  the tokenomics"))
+        head = await first.body_iterator.__anext__()
+        second = agents_stream.sse_run(RunAgentsRequest(goal="design the Tokenomics "))
+        a, b = await asyncio.gather(_frames(first), _frames(second))
+        return [head] + a, b
+
+    first, second = asyncio.run(main())
+
+    # The late subscriber gets the backlog too, under the same ids.
+    assert first == second
+    assert CountingAgent.runs == 1
+
+
+def test_pinned_run_outlives_its_subscribers():
+    async def main():
+        live = LiveRuns(buffer_size=10, grace_s=0.01).create("t")
+        live.task = asyncio.create_task(asyncio.sleep(5))
+        live.pin()
+
+        watcher = live.events()
+        live.publish({"type": "tick"})
+        await watcher.__anext__()
+        await watcher.aclose()
+        await asyncio.sleep(0.05)
+        survived = not live.task.cancelled()
+
+        live.unpin()
+        await asyncio.sleep(0.05)
+        return survived, live.task.cancelled()
+
+    survived, cancelled_after_unpin = asyncio.run(main())
+
+    assert survived
+    assert cancelled_after_unpin
+
+
+def test_watching_an_unknown_trace_is_a_404(monkeypatch):
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(agents_stream, "live_runs", LiveRuns(buffer_size=10, grace_s=1))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(agents_stream.watch_run("missing", None, None))
+    assert exc.value.status_code == 404
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.agent_base import AgentRequest, AgentResponse, BaseAgent, ModelTier
+from app.services.llm_client import LLMResult
+
+
+class FakeLLM:
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+        self.forgotten = []
+
+    async def acomplete(self, *, model, **kwargs):
+        self.calls.append(model)
+        return LLMResult(text=self.replies[model], key=model)
+
+    async def forget(self, result):
+        self.forgotten.append(result.key)
+
+
+class CascadeAgent(BaseAgent):
+    name = "test_cascade"
+    model_tiers = (ModelTier("cheap", "low"), ModelTier("strong", "high"))
+
+    async def run(self, req: AgentRequest) -> AgentResponse:
+        raise NotImplementedError
+
+
+def _parse(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _validate(payload):
+    return (True, "ok") if payload.get("n") == 1 else (False, "n must be 1")
+
+
+def _generate(agent):
+    req = AgentRequest(trace_id="t", goal="g", constraints=[], context={}, artifacts={})
+    return asyncio.run(agent.generate(req, system="s", user="u", parse=_parse, validate=_validate))
+
+
+def test_cheap_tier_is_kept_when_valid():
+    llm = FakeLLM({"cheap": '{"n": 1}', "strong": '{"n": 1}'})
+    gen = _generate(CascadeAgent(llm))
+
+    assert gen.ok
+    assert llm.calls == ["cheap"]
+    assert gen.meta["model"] == "cheap"
+    assert gen.escalations == 0
+
+
+def test_escalates_on_validation_failure(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPAIR_ATTEMPTS", 0)
+    llm = FakeLLM({"cheap": '{"n": 2}', "strong": '{"n": 1}'})
+    before = metrics.get("cascade.test_cascade.escalated")
+    gen = _generate(CascadeAgent(llm))
+
+    assert gen.ok
+    assert llm.calls == ["cheap", "strong"]
+    assert llm.forgotten == ["cheap"]
+    assert gen.tier.model == "strong"
+    assert gen.escalations == 1
+    assert metrics.get("cascade.test_cascade.escalated") == before + 1
+
+
+def test_returns_last_attempt_when_every_tier_fails(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPAIR_ATTEMPTS", 0)
+    llm = FakeLLM({"cheap": "nope", "strong": '{"n": 3}'})
+    gen = _generate(CascadeAgent(llm))
+
+    assert not gen.ok
+    assert gen.reason == "n must be 1"
+    assert gen.payload == {"n": 3}
+
+
+def test_repair_fixes_payload_before_escalating(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPAIR_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "LLM_REPAIR_MODEL", "repair")
+    llm = FakeLLM({"cheap": '{"n": 2}', "repair": '{"n": 1}', "strong": '{"n": 1}'})
+    gen = _generate(CascadeAgent(llm))
+
+    assert gen.ok
+    assert llm.calls == ["cheap", "repair"]
+    assert gen.meta["repairs"] == 1
+    assert gen.meta["model"] == "cheap"
+
+
+def test_repair_attempts_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPAIR_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "LLM_REPAIR_MODEL", "repair")
+    llm = FakeLLM({"cheap": '{"n": 2}', "repair": '{"n": 5}', "strong": '{"n": 3}'})
+    gen = _generate(CascadeAgent(llm))
+
+    assert not gen.ok
+    assert llm.calls == ["cheap", "repair", "repair", "strong", "repair", "repair"]
+    assert gen.repairs == 4
+
+
+def test_repair_request_carries_the_schema(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPAIR_ATTEMPTS", 1)
+    monkeypatch.setattr(settings, "LLM_REPAIR_MODEL", "repair")
+    prompts = {}
+
+    class RecordingLLM(FakeLLM):
+        async def acomplete(self, *, model, **kwargs):
+            prompts[model] = kwargs["user"]
+            return await super().acomplete(model=model, **kwargs)
+
+    llm = RecordingLLM({"cheap": '{"n": 2}', "repair": '{"n": 1}', "strong": '{"n": 1}'})
+    req = AgentRequest(trace_id="t", goal="g", constraints=[], context={}, artifacts={})
+    agent = CascadeAgent(llm)
+
+    asyncio.run(agent.generate(req, system="s", user="TRAINING\nSCHEMA: n == 1", parse=_parse, validate=_validate))
+    assert "SCHEMA: n == 1" in prompts["repair"]
+
+    asyncio.run(agent.generate(req, system="s", user="TRAINING\nSCHEMA", schema="SCHEMA", parse=_parse, validate=_validate))
+    assert "SCHEMA" in prompts["repair"] and "TRAINING" not in prompts["repair"]
+
+
+def test_kept_cheap_tier_reports_savings_before_the_top_tier_ever_ran(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_TOP_TIER_LATENCY_S", 20.0)
+
+    class FreshAgent(CascadeAgent):
+        name = "test_cascade_fresh"
+
+    before = metrics.get("cascade.test_cascade_fresh.latency_saved_s")
+    gen = _generate(FreshAgent(FakeLLM({"cheap": '{"n": 1}', "strong": '{"n": 1}'})))
+
+    assert gen.ok
+    assert metrics.get("cascade.test_cascade_fresh.latency_saved_s") - before > 19
+
+
+def test_agent_without_tiers_fails_clearly():
+    class NoTiers(CascadeAgent):
+        model_tiers = ()
+
+    with pytest.raises(ValueError, match="no model tiers"):
+        _generate(NoTiers(FakeLLM({})))
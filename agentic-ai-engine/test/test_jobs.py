@@ -0,0 +1,218 @@
+import asyncio
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from app.models.agent_schemas import JobResponse, RunAgentsRequest
+from app.services.agent_base import AgentResponse
+from app.services.jobs import JobManager, JobQueueFull, JobStore
+from app.services.orchestrator import Orchestrator
+
+
+class FakeAgent:
+    depends_on = ()
+
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+
+    async def run(self, req):
+        await asyncio.sleep(self.delay)
+        return AgentResponse(agent=self.name, summary=self.name, result={"from": self.name})
+
+
+class FixedRouter:
+    def decide(self, goal, preferred=None):
+        return ["smart_program", "economy"], {}
+
+
+def _manager(tmp_path, workers=1, queue_max=10):
+    agents = {"smart_program": FakeAgent("smart_program", delay=0.03), "economy": FakeAgent("economy")}
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_s=3600)
+    return JobManager(Orchestrator(agents, FixedRouter()), store, workers=workers, queue_max=queue_max)
+
+
+def test_job_runs_in_the_background_and_is_persisted(tmp_path):
+    jobs = _manager(tmp_path)
+
+    async def main():
+        await jobs.start()
+        created = await jobs.submit(RunAgentsRequest(goal="goal", context={"user": "u1"}))
+        assert created["status"] == "queued"
+
+        seen = []
+        while True:
+            job = await jobs.get(created["job_id"])
+            seen.append(job["status"])
+            if job["status"] == "done":
+                break
+            await jobs.wait(created["job_id"], 1)
+        await jobs.stop()
+        return created, seen
+
+    created, seen = asyncio.run(main())
+
+    # A fresh store stands in for another gunicorn worker.
+    job = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_s=3600).get(created["job_id"])
+    parsed = JobResponse(**job)
+    assert parsed.trace_id == created["trace_id"] == parsed.result["trace_id"]
+    assert [s.agent for s in parsed.steps] == ["economy", "smart_program"]
+    assert parsed.request.context == {"user": "u1"}
+    assert set(parsed.result["artifacts"]) == {"smart_program", "economy"}
+    assert "running" in seen or "queued" in seen
+
+
+def test_full_queue_is_rejected(tmp_path):
+    jobs = _manager(tmp_path, queue_max=1)
+
+    async def main():
+        # Workers not started: the first job waits, the second is refused.
+        await jobs.submit(RunAgentsRequest(goal="goal"))
+        with pytest.raises(JobQueueFull):
+            await jobs.submit(RunAgentsRequest(goal="goal"))
+        await jobs.stop()
+
+    asyncio.run(main())
+
+    statuses = [row[0] for row in jobs.store._connect().execute("SELECT status FROM jobs")]
+    assert statuses == ["interrupted"]
+
+
+def test_jobs_of_a_dead_worker_are_marked_interrupted(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_s=3600)
+    store.create("j1", "t1", {"goal": "goal"})
+    store.start("j1")
+    store.add_step("j1", {"agent": "economy", "summary": "s", "result": {}})
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    store._connect().execute("UPDATE jobs SET worker_pid = ? WHERE id = 'j1'", (dead.pid,))
+
+    assert store.interrupt_orphans() == 1
+    job = store.get("j1")
+    assert job["status"] == "interrupted"
+    assert [s["agent"] for s in job["steps"]] == ["economy"]
+
+
+def test_running_job_can_be_watched_through_the_hub(tmp_path):
+    from app.services.live_runs import LiveRuns
+
+    agents = {"economy": FakeAgent("economy", delay=0.05)}
+
+    class OneAgent:
+        def decide(self, goal, preferred=None):
+            return ["economy"], {}
+
+    async def main():
+        hub = LiveRuns(buffer_size=100, grace_s=0.01)
+        store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_s=3600)
+        jobs = JobManager(Orchestrator(agents, OneAgent()), store, workers=1, queue_max=10, hub=hub)
+        await jobs.start()
+        created = await jobs.submit(RunAgentsRequest(goal="goal"))
+        while hub.get(created["trace_id"]) is None:
+            await asyncio.sleep(0.005)
+        events = [e async for _, e in hub.get(created["trace_id"]).events()]
+        await jobs.stop()
+        return events
+
+    events = asyncio.run(main())
+
+    assert [e["type"] for e in events] == ["router_update", "agent_start", "agent_done", "done"]
+    assert events[-1]["status"] == "done"
+
+
+def test_concurrent_submits_do_not_overfill_the_queue(tmp_path):
+    jobs = _manager(tmp_path, queue_max=1)
+
+    async def main():
+        results = await asyncio.gather(
+            jobs.submit(RunAgentsRequest(goal="goal")),
+            jobs.submit(RunAgentsRequest(goal="goal")),
+            return_exceptions=True,
+        )
+        await jobs.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert sum(isinstance(r, JobQueueFull) for r in results) == 1
+    statuses = [row[0] for row in jobs.store._connect().execute("SELECT status FROM jobs")]
+    assert statuses == ["interrupted"]
+
+
+def test_waiting_on_a_finished_or_foreign_job_keeps_no_event(tmp_path):
+    jobs = _manager(tmp_path)
+
+    async def main():
+        await jobs.start()
+        created = await jobs.submit(RunAgentsRequest(goal="goal"))
+        while (await jobs.get(created["job_id"]))["status"] != "done":
+            await jobs.wait(created["job_id"], 1)
+        await jobs.wait(created["job_id"], 0.01)
+        await jobs.wait("another-workers-job", 0.01)
+        await jobs.stop()
+
+    asyncio.run(main())
+
+    assert jobs._changed == {}
+
+
+def test_store_errors_do_not_stop_the_worker(tmp_path):
+    jobs = _manager(tmp_path)
+    real_start = jobs.store.start
+    calls = []
+
+    def flaky_start(job_id):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        real_start(job_id)
+
+    jobs.store.start = flaky_start
+
+    async def main():
+        await jobs.start()
+        first = await jobs.submit(RunAgentsRequest(goal="goal"))
+        second = await jobs.submit(RunAgentsRequest(goal="goal"))
+        while (await jobs.get(second["job_id"]))["status"] != "done":
+            await jobs.wait(second["job_id"], 1)
+        failed = await jobs.get(first["job_id"])
+        await jobs.stop()
+        return failed
+
+    failed = asyncio.run(main())
+
+    assert failed["status"] == "failed"
+    assert "database is locked" in failed["error"]
+
+
+def test_event_stream_ends_when_the_job_is_pruned(monkeypatch):
+    from app.api.routes import jobs as routes
+
+    class PrunedJobs:
+        calls = 0
+
+        async def get(self, job_id, after_seq=0):
+            self.calls += 1
+            if self.calls > 2:
+                return None
+            return {"trace_id": "t", "status": "running", "steps": [], "error": None}
+
+        async def wait(self, job_id, timeout):
+            pass
+
+    class Connected:
+        async def is_disconnected(self):
+            return False
+
+    monkeypatch.setattr(routes, "get_jobs", lambda: PrunedJobs())
+
+    async def main():
+        response = await routes.job_events(Connected(), "j1", None, None)
+        return [chunk async for chunk in response.body_iterator]
+
+    frames = asyncio.run(main())
+
+    assert len(frames) == 2
+    assert '"type": "done"' in frames[-1] and '"status": "expired"' in frames[-1]
@@ -0,0 +1,72 @@
+import json
+import random
+
+from app.services.agents.economy import EconomyAgent
+from app.utils.json_stream import PartialJSONParser
+
+
+def _feed_in_chunks(parser, text, seed):
+    rng = random.Random(seed)
+    out = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 7)
+        out.extend(parser.feed(text[i:i + step]))
+        i += step
+    return out
+
+
+def test_emits_rows_as_they_close():
+    payload = {
+        "tokenomics": {
+            "name": "Demo",
+            "distribution": [
+                {"category": "Team \"core\"", "percent": 20, "vesting": {"cliff_months": 12}},
+                {"category": "Community {x}", "percent": 80, "vesting": {"cliff_months": 0}},
+            ],
+            "notes": "]} inside a string",
+        }
+    }
+    text = "Here you go:\n```json\n" + json.dumps(payload) + "\n```"
+
+    for seed in range(20):
+        parser = PartialJSONParser(["tokenomics.distribution.*"])
+        out = _feed_in_chunks(parser, text, seed)
+
+        assert out == [
+            (["tokenomics", "distribution", 0], payload["tokenomics"]["distribution"][0]),
+            (["tokenomics", "distribution", 1], payload["tokenomics"]["distribution"][1]),
+        ]
+        assert parser.done
+
+
+def test_scalar_and_keyed_values():
+    parser = PartialJSONParser(["files.*", "score"])
+    out = parser.feed('{"score": 72, "files": {"src/lib.rs": "fn main() {}", "a\\"b": "x"}}')
+
+    assert out == [
+        (["score"], 72),
+        (["files", "src/lib.rs"], "fn main() {}"),
+        (["files", 'a"b'], "x"),
+    ]
+
+
+def test_buffer_does_not_grow_with_unwatched_text():
+    parser = PartialJSONParser(["rows.*"])
+    parser.feed('{"notes": "' + "x" * 10000 + '", "rows": [')
+
+    assert len(parser._text) < 100
+
+
+def test_economy_row_validation():
+    agent = EconomyAgent.__new__(EconomyAgent)
+
+    ok, _ = agent.validate_partial(
+        ["tokenomics", "distribution", 0],
+        {"category": "Team", "percent": 20, "rationale": "r", "vesting": {"type": "linear", "cliff_months": 0, "duration_months": 12}},
+    )
+    bad, reason = agent.validate_partial(["tokenomics", "distribution", 1], {"category": "Team", "percent": -1})
+
+    assert ok
+    assert not bad
+    assert reason.startswith("distribution[1]")
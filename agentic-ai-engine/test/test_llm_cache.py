@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from app.core.metrics import metrics
+from app.services.llm_cache import LLMCache, cache_key
+
+
+def test_cache_key_depends_on_effort():
+    a = cache_key("gpt-5", "sys", "user", "high")
+    b = cache_key("gpt-5", "sys", "user", "low")
+    assert a != b
+    assert a == cache_key("gpt-5", "sys", "user", "high")
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def main():
+        first = LLMCache(path=path, memory_entries=4, disk_entries=10, ttl_s=60)
+        await first.put("k", "value")
+
+        # A second instance stands in for another gunicorn worker.
+        second = LLMCache(path=path, memory_entries=4, disk_entries=10, ttl_s=60)
+        hits_before = metrics.get("llm_cache.hit.disk")
+        assert await second.get("k") == "value"
+        assert metrics.get("llm_cache.hit.disk") == hits_before + 1
+
+        await second.delete("k")
+        assert await LLMCache(path=path, memory_entries=4, disk_entries=10, ttl_s=60).get("k") is None
+
+    asyncio.run(main())
+
+
+def test_memory_lru_and_ttl(tmp_path):
+    async def main():
+        cache = LLMCache(path="", memory_entries=2, disk_entries=0, ttl_s=0.05)
+        await cache.put("a", "1")
+        await cache.put("b", "2")
+        await cache.get("a")
+        await cache.put("c", "3")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "1"
+
+        time.sleep(0.06)
+        assert await cache.get("a") is None
+
+    asyncio.run(main())
+
+
+def test_disk_size_cap(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def main():
+        cache = LLMCache(path=path, memory_entries=0, disk_entries=2, ttl_s=60)
+        for k in ("a", "b", "c"):
+            await cache.put(k, k)
+            time.sleep(0.01)
+
+        assert await cache.get("a") is None
+        assert await cache.get("c") == "c"
+
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_limiter import LLMLimiter, LLMOverloaded
+
+
+def test_interactive_waiters_go_first():
+    order = []
+
+    async def call(limiter, name, priority):
+        async with limiter.slot("m", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        limiter = LLMLimiter(default_limit=1, max_queue=10, max_wait_s=5)
+        first = asyncio.create_task(call(limiter, "first", "batch"))
+        await asyncio.sleep(0)
+        rest = [
+            asyncio.create_task(call(limiter, "batch-1", "batch")),
+            asyncio.create_task(call(limiter, "batch-2", "batch")),
+            asyncio.create_task(call(limiter, "interactive", "interactive")),
+        ]
+        await asyncio.gather(first, *rest)
+        return limiter.report()
+
+    report = asyncio.run(main())
+
+    assert order == ["first", "interactive", "batch-1", "batch-2"]
+    assert report["m"]["active"] == 0
+
+
+def test_sheds_when_queue_is_full():
+    async def main():
+        limiter = LLMLimiter(default_limit=1, max_queue=1, max_wait_s=5)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot("m"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        assert limiter.saturated()
+        with pytest.raises(LLMOverloaded):
+            async with limiter.slot("m"):
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return limiter.saturated()
+
+    assert asyncio.run(main()) is False
+
+
+def test_sheds_after_max_wait_and_frees_the_lane():
+    async def main():
+        limiter = LLMLimiter(default_limit=1, max_queue=5, max_wait_s=0.02)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot("m"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(LLMOverloaded):
+            async with limiter.slot("m"):
+                pass
+
+        depth = limiter.report()["m"]["queued_batch"]
+        release.set()
+        await holder
+        return depth
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+from app.core.loop_monitor import LoopMonitor
+
+
+async def _blocking_agent_run():
+    time.sleep(0.3)
+
+
+def test_loop_monitor_names_blocking_coroutine():
+    async def main():
+        monitor = LoopMonitor(interval_s=0.02, threshold_s=0.05)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await _blocking_agent_run()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor.report()
+
+    report = asyncio.run(main())
+
+    assert report["stall_count"] >= 1
+    assert report["max_lag_ms"] >= 200
+    assert report["p99_lag_ms"] > 0
+    assert "_blocking_agent_run" in report["worst_stall"]["coroutine"]
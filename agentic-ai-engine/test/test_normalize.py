@@ -0,0 +1,65 @@
+from app.services.agents.economy import _normalize_tokenomics, _validate_tokenomics
+from app.services.agents.indexer import _normalize_risk_payload
+from app.utils.normalize import as_int, as_number, rescale_percents, uint_string
+
+
+def _row(category, percent):
+    return {
+        "category": category,
+        "percent": percent,
+        "rationale": "r",
+        "vesting": {"type": "linear", "cliff_months": "0", "duration_months": 12},
+    }
+
+
+def test_number_helpers():
+    assert as_int("18") == 18
+    assert as_int("1e18") == 10 ** 18
+    assert as_int("1,000,000") == 1000000
+    assert as_int("1,5") is None
+    assert as_int("1.5") is None
+    assert as_int(True) is None
+    assert as_number("72") == 72
+    assert as_number("40%") == 40
+    assert uint_string(1e21) == "1" + "0" * 21
+    assert uint_string("-1") is None
+    assert sum(rescale_percents([33.33, 33.33, 33.33])) == 100
+
+
+def test_tokenomics_near_miss_is_fixed_locally():
+    payload = {
+        "tokenomics": {
+            "name": "Demo",
+            "symbol": "DMO",
+            "total_supply": "1,000,000",
+            "decimals": "18",
+            "distribution": [_row("A", "40"), _row("B", 30), _row("C", 31)],
+            "assumptions": [],
+            "notes": "",
+        }
+    }
+
+    fixups = _normalize_tokenomics(payload)
+
+    assert _validate_tokenomics(payload) == (True, "ok")
+    assert payload["tokenomics"]["decimals"] == 18
+    assert payload["tokenomics"]["total_supply"] == "1000000"
+    assert any("rescaled from 101" in f for f in fixups)
+
+
+def test_tokenomics_far_off_total_is_left_for_the_validator():
+    payload = {"tokenomics": {"distribution": [_row("A", 50), _row("B", 30), _row("C", 10)]}}
+
+    fixups = _normalize_tokenomics(payload)
+
+    assert [r["percent"] for r in payload["tokenomics"]["distribution"]] == [50, 30, 10]
+    assert not any("rescaled" in f for f in fixups)
+
+
+def test_risk_score_strings():
+    payload = {"risk_analysis": {"overall_risk_score": "72", "risk_level": "High", "dimensions": {"liquidity": "40"}}}
+
+    fixups = _normalize_risk_payload(payload)
+
+    assert payload["risk_analysis"] == {"overall_risk_score": 72, "risk_level": "high", "dimensions": {"liquidity": 40}}
+    assert len(fixups) == 3
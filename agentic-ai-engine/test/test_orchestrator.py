@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+from app.services.agent_base import AgentResponse
+from app.services.orchestrator import Orchestrator, plan
+
+
+class FakeAgent:
+    def __init__(self, name, delay=0.0, depends_on=(), log=None):
+        self.name = name
+        self.delay = delay
+        self.depends_on = depends_on
+        self.log = log if log is not None else []
+        self.seen = None
+
+    async def run(self, req):
+        self.seen = dict(req.artifacts)
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.name))
+        return AgentResponse(agent=self.name, summary=self.name, result={"from": self.name})
+
+
+class FixedRouter:
+    def __init__(self, targets):
+        self.targets = targets
+
+    def decide(self, goal, preferred=None):
+        return self.targets, {}
+
+
+def _run(agents, targets):
+    orch = Orchestrator({a.name: a for a in agents}, FixedRouter(targets))
+    return asyncio.run(orch.run("goal", [], {}, None))
+
+
+def test_dependents_wait_and_receive_upstream_artifacts():
+    log = []
+    a = FakeAgent("smart_program", delay=0.02, log=log)
+    b = FakeAgent("economy", delay=0.01, log=log)
+    c = FakeAgent("frontend", depends_on=("smart_program",), log=log)
+
+    resp = _run([a, b, c], ["smart_program", "economy", "frontend"])
+
+    # Independent agents overlap; the dependent starts only after its input.
+    assert log[:2] == [("start", "smart_program"), ("start", "economy")]
+    assert log.index(("start", "frontend")) > log.index(("end", "smart_program"))
+    assert c.seen == {"smart_program": {"from": "smart_program"}}
+    assert b.seen == {}
+    assert [s.agent for s in resp.steps] == ["smart_program", "economy", "frontend"]
+    assert set(resp.artifacts) == {"smart_program", "economy", "frontend"}
+
+
+def test_dependencies_outside_the_targets_are_ignored():
+    c = FakeAgent("frontend", depends_on=("smart_program",))
+
+    resp = _run([FakeAgent("smart_program"), c], ["frontend"])
+
+    assert [s.agent for s in resp.steps] == ["frontend"]
+    assert c.seen == {}
+
+
+def test_cycles_are_rejected():
+    agents = {
+        "server": FakeAgent("server", depends_on=("frontend",)),
+        "frontend": FakeAgent("frontend", depends_on=("server",)),
+    }
+
+    with pytest.raises(ValueError):
+        plan(agents, ["server", "frontend"])
+
+
+class FailingAgent(FakeAgent):
+    def __init__(self, name, exc, **kw):
+        super().__init__(name, **kw)
+        self.exc = exc
+
+    async def run(self, req):
+        raise self.exc
+
+
+def test_slow_and_failing_agents_do_not_sink_the_others():
+    agents = [
+        FakeAgent("smart_program", delay=5),
+        FailingAgent("server", RuntimeError("boom")),
+        FakeAgent("economy"),
+        FakeAgent("frontend", depends_on=("server",)),
+    ]
+    orch = Orchestrator({a.name: a for a in agents}, FixedRouter(["smart_program", "server", "economy", "frontend"]))
+
+    resp = asyncio.run(orch.run("goal", [], {}, None, agent_timeouts={"smart_program": 0.05}))
+
+    status = {s.agent: s.status for s in resp.steps}
+    assert status == {"smart_program": "timeout", "server": "error", "economy": "ok", "frontend": "ok"}
+    timed_out = resp.steps[0]
+    assert 0.04 <= timed_out.duration_s < 1
+    assert resp.steps[1].error == "RuntimeError: boom"
+    assert set(resp.artifacts) == {"economy", "frontend"}
+    # The dependent still ran, just without the failed agent's artifact.
+    assert agents[3].seen == {}
+
+
+def test_request_deadlines_cannot_exceed_the_server_limit(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AGENT_TIMEOUT_S", 30.0)
+    monkeypatch.setattr(settings, "AGENT_TIMEOUTS", {"economy": 10.0})
+
+    assert Orchestrator.timeout_for("server") == 30.0
+    assert Orchestrator.timeout_for("economy", timeout_s=60) == 10.0
+    assert Orchestrator.timeout_for("server", timeout_s=5, agent_timeouts={"server": 2}) == 2
+
+
+@pytest.mark.parametrize("value", [0, -1])
+def test_per_agent_timeouts_must_be_positive(value):
+    from pydantic import ValidationError
+
+    from app.models.agent_schemas import RunAgentsRequest
+
+    with pytest.raises(ValidationError):
+        RunAgentsRequest(goal="goal", agent_timeouts={"server": value})
+
+
+def test_all_agents_shed_by_the_limiter_is_a_429():
+    from app.services.llm_limiter import LLMOverloaded
+
+    agents = [FailingAgent("economy", LLMOverloaded("gpt-5", "queue full"))]
+    orch = Orchestrator({a.name: a for a in agents}, FixedRouter(["economy"]))
+
+    with pytest.raises(LLMOverloaded):
+        asyncio.run(orch.run("goal", [], {}, None))
+
+
+def test_steps_are_emitted_as_agents_finish():
+    agents = [FakeAgent("smart_program", delay=0.05), FakeAgent("economy")]
+    orch = Orchestrator({a.name: a for a in agents}, FixedRouter(["smart_program", "economy"]))
+    events = []
+
+    async def emit(event):
+        events.append(event)
+
+    resp = asyncio.run(orch.run("goal", [], {}, None, emit=emit))
+
+    steps = [e for e in events if e["type"] == "agent_step"]
+    assert [e["step"]["agent"] for e in steps] == ["economy", "smart_program"]
+    assert [e["type"] for e in events[:3]] == ["router_update", "agent_start", "agent_start"]
+    assert all(e["trace_id"] == resp.trace_id for e in events)
+    # The response keeps the routed order.
+    assert [s.agent for s in resp.steps] == ["smart_program", "economy"]
+
+
+def test_ndjson_stream_writes_steps_then_a_summary():
+    import json
+
+    from app.api.routes.agents import stream_run
+    from app.models.agent_schemas import RunAgentsRequest
+
+    agents = [FakeAgent("smart_program", delay=0.05), FailingAgent("economy", RuntimeError("boom"))]
+    orch = Orchestrator({a.name: a for a in agents}, FixedRouter(["smart_program", "economy"]))
+
+    async def collect():
+        return [json.loads(line) async for line in stream_run(orch, RunAgentsRequest(goal="goal"))]
+
+    records = asyncio.run(collect())
+
+    assert [(r["type"], r.get("agent")) for r in records] == [
+        ("step", "economy"),
+        ("step", "smart_program"),
+        ("summary", None),
+    ]
+    assert records[0]["status"] == "error"
+    assert records[2]["targets"] == ["smart_program", "economy"]
+    assert "steps" not in records[2]
+    assert set(records[2]["artifacts"]) == {"smart_program"}
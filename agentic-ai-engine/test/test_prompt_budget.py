@@ -0,0 +1,80 @@
+from app.services import prompt_budget
+from app.services.prompt_budget import PromptPart, count_tokens, pack
+
+
+def test_code_costs_more_than_a_character_estimate():
+    rust = "impl<'a> FactoryService<'a> { fn get(&self) -> Ref<'_, Storage> { self.s.borrow() } }"
+
+    assert count_tokens(rust) > len(rust) // 4
+    assert count_tokens("") == 0
+
+
+def test_heuristic_is_used_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "tiktoken", None)
+
+    assert count_tokens("hello, world") == 5  # hel|lo , wor|ld
+
+
+def test_unavailable_encoding_is_not_retried(monkeypatch):
+    calls = []
+
+    class Offline:
+        def encoding_for_model(self, model):
+            calls.append(model)
+            raise OSError("no network")
+
+    monkeypatch.setattr(prompt_budget, "tiktoken", Offline())
+    monkeypatch.setattr(prompt_budget, "_encoding_failed", False)
+    prompt_budget._encoding.cache_clear()
+
+    assert count_tokens("hello, world") == 5
+    assert count_tokens("hello, world", model="gpt-5") == 5
+    assert len(calls) == 1
+    prompt_budget._encoding.cache_clear()
+
+
+def test_within_budget_nothing_is_trimmed():
+    packed = pack([PromptPart("system", "be brief", required=True), PromptPart("goal", "a token")], budget=1000)
+
+    assert packed.trimmed == []
+    assert packed["goal"] == "a token"
+    assert packed.total == count_tokens("be brief") + count_tokens("a token")
+
+
+def test_chunks_go_before_text_and_by_priority():
+    chunks = ["\nfn one() {}" * 20, "\nfn two() {}" * 20, "\nfn three() {}" * 20]
+    parts = [
+        PromptPart("system", "system prompt", required=True),
+        PromptPart("goal", "build an escrow contract " * 10, priority=1),
+        PromptPart("training", chunks=chunks),
+    ]
+    full = pack(parts, budget=10 ** 6).total
+    last_chunk = count_tokens(chunks[-1])
+
+    packed = pack(parts, budget=full - last_chunk)
+
+    assert packed.trimmed == ["training"]
+    assert packed["training"] == chunks[0] + chunks[1]
+    assert packed["goal"].startswith("build")
+    assert packed.total <= packed.budget
+
+
+def test_text_is_cut_when_chunks_are_not_enough():
+    parts = [
+        PromptPart("system", "system prompt", required=True),
+        PromptPart("goal", "word " * 400, priority=1),
+        PromptPart("training", chunks=["x" * 40]),
+    ]
+
+    packed = pack(parts, budget=60)
+
+    assert packed["training"] == ""
+    assert packed["goal"].endswith("[...trimmed...]")
+    assert packed.total <= 60
+
+
+def test_required_parts_are_never_cut():
+    packed = pack([PromptPart("schema", "field " * 100, required=True)], budget=10)
+
+    assert packed["schema"] == "field " * 100
+    assert packed.total > packed.budget
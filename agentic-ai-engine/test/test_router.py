@@ -0,0 +1,50 @@
+from app.services.router import AgentRouter
+from app.utils.keywords import KeywordMatcher
+
+
+def test_keywords_match_on_token_boundaries():
+    m = KeywordMatcher({"risk": ["il", "impermanent loss"], "ui": ["ui", "chart"]})
+
+    assert m.groups("Build a guild app") == set()
+    assert m.matches("IL and impermanent losses on the charts") == {
+        "risk": ["il", "impermanent loss"],
+        "ui": ["chart"],
+    }
+
+
+def test_overlapping_phrases_are_all_found():
+    m = KeywordMatcher({"a": ["smart contract"], "b": ["smart contract risk"]})
+
+    assert m.groups("assess smart  contract risk") == {"a", "b"}
+    assert m.groups("smart people, contract risk") == set()
+
+
+def test_build_no_longer_launches_the_risk_agent():
+    assert AgentRouter().route("Build a simple counter program in Rust") == ["smart_program"]
+    assert "indexer" in AgentRouter().route("Analyze IL risk for our pool")
+
+
+def test_only_confident_agents_are_launched():
+    router = AgentRouter(threshold=0.5)
+
+    targets, scores = router.decide("Design the tokenomics and vesting for a staking dApp with a React UI")
+
+    assert targets == ["frontend", "economy"]
+    assert scores["economy"] > scores["frontend"] >= 0.5
+    assert scores["indexer"] == 0.0
+
+
+def test_weak_hits_need_company():
+    router = AgentRouter(threshold=0.5)
+
+    assert router.decide("fix it")[0] == ["smart_program"]  # best guess below threshold
+    assert router.score("fix it")["smart_program"] < 0.5
+    assert router.score("refactor and fix the tests")["smart_program"] >= 0.5
+    assert router.route("hello there") == ["smart_program"]
+
+
+def test_preferred_agents_are_not_padded_with_economy():
+    targets, scores = AgentRouter().decide("a dashboard", ["frontend"])
+
+    assert targets == ["frontend"]
+    assert scores["frontend"] > 0
@@ -0,0 +1,110 @@
+import asyncio
+
+from app.core.metrics import metrics
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        flight = SingleFlight("test.sf.share")
+        results = await asyncio.gather(*(flight.do("k", upstream) for _ in range(3)))
+        return results
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["result"] * 3
+    assert sorted(c for _, c in results) == [False, True, True]
+    assert metrics.get("test.sf.share.coalesced") == 2
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        flight = SingleFlight("test.sf.detach")
+        first = asyncio.create_task(flight.do("k", upstream))
+        second = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    (result, _), first_cancelled = asyncio.run(main())
+
+    assert result == "result"
+    assert first_cancelled
+
+
+def test_upstream_cancelled_when_last_waiter_leaves():
+    state = {}
+
+    async def upstream():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def main():
+        flight = SingleFlight("test.sf.cancel")
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        # A new caller starts a fresh upstream call instead of joining the cancelled one.
+        async def fresh():
+            return "fresh"
+
+        return await flight.do("k", fresh)
+
+    result = asyncio.run(main())
+
+    assert state.get("cancelled")
+    assert result == ("fresh", False)
+
+
+def test_followers_replay_shared_feed():
+    from app.services.llm_client import DeltaFeed
+
+    async def main():
+        flight = SingleFlight("test.sf.feed")
+        feed = DeltaFeed()
+        seen = {"a": [], "b": []}
+
+        async def upstream():
+            try:
+                for part in ("he", "llo"):
+                    feed.push(part)
+                    await asyncio.sleep(0.01)
+                return "hello"
+            finally:
+                feed.close()
+
+        def follower(name):
+            async def follow(shared):
+                async for delta in shared.follow():
+                    seen[name].append(delta)
+            return follow
+
+        first = asyncio.create_task(flight.do("k", upstream, state=feed, follow=follower("a")))
+        await asyncio.sleep(0.005)
+        second = await flight.do("k", upstream, state=DeltaFeed(), follow=follower("b"))
+        return await first, second, seen
+
+    first, second, seen = asyncio.run(main())
+
+    assert first == ("hello", False)
+    assert second == ("hello", True)
+    assert "".join(seen["a"]) == "".join(seen["b"]) == "hello"
@@ -0,0 +1,68 @@
+from app.services.training_compact import build_artifact, compact_corpus, compact_text
+from app.services.training_corpus import TrainingCorpus
+
+RUST = """\
+// Licensed under MIT.
+/* Factory
+   contract */
+use sails_rs::prelude::*;
+
+
+pub fn url() -> &'static str {
+    "https://example.com//path"   // keep the string
+}
+"""
+
+SERVICE = """\
+pub struct EscrowService {
+    storage: RefCell<Storage>,
+    owner: ActorId,
+    buyer: ActorId,
+    seller: ActorId,
+    arbiter: Option<ActorId>,
+    amount: u128,
+    deadline: u64,
+    released: bool,
+    disputed: bool,
+    fee_bps: u16,
+}
+"""
+
+
+def test_comments_and_blank_lines_are_stripped():
+    out = compact_text(RUST)
+
+    assert "Licensed" not in out and "Factory" not in out and "keep the" not in out
+    assert '"https://example.com//path"' in out
+    assert "\n\n\n" not in out
+    assert out.startswith("use sails_rs")
+
+
+def test_near_duplicate_blocks_are_dropped_across_files():
+    near = SERVICE.replace("fee_bps: u16", "fee_bps: u32")
+    out = compact_corpus({"a/2.txt": SERVICE + "\nfn a() {}\n", "a/10.txt": near + "\nfn b() {}\n"})
+
+    assert "EscrowService" in out["a/2.txt"]
+    assert out["a/10.txt"] == "fn b() {}"
+    assert compact_corpus({"x.txt": SERVICE, "y.txt": SERVICE})["y.txt"] is None
+
+
+def test_corpus_serves_the_artifact_until_a_file_changes(tmp_path):
+    root = tmp_path / "training_data"
+    root.mkdir()
+    (root / "a.txt").write_text(RUST + "\n" + SERVICE, encoding="utf-8")
+    (root / "b.txt").write_text(SERVICE, encoding="utf-8")
+    artifact = str(tmp_path / "compact.json")
+    build_artifact(str(root), artifact)
+
+    corpus = TrainingCorpus(str(root), check_interval_s=0, compact_path=artifact)
+    corpus.refresh()
+
+    assert list(corpus.snapshot()) == ["a.txt"]
+    assert corpus.snapshot()["a.txt"].text == compact_text(RUST + "\n" + SERVICE)
+    assert corpus.refresh() == 0
+
+    (root / "b.txt").write_text("// edited after compaction\nfn b() {}\n", encoding="utf-8")
+    corpus.refresh()
+
+    assert corpus.snapshot()["b.txt"].text.startswith("// edited")
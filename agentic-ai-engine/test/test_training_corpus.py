@@ -0,0 +1,48 @@
+import os
+
+from app.services.training_corpus import TrainingCorpus
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_only_changed_files_are_reread(tmp_path):
+    _write(tmp_path / "a" / "one.txt", "one")
+    _write(tmp_path / "a" / "two.txt", "two")
+    _write(tmp_path / "a" / "nested" / "three.txt", "three")
+    _write(tmp_path / "a" / "skip.md", "not training data")
+
+    corpus = TrainingCorpus(str(tmp_path), check_interval_s=0)
+    assert corpus.refresh() == 3
+    before = corpus.snapshot()
+
+    assert [f.name for f in corpus.files("a")] == ["one.txt", "two.txt"]
+    assert len(corpus.files("a", recursive=True)) == 3
+
+    two = tmp_path / "a" / "two.txt"
+    two.write_text("two, edited", encoding="utf-8")
+    st = two.stat()
+    os.utime(two, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert corpus.refresh() == 1
+    after = corpus.snapshot()
+    assert after["a/two.txt"].text == "two, edited"
+    assert after["a/one.txt"] is before["a/one.txt"]
+    # The old snapshot is left untouched for readers that still hold it.
+    assert before["a/two.txt"].text == "two"
+
+
+def test_removed_files_drop_out(tmp_path):
+    _write(tmp_path / "x.txt", "x")
+    corpus = TrainingCorpus(str(tmp_path), check_interval_s=0)
+    corpus.refresh()
+    version = corpus.version
+
+    (tmp_path / "x.txt").unlink()
+
+    assert corpus.refresh() == 1
+    assert corpus.version == version + 1
+    assert corpus.files("") == []
+    assert corpus.refresh() == 0
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from app.core.metrics import metrics
+from app.services.training_corpus import CorpusFile, TrainingCorpus
+from app.services.training_index import TrainingIndex, chunk_file, tokenize
+
+
+def _corpus(tmp_path):
+    root = tmp_path / "training_data"
+    (root / "contracts").mkdir(parents=True)
+    (root / "contracts" / "2.data.txt").write_text(
+        "pub struct EscrowService {}\n\nfn release_funds() {}\n", encoding="utf-8"
+    )
+    (root / "contracts" / "10.data.txt").write_text(
+        "pub struct VotingService {}\n\nfn cast_vote(proposal: u64) {}\n", encoding="utf-8"
+    )
+    (root / "frontend").mkdir()
+    (root / "frontend" / "1.data.txt").write_text("export function useVote() {}\n", encoding="utf-8")
+    corpus = TrainingCorpus(str(root), check_interval_s=0)
+    corpus.refresh()
+    return corpus
+
+
+def test_tokenize_splits_identifiers():
+    assert set(tokenize("FactoryService create_program")) == {"factoryservice", "factory", "service", "create", "program"}
+
+
+def test_chunks_respect_size_and_line_numbers():
+    text = "\n".join(f"line {i}" for i in range(1, 41))
+    chunks = chunk_file(CorpusFile("a.txt", text, 0, len(text)), max_chars=60)
+
+    assert all(len(c.text) <= 60 for c in chunks)
+    assert chunks[0].start_line == 1
+    assert chunks[-1].end_line == 40
+    assert "\n".join(c.text for c in chunks) == text
+
+
+def test_search_ranks_by_goal_within_directory(tmp_path):
+    index = TrainingIndex(_corpus(tmp_path), str(tmp_path / "index.json"))
+
+    hits = index.search("a DAO where members vote on a proposal", directory="contracts", k=1)
+
+    assert [c.path for c in hits] == ["contracts/10.data.txt"]
+    assert all(c.path.startswith("contracts/") for c in index.search("vote", directory="contracts"))
+
+
+def test_no_overlap_falls_back_to_natural_file_order(tmp_path):
+    index = TrainingIndex(_corpus(tmp_path), str(tmp_path / "index.json"))
+
+    hits = index.search("zzz", directory="contracts")
+
+    assert [c.path for c in hits][:1] == ["contracts/2.data.txt"]
+
+
+def test_budget_caps_the_result(tmp_path):
+    index = TrainingIndex(_corpus(tmp_path), str(tmp_path / "index.json"))
+
+    assert index.search("service", k=10, budget_tokens=0) == []
+
+
+def test_persisted_index_is_reused(tmp_path):
+    corpus = _corpus(tmp_path)
+    path = str(tmp_path / "index.json")
+    first = TrainingIndex(corpus, path)
+    first.ensure()
+    loaded = metrics.get("training_index.loaded")
+
+    second = TrainingIndex(corpus, path)
+    second.ensure()
+
+    assert metrics.get("training_index.loaded") == loaded + 1
+    assert second.signature == first.signature
+    assert second.search("escrow") == first.search("escrow")
+
+
+def test_asearch_runs_off_the_event_loop(tmp_path):
+    corpus = _corpus(tmp_path)
+    index = TrainingIndex(corpus, str(tmp_path / "index.json"))
+    seen = []
+    original = corpus.snapshot
+
+    def snapshot():
+        seen.append(threading.current_thread() is threading.main_thread())
+        return original()
+
+    corpus.snapshot = snapshot
+    hits = asyncio.run(index.asearch("vote", directory="contracts", k=1))
+
+    assert [c.path for c in hits] == ["contracts/10.data.txt"]
+    assert seen and not any(seen)
@@ -2,10 +2,16 @@ import asyncio
 import json
 import time
 import uuid
-from fastapi import APIRouter, Request
+from contextlib import aclosing
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import StreamingResponse
 
-from app.services.agent_base import AgentRequest
+from app.api.routes.agents import require_llm_capacity
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.agent_schemas import RunAgentsRequest
+from app.services.live_runs import LiveRun, live_runs, parse_event_id, run_key, step_event
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -15,132 +21,181 @@ def get_orchestrator():
     return orchestrator
 
 
-def sse(event: dict) -> str:
-    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
-
+def sse(event: dict, event_id: Optional[str] = None) -> str:
+    frame = f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    return f"id: {event_id}\n{frame}" if event_id else frame
+
+
+class DeltaBatcher:
+    """
+    Buffers agent_delta events per agent and forwards them as one event
+    per flush interval, so token-sized frames don't flood the socket.
+    Other events (e.g. agent_partial) are forwarded immediately.
+    """
+
+    def __init__(self, publish: Callable[[Dict[str, Any]], None], trace_id: str, interval_s: float):
+        self.publish = publish
+        self.trace_id = trace_id
+        self.interval_s = interval_s
+        self._buffers: Dict[str, List[str]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+
+    async def emit(self, event: Dict[str, Any]) -> None:
+        if event.get("type") != "agent_delta":
+            # Keep the agent's text ahead of anything parsed out of it.
+            if "agent" in event:
+                self.flush(event["agent"])
+            self.publish({**event, "trace_id": self.trace_id})
+            return
+
+        agent = event["agent"]
+        self._buffers.setdefault(agent, []).append(event["delta"])
+        if agent not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[agent] = loop.call_later(self.interval_s, self.flush, agent)
+
+    def flush(self, agent: str) -> None:
+        timer = self._timers.pop(agent, None)
+        if timer is not None:
+            timer.cancel()
+
+        chunks = self._buffers.pop(agent, None)
+        if chunks:
+            self.publish({
+                "type": "agent_delta",
+                "trace_id": self.trace_id,
+                "agent": agent,
+                "delta": "".join(chunks),
+            })
 
-@router.get("/stream")
-async def stream_agents(request: Request, goal: str):
-    orch = get_orchestrator()
-    trace_id = str(uuid.uuid4())
+    def close(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._buffers.clear()
 
-    targets = orch.router.route(goal)
 
+async def drive_run(live: LiveRun, run_request: RunAgentsRequest) -> None:
+    """
+    Runs `run_request` through Orchestrator.run and publishes its events
+    to `live`, with agent_delta frames batched and a progress_tick every
+    5s. Ends with "done" (after "error" if the run itself failed).
+    """
+    orch = get_orchestrator()
+    trace_id = live.trace_id
     started_at = time.time()
 
-    agent_state = {
-        name: {
-            "status": "queued",   # queued | running | done | error
-            "started_at": None,
-            "elapsed_s": 0.0,
-        }
-        for name in targets
-    }
-
-    async def event_generator():
-        queue: asyncio.Queue = asyncio.Queue()
+    agent_state: Dict[str, Dict[str, Any]] = {}
+    batcher = DeltaBatcher(live.publish, trace_id, settings.SSE_DELTA_FLUSH_MS / 1000)
+
+    async def emit(event: Dict[str, Any]) -> None:
+        kind = event["type"]
+        if kind == "router_update":
+            for name in event["targets"]:
+                agent_state[name] = {
+                    "status": "queued",   # queued | running | done | error
+                    "started_at": None,
+                    "elapsed_s": 0.0,
+                }
+        elif kind == "agent_start":
+            agent_state[event["agent"]]["status"] = "running"
+            agent_state[event["agent"]]["started_at"] = time.time()
+        elif kind == "agent_step":
+            event = step_event(event["step"])
+            agent_state[event["agent"]]["status"] = "done" if event["type"] == "agent_done" else "error"
+        await batcher.emit(event)
+
+    async def progress_loop():
+        while True:
+            elapsed = round(time.time() - started_at, 1)
+
+            snapshot = {}
+            for name, state in agent_state.items():
+                if state["started_at"] and state["status"] == "running":
+                    state["elapsed_s"] = round(time.time() - state["started_at"], 1)
+
+                snapshot[name] = {
+                    "status": state["status"],
+                    "elapsed_s": state["elapsed_s"],
+                }
+
+            live.publish({
+                "type": "progress_tick",
+                "trace_id": trace_id,
+                "elapsed_s": elapsed,
+                "agents": snapshot,
+                "message": f"Working… elapsed {elapsed}s",
+            })
 
-        await queue.put({
-            "type": "router_update",
+            await asyncio.sleep(5)
+
+    progress_task = asyncio.create_task(progress_loop())
+    try:
+        await orch.run(
+            goal=run_request.goal,
+            constraints=run_request.constraints,
+            context=run_request.context,
+            preferred_agents=run_request.preferred_agents,
+            timeout_s=run_request.timeout_s,
+            agent_timeouts=run_request.agent_timeouts,
+            emit=emit,
+            deltas=True,
+            priority="interactive",
+            trace_id=trace_id,
+        )
+    except Exception as e:
+        live.publish({
+            "type": "error",
             "trace_id": trace_id,
-            "message": "Routing completed",
-            "targets": targets,
+            "error": f"{type(e).__name__}: {e}",
         })
+    finally:
+        batcher.close()
+        progress_task.cancel()
 
-        async def run_agent(agent_name: str):
-            agent = orch.agents[agent_name]
+    live.publish({
+        "type": "done",
+        "trace_id": trace_id,
+    })
 
-            agent_state[agent_name]["status"] = "running"
-            agent_state[agent_name]["started_at"] = time.time()
 
-            await queue.put({
-                "type": "agent_start",
-                "trace_id": trace_id,
-                "agent": agent_name,
-            })
+def start_run(run_request: RunAgentsRequest) -> LiveRun:
+    live = live_runs.create(str(uuid.uuid4()), key=run_key(run_request))
+    live.task = asyncio.create_task(drive_run(live, run_request))
+    live.task.add_done_callback(lambda _: live.close())
+    return live
 
-            try:
-                req = AgentRequest(
-                    trace_id=trace_id,
-                    goal=goal,
-                    constraints=[],
-                    context={},
-                    artifacts={},
-                )
-
-                result = await agent.run(req)
-
-                agent_state[agent_name]["status"] = "done"
-
-                await queue.put({
-                    "type": "agent_done",
-                    "trace_id": trace_id,
-                    "agent": agent_name,
-                    "summary": result.summary,
-                    "result": result.result,
-                })
-
-            except Exception as e:
-                agent_state[agent_name]["status"] = "error"
-
-                await queue.put({
-                    "type": "agent_error",
-                    "trace_id": trace_id,
-                    "agent": agent_name,
-                    "error": str(e),
-                })
-
-    
-        async def progress_loop():
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                elapsed = round(time.time() - started_at, 1)
-
-                snapshot = {}
-                for name, state in agent_state.items():
-                    if state["started_at"]:
-                        state["elapsed_s"] = round(time.time() - state["started_at"], 1)
-
-                    snapshot[name] = {
-                        "status": state["status"],
-                        "elapsed_s": state["elapsed_s"],
-                    }
-
-                await queue.put({
-                    "type": "progress_tick",
-                    "trace_id": trace_id,
-                    "elapsed_s": elapsed,
-                    "agents": snapshot,
-                    "message": f"Working… elapsed {elapsed}s",
-                })
-
-                await asyncio.sleep(5)
-
-        # ---- START TASKS
-        agent_tasks = [asyncio.create_task(run_agent(a)) for a in targets]
-        progress_task = asyncio.create_task(progress_loop())
-
-        remaining = len(agent_tasks)
-
-        try:
-            while remaining > 0:
-                event = await queue.get()
-                yield sse(event)
-
-                if event["type"] in ("agent_done", "agent_error"):
-                    remaining -= 1
-
-            yield sse({
-                "type": "done",
-                "trace_id": trace_id,
-            })
 
-        finally:
-            progress_task.cancel()
-            for t in agent_tasks:
-                t.cancel()
+def sse_run(run_request: RunAgentsRequest, last_event_id: Optional[str] = None) -> StreamingResponse:
+    """
+    Streams a run of `run_request`. When `last_event_id` names a run this
+    worker still holds, that is the rest of it; when an identical request
+    is already running, it is that run from its first event. Only
+    otherwise are agents started, so nothing is run twice.
+    """
+    resume = parse_event_id(last_event_id)
+    live = live_runs.get(resume[0]) if resume else None
+    if live is not None:
+        metrics.incr("sse.resumed")
+        return subscribe(live, resume[1])
+
+    live = live_runs.by_key(run_key(run_request))
+    if live is not None:
+        metrics.incr("sse.shared")
+        return subscribe(live)
+
+    # Only new work is turned away when the LLM queue is full.
+    require_llm_capacity()
+    return subscribe(start_run(run_request))
+
+
+def subscribe(live: LiveRun, after: int = 0) -> StreamingResponse:
+    """SSE of `live`'s events after `after`: its backlog, then live."""
+
+    async def event_generator():
+        async with aclosing(live.events(after)) as events:
+            async for seq, event in events:
+                yield sse(event, f"{live.trace_id}:{seq}")
 
     return StreamingResponse(
         event_generator(),
@@ -150,3 +205,46 @@ async def stream_agents(request: Request, goal: str):
             "Connection": "keep-alive",
         },
     )
+
+
+def _last_event_id(header: Optional[str], query: Optional[str]) -> Optional[str]:
+    # EventSource resends the header on its own reconnects; a client that
+    # reconnects by hand can pass the id as ?last_event_id= instead.
+    return header or query
+
+
+@router.get("/stream")
+async def stream_agents(
+    goal: str,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    return sse_run(RunAgentsRequest(goal=goal), _last_event_id(last_event_id_header, last_event_id))
+
+
+@router.post("/stream")
+async def stream_agents_post(
+    run_request: RunAgentsRequest,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """Like GET /agents/stream, with constraints, context, preferred_agents and deadlines."""
+    return sse_run(run_request, _last_event_id(last_event_id_header, last_event_id))
+
+
+@router.get("/stream/{trace_id}")
+async def watch_run(
+    trace_id: str,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Joins a run this worker is streaming (or a background job it is
+    running) by trace_id: its events so far, then live. Leaving never
+    stops a run someone else is still watching.
+    """
+    live = live_runs.get(trace_id)
+    if live is None:
+        raise HTTPException(status_code=404, detail="No live run with this trace_id")
+    resume = parse_event_id(_last_event_id(last_event_id_header, last_event_id))
+    return subscribe(live, resume[1] if resume and resume[0] == trace_id else 0)
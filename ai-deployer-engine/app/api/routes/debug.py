@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import metrics
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/loop")
+async def loop_lag():
+    return loop_monitor.report()
+
+
+@router.get("/metrics")
+async def runtime_metrics():
+    return metrics.snapshot()
+
+
+@router.get("/llm")
+async def llm_queues():
+    from app.main import llm
+    return llm.limiter.report()
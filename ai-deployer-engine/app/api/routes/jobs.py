@@ -0,0 +1,95 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.routes.agents_stream import sse
+from app.core.config import settings
+from app.models.agent_schemas import JobCreated, JobResponse, RunAgentsRequest
+from app.services.jobs import FINISHED, JobQueueFull
+from app.services.live_runs import parse_event_id, step_event
+
+router = APIRouter(prefix="/agents/jobs", tags=["agents"])
+
+
+def get_jobs():
+    from app.main import jobs
+    return jobs
+
+
+@router.post("", response_model=JobCreated, status_code=202)
+async def create_job(request: RunAgentsRequest):
+    """Queues the run and answers right away; poll or subscribe for progress."""
+    try:
+        return await get_jobs().submit(request)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Job queue full ({e}), retry later.",
+            headers={"Retry-After": "30"},
+        )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = await get_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    request: Request,
+    job_id: str,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    SSE: job_status on every status change, agent_done / agent_error for
+    each step (already finished ones first), then done. Event ids are
+    "<job_id>:<step>", so a reconnect with Last-Event-ID skips the steps
+    it has. Leaving does not stop the job.
+    """
+    jobs = get_jobs()
+    if await jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    resume = parse_event_id(last_event_id_header or last_event_id)
+
+    async def event_generator():
+        seq = resume[1] if resume and resume[0] == job_id else 0
+        status = None
+
+        while True:
+            job = await jobs.get(job_id, after_seq=seq)
+            if job is None:
+                # Pruned (JOB_TTL_S) while this client was watching.
+                yield sse({"type": "done", "job_id": job_id, "status": "expired", "error": "job no longer exists"}, f"{job_id}:{seq}")
+                return
+            base = {"trace_id": job["trace_id"], "job_id": job_id}
+
+            if job["status"] != status:
+                status = job["status"]
+                yield sse({"type": "job_status", **base, "status": status}, f"{job_id}:{seq}")
+
+            for step in job["steps"]:
+                seq = step.pop("seq")
+                yield sse({**step_event(step), **base}, f"{job_id}:{seq}")
+
+            if status in FINISHED:
+                yield sse({"type": "done", **base, "status": status, "error": job["error"]}, f"{job_id}:{seq}")
+                return
+
+            if await request.is_disconnected():
+                return
+            await jobs.wait(job_id, settings.JOB_POLL_S)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
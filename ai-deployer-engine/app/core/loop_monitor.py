@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+
+def _describe_frame(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    path = os.path.relpath(code.co_filename) if code.co_filename.startswith(os.getcwd()) else code.co_filename
+    return f"{name} ({path}:{frame.f_lineno})"
+
+
+def _find_culprit(frame) -> Dict[str, Optional[str]]:
+    """
+    Walks the loop thread's stack from the innermost frame outwards.
+    The first coroutine frame found is the one that is holding the loop
+    (it called something blocking without awaiting).
+    """
+    blocking_call = _describe_frame(frame) if frame is not None else None
+    coroutine = None
+
+    f = frame
+    while f is not None:
+        if f.f_code.co_flags & inspect.CO_COROUTINE:
+            coroutine = _describe_frame(f)
+            break
+        f = f.f_back
+
+    return {"coroutine": coroutine, "blocking_call": blocking_call}
+
+
+class LoopMonitor:
+    """
+    Measures event-loop stalls.
+
+    A heartbeat coroutine wakes every `interval_s`; the lag is how late it
+    woke up. A watchdog thread notices when the heartbeat is overdue and
+    samples the loop thread's stack, so each stall is attributed to the
+    coroutine that was running at that moment.
+    """
+
+    def __init__(
+        self,
+        interval_s: float = 0.1,
+        threshold_s: float = 0.1,
+        history: int = 2048,
+        max_stalls: int = 50,
+    ):
+        self.interval_s = interval_s
+        self.threshold_s = threshold_s
+
+        self._lags: Deque[float] = deque(maxlen=history)
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self._max_lag = 0.0
+        self._max_stall: Optional[Dict[str, Any]] = None
+        self._stall_count = 0
+
+        self._beat = time.perf_counter()
+        self._culprit: Optional[Dict[str, Optional[str]]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            self._beat = now
+            self._record(max(0.0, now - t0 - self.interval_s))
+
+    def _watch(self) -> None:
+        poll = max(self.threshold_s / 2, 0.01)
+        while not self._stop.wait(poll):
+            overdue = time.perf_counter() - self._beat - self.interval_s
+            if overdue < self.threshold_s or self._culprit is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            self._culprit = _find_culprit(frame)
+
+    def _record(self, lag: float) -> None:
+        self._lags.append(lag)
+        if lag > self._max_lag:
+            self._max_lag = lag
+
+        culprit, self._culprit = self._culprit, None
+        if lag < self.threshold_s:
+            return
+
+        stall = {
+            "lag_ms": round(lag * 1000, 1),
+            "at": time.time(),
+            **(culprit or {"coroutine": None, "blocking_call": None}),
+        }
+        self._stall_count += 1
+        self._stalls.append(stall)
+        if self._max_stall is None or lag * 1000 >= self._max_stall["lag_ms"]:
+            self._max_stall = stall
+
+    def report(self) -> Dict[str, Any]:
+        lags: List[float] = sorted(self._lags)
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval_s * 1000,
+            "threshold_ms": self.threshold_s * 1000,
+            "samples": len(lags),
+            "max_lag_ms": round(self._max_lag * 1000, 1),
+            "p99_lag_ms": round(p99 * 1000, 1),
+            "stall_count": self._stall_count,
+            "worst_stall": self._max_stall,
+            "recent_stalls": list(self._stalls)[::-1],
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval_s=settings.LOOP_MONITOR_INTERVAL_S,
+    threshold_s=settings.LOOP_STALL_THRESHOLD_S,
+)
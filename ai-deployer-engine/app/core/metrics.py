@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict
+
+
+class Metrics:
+    """
+    In-process counters, gauges and timing windows.
+    Values are per worker; /debug/metrics exposes a snapshot.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Deque[float]] = {}
+
+    def incr(self, name: str, value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0.0)
+
+    def gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            window = self._timings.get(name)
+            if window is None:
+                window = self._timings[name] = deque(maxlen=self._window)
+            window.append(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            timings = {name: sorted(values) for name, values in self._timings.items()}
+
+        summaries = {}
+        for name, values in timings.items():
+            if not values:
+                continue
+            n = len(values)
+            summaries[name] = {
+                "count": n,
+                "mean": round(sum(values) / n, 4),
+                "p50": round(values[n // 2], 4),
+                "p99": round(values[min(n - 1, int(n * 0.99))], 4),
+                "max": round(values[-1], 4),
+            }
+
+        return {"counters": counters, "gauges": gauges, "timings": summaries}
+
+
+metrics = Metrics()
@@ -1,17 +1,37 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import os
 
 from app.api import api_router
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
 from app.services.llm_client import LLMClient
+from app.services.llm_limiter import LLMOverloaded
 from app.services.router import AgentRouter
+from app.services.jobs import JobManager, JobStore
+from app.services.live_runs import live_runs
 from app.services.orchestrator import Orchestrator
 from app.services.agents import LiquidityAgent, VFTDeployerAgent
 
-app = FastAPI(title="Agentic AI Engine")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    await jobs.start()
+    yield
+    await jobs.stop()
+    await loop_monitor.stop()
+    await llm.aclose()
+
+
+app = FastAPI(title="Agentic AI Engine", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +44,16 @@ app.add_middleware(
 app.state.gateway_url = os.getenv("GATEWAY_URL", "http://localhost:9000")
 app.state.gateway_liquidity_url = os.getenv("GATEWAY_LIQUIDITY_URL", "http://localhost:9000")
 
+
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after_s))},
+    )
+
+
 # Shared dependencies
 llm = LLMClient()
 router = AgentRouter()
@@ -37,6 +67,14 @@ agents = {
 # Orchestrator gets the registry + router
 orchestrator = Orchestrator(agents, router)
 
+jobs = JobManager(
+    orchestrator,
+    JobStore(settings.JOBS_PATH, settings.JOB_TTL_S),
+    workers=settings.JOB_WORKERS,
+    queue_max=settings.JOB_QUEUE_MAX,
+    hub=live_runs,
+)
+
 # If your api_router needs orchestrator, expose it (optional pattern)
 app.state.orchestrator = orchestrator
 
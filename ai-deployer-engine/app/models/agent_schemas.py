@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional, Literal
+from typing import Annotated, Dict, Any, List, Optional, Literal
 from datetime import datetime
 
 AgentName = Literal[
@@ -12,11 +12,18 @@ class RunAgentsRequest(BaseModel):
     constraints: Dict[str, Any] = Field(default_factory=dict)
     context: Dict[str, Any] = Field(default_factory=dict)
     preferred_agents: Optional[List[AgentName]] = None
+    # Per-request deadlines in seconds: timeout_s for every agent,
+    # agent_timeouts for specific ones (capped by the server settings)
+    timeout_s: Optional[float] = Field(default=None, gt=0)
+    agent_timeouts: Dict[AgentName, Annotated[float, Field(gt=0)]] = Field(default_factory=dict)
 
 class AgentStep(BaseModel):
     agent: AgentName
     summary: str
     result: Dict[str, Any]
+    status: Literal["ok", "timeout", "error"] = "ok"
+    duration_s: float = 0.0
+    error: Optional[str] = None
 
 class RunAgentsResponse(BaseModel):
     trace_id: str
@@ -26,3 +33,24 @@ class RunAgentsResponse(BaseModel):
     steps: List[AgentStep]
     artifacts: Dict[str, Any]
     context: Dict[str, Any]
+
+JobStatus = Literal["queued", "running", "done", "failed", "interrupted"]
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: JobStatus
+    trace_id: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    trace_id: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    request: RunAgentsRequest
+    # Steps appear as their agents finish, in completion order
+    steps: List[AgentStep] = Field(default_factory=list)
+    # RunAgentsResponse without its steps, once the job is done
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
@@ -1,8 +1,21 @@
+import json
+import logging
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Dict, Any, List
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 
-from app.services.llm_client import LLMClient
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.llm_client import LLMClient, LLMResult
+from app.utils.json_stream import PartialJSONParser
+
+logger = logging.getLogger(__name__)
+
+Parse = Callable[[str], Optional[Dict[str, Any]]]
+Validate = Callable[[Dict[str, Any]], Tuple[bool, str]]
+# Fixes a payload in place; returns a description of each fixup applied
+Normalize = Callable[[Dict[str, Any]], List[str]]
 
 
 @dataclass
@@ -12,6 +25,10 @@ class AgentRequest:
     constraints: List[str]
     context: Dict[str, Any]
     artifacts: Dict[str, Any]
+    # Receives progress events (e.g. agent_delta) while the agent runs
+    emit: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    # LLM admission lane: "interactive" (streamed to a client) or "batch"
+    priority: str = "batch"
 
 
 @dataclass
@@ -21,11 +38,303 @@ class AgentResponse:
     result: Dict[str, Any]
 
 
+@dataclass(frozen=True)
+class ModelTier:
+    model: str
+    reasoning_effort: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "ModelTier":
+        """"gpt-5:high" -> ModelTier("gpt-5", "high")"""
+        model, _, effort = spec.partition(":")
+        return cls(model.strip(), effort.strip() or None)
+
+
+@dataclass
+class Generation:
+    """Outcome of BaseAgent.generate: the last attempt and how it got there."""
+    text: str
+    payload: Optional[Dict[str, Any]]
+    ok: bool
+    reason: str
+    tier: ModelTier
+    cached: bool
+    escalations: int = 0
+    repairs: int = 0
+    fixups: List[str] = field(default_factory=list)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "cached": self.cached,
+            "model": self.tier.model,
+            "escalations": self.escalations,
+            "repairs": self.repairs,
+            "fixups": self.fixups,
+        }
+
+
+_REPAIR_SYSTEM = (
+    "You repair JSON documents that failed schema validation. "
+    "Fix exactly the reported error and change nothing else. "
+    "Return ONLY the corrected JSON object: no markdown, no commentary."
+)
+
+
+def _check(
+    text: str,
+    parse: Parse,
+    validate: Validate,
+    normalize: Optional[Normalize],
+) -> Tuple[Optional[Dict[str, Any]], bool, str, List[str]]:
+    payload = parse(text)
+    if payload is None:
+        return None, False, "Output is not valid JSON.", []
+    fixups = normalize(payload) if normalize is not None else []
+    ok, reason = validate(payload)
+    return payload, ok, reason, fixups
+
+
 class BaseAgent(ABC):
     name: str
+    # Opt-out of the LLM response cache (also via LLM_CACHE_DISABLED_AGENTS)
+    use_llm_cache: bool = True
+    # Sub-objects published as agent_partial events as soon as they close
+    # in the streamed output, e.g. ("files.*",)
+    partial_paths: Tuple[str, ...] = ()
+    # Model cascade used by generate(), cheapest first. The last tier is
+    # the full-strength model; earlier ones are only kept if they validate.
+    model_tiers: Tuple[ModelTier, ...] = ()
+    # Agents whose results this one needs. When both run, the orchestrator
+    # starts this agent after them and passes their results in req.artifacts.
+    depends_on: Tuple[str, ...] = ()
 
     def __init__(self, llm: LLMClient):
         self.llm = llm
+        # Moving average of the last tier's latency, to estimate time saved;
+        # LLM_TOP_TIER_LATENCY_S stands in until the last tier has run
+        self._top_tier_latency: Optional[float] = None
+
+    @property
+    def cache_enabled(self) -> bool:
+        return self.use_llm_cache and self.name not in settings.LLM_CACHE_DISABLED_AGENTS
+
+    @property
+    def tiers(self) -> Tuple[ModelTier, ...]:
+        override = settings.LLM_CASCADES.get(self.name)
+        if override:
+            return tuple(ModelTier.parse(spec) for spec in override)
+        if not settings.LLM_CASCADE_ENABLED:
+            return self.model_tiers[-1:]
+        return self.model_tiers
+
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        return True, "ok"
+
+    async def complete(
+        self,
+        req: AgentRequest,
+        *,
+        model: str,
+        system: str,
+        user: str,
+        reasoning_effort: str | None = None,
+    ) -> LLMResult:
+        on_delta = None
+        if req.emit is not None:
+            parser = PartialJSONParser(self.partial_paths) if self.partial_paths else None
+
+            async def on_delta(delta: str) -> None:
+                await req.emit({"type": "agent_delta", "agent": self.name, "delta": delta})
+                if parser is None:
+                    return
+                for path, value in parser.feed(delta):
+                    ok, reason = self.validate_partial(path, value)
+                    await req.emit({
+                        "type": "agent_partial",
+                        "agent": self.name,
+                        "path": path,
+                        "value": value,
+                        "valid": ok,
+                        "reason": reason,
+                    })
+
+        return await self.llm.acomplete(
+            model=model,
+            system=system,
+            user=user,
+            reasoning_effort=reasoning_effort,
+            cache=self.cache_enabled,
+            on_delta=on_delta,
+            priority=req.priority,
+        )
+
+    async def generate(
+        self,
+        req: AgentRequest,
+        *,
+        system: str,
+        user: str,
+        parse: Parse,
+        validate: Validate,
+        normalize: Optional[Normalize] = None,
+        schema: Optional[str] = None,
+    ) -> Generation:
+        """
+        Runs the prompt up the model cascade until a tier's output parses
+        and validates. Every parsed payload first goes through `normalize`
+        (deterministic, local fixups); an output that is still invalid
+        gets targeted repair attempts (see _repair) before escalating to
+        the next tier. Responses that fail are dropped from the cache; the
+        returned Generation is the last attempt, valid or not.
+
+        Repairs are sent `schema`, the part of `user` that defines the
+        expected output, or all of `user` when it is not given.
+        """
+        tiers = self.tiers
+        if not tiers:
+            raise ValueError(f"{self.name}: no model tiers configured")
+        started = time.perf_counter()
+        repairs = 0
+
+        for i, tier in enumerate(tiers):
+            tier_started = time.perf_counter()
+            res = await self.complete(
+                req,
+                model=tier.model,
+                system=system,
+                user=user,
+                reasoning_effort=tier.reasoning_effort,
+            )
+            payload, ok, reason, fixups = _check(res.text, parse, validate, normalize)
+            self._note_fixups(fixups)
+            gen = Generation(
+                text=res.text,
+                payload=payload,
+                ok=ok,
+                reason=reason,
+                tier=tier,
+                cached=res.cached,
+                escalations=i,
+                repairs=repairs,
+                fixups=fixups,
+            )
+
+            if not res.cached and i == len(tiers) - 1:
+                self._observe_top_tier(time.perf_counter() - tier_started)
+            if ok:
+                break
+
+            await self.llm.forget(res)
+            gen = await self._repair(
+                req,
+                gen,
+                system=system,
+                user=schema or user,
+                parse=parse,
+                validate=validate,
+                normalize=normalize,
+            )
+            repairs = gen.repairs
+            if gen.ok:
+                break
+
+            if i + 1 < len(tiers) and req.emit is not None:
+                await req.emit({
+                    "type": "agent_escalate",
+                    "agent": self.name,
+                    "from_model": tier.model,
+                    "to_model": tiers[i + 1].model,
+                    "reason": gen.reason,
+                })
+
+        self._record_cascade(gen, len(tiers), time.perf_counter() - started)
+        return gen
+
+    async def _repair(
+        self,
+        req: AgentRequest,
+        gen: Generation,
+        *,
+        system: str,
+        user: str,
+        parse: Parse,
+        validate: Validate,
+        normalize: Optional[Normalize],
+    ) -> Generation:
+        """
+        Sends the invalid output and the validator's error, with the
+        instructions that define the schema (`system` and `user`), to a
+        low-effort model, up to LLM_REPAIR_ATTEMPTS times. Much cheaper than
+        rerunning the full prompt at the tier's effort.
+        """
+        for attempt in range(1, settings.LLM_REPAIR_ATTEMPTS + 1):
+            metrics.incr(f"repair.{self.name}.attempts")
+            if req.emit is not None:
+                await req.emit({
+                    "type": "agent_repair",
+                    "agent": self.name,
+                    "attempt": attempt,
+                    "reason": gen.reason,
+                })
+
+            invalid = json.dumps(gen.payload, ensure_ascii=False) if gen.payload is not None else gen.text
+            res = await self.complete(
+                req,
+                model=settings.LLM_REPAIR_MODEL,
+                system=_REPAIR_SYSTEM,
+                user=(
+                    f"Validator error:\n{gen.reason}\n\n"
+                    f"Original instructions:\n{system}\n\n"
+                    f"Original request:\n{user}\n\n"
+                    f"Invalid output:\n{invalid}"
+                ),
+                reasoning_effort=settings.LLM_REPAIR_EFFORT,
+            )
+            payload, ok, reason, fixups = _check(res.text, parse, validate, normalize)
+            self._note_fixups(fixups)
+            gen = replace(
+                gen,
+                text=res.text,
+                payload=payload,
+                ok=ok,
+                reason=reason,
+                cached=gen.cached and res.cached,
+                repairs=gen.repairs + 1,
+                fixups=fixups,
+            )
+            if ok:
+                metrics.incr(f"repair.{self.name}.succeeded")
+                return gen
+
+            await self.llm.forget(res)
+
+        return gen
+
+    def _note_fixups(self, fixups: List[str]) -> None:
+        for fixup in fixups:
+            logger.info("%s: normalized %s", self.name, fixup)
+        if fixups:
+            metrics.incr(f"normalize.{self.name}.payloads")
+            metrics.incr(f"normalize.{self.name}.fixups", len(fixups))
+
+    def _observe_top_tier(self, elapsed: float) -> None:
+        prev = self._top_tier_latency
+        self._top_tier_latency = elapsed if prev is None else 0.8 * prev + 0.2 * elapsed
+
+    def _record_cascade(self, gen: Generation, n_tiers: int, elapsed: float) -> None:
+        prefix = f"cascade.{self.name}"
+        metrics.incr(f"{prefix}.runs")
+        if gen.escalations:
+            metrics.incr(f"{prefix}.escalated")
+        metrics.incr(f"{prefix}.served_by.{gen.tier.model}")
+        metrics.gauge(f"{prefix}.escalation_rate", round(metrics.get(f"{prefix}.escalated") / metrics.get(f"{prefix}.runs"), 4))
+        metrics.observe(f"{prefix}.latency_s", elapsed)
+
+        # Time the full-strength tier would have taken, minus what we spent.
+        if gen.ok and not gen.cached and gen.escalations < n_tiers - 1:
+            top = self._top_tier_latency if self._top_tier_latency is not None else settings.LLM_TOP_TIER_LATENCY_S
+            metrics.incr(f"{prefix}.latency_saved_s", max(0.0, top - elapsed))
 
     @abstractmethod
     async def run(self, req: AgentRequest) -> AgentResponse:
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.core.metrics import metrics
+from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse, ModelTier
+from app.services.vft_spec import goal_wallets
 
 
 
@@ -67,6 +68,32 @@ def _validate_hex_address(addr: str) -> bool:
     return bool(re.fullmatch(r"0x[0-9a-fA-F]{2,}", addr))
 
 
+def _normalize_liquidity_payload(payload: Dict[str, Any]) -> List[str]:
+    """
+    Deterministic fixups applied in place before validation: keys outside
+    the schema are dropped, "" / "null" registered_token becomes null,
+    and addresses are stripped.
+    """
+    fixups: List[str] = []
+
+    for k in sorted(set(payload.keys()) - {"token", "registered_token"}):
+        fixups.append(f"dropped unexpected key {k!r}")
+        del payload[k]
+
+    rt = payload.get("registered_token")
+    if isinstance(rt, str) and rt.strip().lower() in ("", "null", "none"):
+        fixups.append(f"registered_token {rt!r} -> null")
+        payload["registered_token"] = None
+
+    for k in ("token", "registered_token"):
+        v = payload.get(k)
+        if isinstance(v, str) and v != v.strip():
+            fixups.append(f"{k} stripped of whitespace")
+            payload[k] = v.strip()
+
+    return fixups
+
+
 def _validate_liquidity_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     """
     Required EXACT shape:
@@ -99,28 +126,76 @@ def _validate_liquidity_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     return False, "'registered_token' must be null or a hex string like 0x..."
 
 
-def _guess_token_from_context_or_goal(req: AgentRequest) -> Optional[str]:
-    # Prefer context values if your orchestrator passes them
+_TOKEN_KEYS = ("token", "program_id", "programId", "vft_program_id", "vftProgramId")
+
+
+def _upstream_token(req: AgentRequest) -> Optional[str]:
+    """A token address published by an upstream agent (e.g. vft_deployer)."""
+    for result in (getattr(req, "artifacts", None) or {}).values():
+        if not isinstance(result, dict):
+            continue
+        for key in _TOKEN_KEYS:
+            v = result.get(key)
+            if isinstance(v, str) and _validate_hex_address(v.strip()):
+                return v.strip()
+    return None
+
+
+def _guess_token_from_context_or_goal(req: AgentRequest, unambiguous: bool = False) -> Optional[str]:
+    """
+    The token address from a context value, an upstream agent, or the goal.
+
+    Goal addresses are only considered when vft_deployer is not upstream
+    (otherwise the token is the one being deployed in this run, and any
+    address in the goal is a wallet), and never the mint_to / admins
+    wallets the goal names. With `unambiguous`, a goal mentioning several
+    candidates gives None and the model has to work it out.
+    """
     ctx = getattr(req, "context", None) or {}
     if isinstance(ctx, dict):
-        for key in ("token", "program_id", "programId", "vft_program_id", "vftProgramId"):
+        for key in _TOKEN_KEYS:
             v = ctx.get(key)
-            if isinstance(v, str) and _validate_hex_address(v):
-                return v
+            if isinstance(v, str) and _validate_hex_address(v.strip()):
+                return v.strip()
 
-    goal = getattr(req, "goal", "") or ""
-    m = re.search(r"0x[0-9a-fA-F]{2,}", goal)
-    if m:
-        return m.group(0)
+    upstream = _upstream_token(req)
+    if upstream:
+        return upstream
 
-    return None
+    if "vft_deployer" in (getattr(req, "artifacts", None) or {}):
+        return None
+
+    goal = getattr(req, "goal", "") or ""
+    wallets = goal_wallets(goal)
+    found = {m.lower(): m for m in re.findall(r"0x[0-9a-fA-F]{2,}", goal) if m.lower() not in wallets}
+    if not found or (unambiguous and len(found) > 1):
+        return None
+    return next(iter(found.values()))
 
 
 class LiquidityAgent(BaseAgent):
     name = "liquidity"
+    partial_paths = ("token",)
+    model_tiers = (ModelTier("gpt-5-mini", "minimal"), ModelTier("gpt-5", "low"))
+    # The token has to exist before liquidity can be registered for it
+    depends_on = ("vft_deployer",)
+
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        if not isinstance(value, str) or not _validate_hex_address(value):
+            return False, "'token' must be a hex string like 0x..."
+        return True, "ok"
 
     async def run(self, req: AgentRequest) -> AgentResponse:
-        
+        # The payload is fully determined by the token; don't pay a model to echo it.
+        token = _guess_token_from_context_or_goal(req, unambiguous=True)
+        if token is not None:
+            metrics.incr("fast_path.liquidity")
+            return AgentResponse(
+                agent=self.name,
+                summary="Liquidity payload built from the known token (no LLM call).",
+                result={"ok": True, "cached": False, "model": None, "liquidity": {"token": token, "registered_token": None}},
+            )
+
         token_hint = _guess_token_from_context_or_goal(req) or "0x..."
 
         system_prompt = (
@@ -131,10 +206,14 @@ class LiquidityAgent(BaseAgent):
             "token (string), registered_token (null or string)."
         )
 
+        upstream = req.artifacts.get("vft_deployer") or {}
+        vft = upstream.get("vft") if isinstance(upstream, dict) else None
+        deployed = f"\nToken spec from vft_deployer:\n{json.dumps(vft)}\n" if isinstance(vft, dict) else ""
+
         user_prompt = f"""
 Goal / context:
 {req.goal}
-
+{deployed}
 Return ONLY this exact JSON schema (no extra keys):
 
 {{
@@ -149,34 +228,35 @@ Rules:
 - Do NOT include any other keys.
 """.strip()
 
-        raw = await asyncio.to_thread(
-            self.llm.chat,
-            model="gpt-5",
-            reasoning_effort="low",
+        gen = await self.generate(
+            req,
             system=system_prompt,
             user=user_prompt,
+            parse=_extract_object,
+            validate=_validate_liquidity_payload,
+            normalize=_normalize_liquidity_payload,
         )
+        raw = gen.text
+        payload = gen.payload
 
-        payload = _extract_object(raw)
         if payload is None:
-            
             fallback_token = _guess_token_from_context_or_goal(req)
             if fallback_token:
                 fallback = {"token": fallback_token, "registered_token": None}
                 return AgentResponse(
                     agent=self.name,
                     summary="Liquidity payload fallback (model output was not JSON).",
-                    result={"ok": True, "liquidity": fallback, "raw": raw},
+                    result={"ok": True, **gen.meta, "liquidity": fallback, "raw": raw},
                 )
 
             return AgentResponse(
                 agent=self.name,
                 summary="Agent returned non-JSON output (could not parse liquidity payload).",
-                result={"ok": False, "raw": raw},
+                result={"ok": False, **gen.meta, "raw": raw},
             )
 
-        ok, reason = _validate_liquidity_payload(payload)
-        if not ok:
+        if not gen.ok:
+            reason = gen.reason
 
             inferred = _guess_token_from_context_or_goal(req)
             if inferred:
@@ -186,17 +266,17 @@ Rules:
                     return AgentResponse(
                         agent=self.name,
                         summary=f"Liquidity payload repaired (original invalid: {reason}).",
-                        result={"ok": True, "liquidity": repaired, "raw": raw, "payload": payload},
+                        result={"ok": True, **gen.meta, "liquidity": repaired, "raw": raw, "payload": payload},
                     )
 
             return AgentResponse(
                 agent=self.name,
                 summary=f"Liquidity payload invalid: {reason}",
-                result={"ok": False, "reason": reason, "payload": payload, "raw": raw},
+                result={"ok": False, **gen.meta, "reason": reason, "payload": payload, "raw": raw},
             )
 
         return AgentResponse(
             agent=self.name,
             summary="Liquidity payload generated.",
-            result={"ok": True, "liquidity": payload},
+            result={"ok": True, **gen.meta, "liquidity": payload},
         )
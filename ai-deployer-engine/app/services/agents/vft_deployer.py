@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-import asyncio
 import json
+import logging
 import re
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse
+from app.core.metrics import metrics
+from app.services.agent_base import BaseAgent, AgentRequest, AgentResponse, ModelTier
+from app.services.vft_spec import VFT_FIELDS, extract_vft_spec
+from app.utils.normalize import as_int, uint_string
+
+logger = logging.getLogger(__name__)
 
 
 def _coerce_to_json(text: str) -> str:
@@ -72,6 +77,52 @@ def _validate_uint_string(s: str) -> bool:
     return bool(re.fullmatch(r"[0-9]+", s))
 
 
+def _normalize_vft_payload(payload: Dict[str, Any]) -> List[str]:
+    """
+    Deterministic fixups applied in place before validation:
+    - decimals "18" -> 18
+    - mint_amount "1e18" / "1,000,000" / 1e18 -> exact digit string
+      (only when the value is a whole number)
+    - a single admin string -> one-element list; addresses are stripped
+    """
+    fixups: List[str] = []
+
+    decimals = payload.get("decimals")
+    if isinstance(decimals, (str, float)) and as_int(decimals) is not None:
+        fixups.append(f"decimals {decimals!r} -> {as_int(decimals)}")
+        payload["decimals"] = as_int(decimals)
+
+    mint_amount = payload.get("mint_amount")
+    canonical = uint_string(mint_amount) if mint_amount is not None else None
+    if canonical is not None and mint_amount != canonical:
+        fixups.append(f"mint_amount {mint_amount!r} -> {canonical!r}")
+        payload["mint_amount"] = canonical
+
+    admins = payload.get("admins")
+    if isinstance(admins, str):
+        fixups.append(f"admins {admins!r} -> [{admins.strip()!r}]")
+        payload["admins"] = [admins.strip()]
+    elif isinstance(admins, list) and any(isinstance(a, str) and a != a.strip() for a in admins):
+        fixups.append("admins stripped of whitespace")
+        payload["admins"] = [a.strip() if isinstance(a, str) else a for a in admins]
+
+    mint_to = payload.get("mint_to")
+    if isinstance(mint_to, str) and mint_to != mint_to.strip():
+        fixups.append("mint_to stripped of whitespace")
+        payload["mint_to"] = mint_to.strip()
+
+    return fixups
+
+
+def _spec_mismatches(payload: Dict[str, Any], spec: Dict[str, Any]) -> List[str]:
+    """
+    Notes where the model disagrees with what extract_vft_spec read from
+    the goal. The payload is left alone: the regexes only give hints, and
+    the model has read the whole goal.
+    """
+    return [f"{k} differs from the goal hint {v!r}" for k, v in spec.items() if payload.get(k) != v]
+
+
 def _validate_vft_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     """
     Validates required shape:
@@ -87,7 +138,8 @@ def _validate_vft_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
     NOTE:
     - 'mint_amount' MUST be a base-10 uint string (digits only).
     - If the model returns an int, we coerce it to string.
-    - Floats / scientific notation / separators are rejected.
+    - Floats / scientific notation / separators are rejected
+      (the agent canonicalizes them first, see _normalize_vft_payload).
     """
     required = ("admins", "name", "symbol", "decimals", "mint_amount", "mint_to")
     for k in required:
@@ -151,8 +203,41 @@ def _validate_vft_payload(payload: Dict[str, Any]) -> Tuple[bool, str]:
 
 class VFTDeployerAgent(BaseAgent):
     name = "vft_deployer"
+    partial_paths = ("admins.*", "mint_amount", "mint_to")
+    model_tiers = (ModelTier("gpt-5-mini", "low"), ModelTier("gpt-5", "high"))
+
+    def validate_partial(self, path: List[Any], value: Any) -> Tuple[bool, str]:
+        if path[0] == "mint_amount":
+            if isinstance(value, int) and value > 0:
+                return True, "ok"
+            if isinstance(value, str) and _validate_uint_string(value) and value != "0":
+                return True, "ok"
+            return False, "'mint_amount' debe ser un string numérico (uint) en base 10 mayor que 0."
+        if not isinstance(value, str) or not _validate_hex_address(value):
+            return False, f"Formato inválido de '{path[0]}': {value}"
+        return True, "ok"
 
     async def run(self, req: AgentRequest) -> AgentResponse:
+        spec = extract_vft_spec(req.goal)
+        if set(spec) == set(VFT_FIELDS):
+            payload = dict(spec)
+            ok, _ = _validate_vft_payload(payload)
+            if ok:
+                metrics.incr("fast_path.vft_deployer")
+                return AgentResponse(
+                    agent=self.name,
+                    summary="Payload VFT extraído del prompt (sin llamada al LLM).",
+                    result={"ok": True, "cached": False, "model": None, "vft": payload},
+                )
+
+        known = (
+            "\nValores detectados en el prompt (úsalos como referencia; si el prompt dice otra cosa, manda el prompt):\n"
+            + json.dumps(spec, ensure_ascii=False)
+            + "\n"
+            if spec
+            else ""
+        )
+
         system_prompt = (
             "Eres un planificador de despliegue de tokens. "
             "DEBES devolver JSON estrictamente válido y nada más. "
@@ -165,7 +250,7 @@ class VFTDeployerAgent(BaseAgent):
         user_prompt = f"""
 PROMPT DEL USUARIO:
 {req.goal}
-
+{known}
 Devuelve SOLO JSON estricto con este esquema exacto (sin claves extra):
 
 {{
@@ -189,32 +274,40 @@ Reglas:
 - No incluyas ningún otro campo.
 """.strip()
 
-        raw = await asyncio.to_thread(
-            self.llm.chat,
-            model="gpt-5",
+        gen = await self.generate(
+            req,
             system=system_prompt,
             user=user_prompt,
-            reasoning_effort="high",
+            parse=_extract_vft_object,
+            validate=_validate_vft_payload,
+            normalize=_normalize_vft_payload,
         )
+        raw = gen.text
+        payload = gen.payload
 
-        payload = _extract_vft_object(raw)
         if payload is None:
             return AgentResponse(
                 agent=self.name,
                 summary="El agente devolvió salida no-JSON (no se pudo parsear el payload VFT).",
-                result={"ok": False, "raw": raw},
+                result={"ok": False, **gen.meta, "raw": raw},
             )
 
-        ok, reason = _validate_vft_payload(payload)
-        if not ok:
+        if not gen.ok:
+            reason = gen.reason
+
             return AgentResponse(
                 agent=self.name,
                 summary=f"Payload VFT inválido: {reason}",
-                result={"ok": False, "reason": reason, "payload": payload, "raw": raw},
+                result={"ok": False, **gen.meta, "reason": reason, "payload": payload, "raw": raw},
             )
 
+        mismatches = _spec_mismatches(payload, spec)
+        if mismatches:
+            logger.info("%s: model disagrees with the goal hints: %s", self.name, "; ".join(mismatches))
+            metrics.incr("vft_deployer.hint_mismatches")
+
         return AgentResponse(
             agent=self.name,
             summary="Payload VFT generado para gateway.",
-            result={"ok": True, "vft": payload},
+            result={"ok": True, **gen.meta, "vft": payload, "hint_mismatches": mismatches},
         )
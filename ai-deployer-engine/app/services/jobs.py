@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.agent_schemas import RunAgentsRequest
+from app.services.live_runs import LiveRuns, step_event
+
+logger = logging.getLogger(__name__)
+
+# queued -> running -> done | failed; "interrupted" when the worker that
+# owned the job went away (shutdown, recycle, crash) before it finished.
+FINISHED = ("done", "failed", "interrupted")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    Jobs and their per-agent steps in SQLite, shared by all gunicorn
+    workers on the host, so any worker can answer GET /agents/jobs/{id}
+    and results survive the worker that produced them.
+    """
+
+    def __init__(self, path: str, ttl_s: float):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Never reuse a connection inherited from the gunicorn master.
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " trace_id TEXT NOT NULL,"
+            " request TEXT NOT NULL,"
+            " worker_pid INTEGER,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_steps ("
+            " job_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " step TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, seq))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs(created_at)")
+
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def create(self, job_id: str, trace_id: str, request: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO jobs (id, status, trace_id, request, worker_pid, created_at)"
+                " VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, trace_id, json.dumps(request, ensure_ascii=False), os.getpid(), now),
+            )
+            old = [r[0] for r in conn.execute("SELECT id FROM jobs WHERE created_at < ?", (now - self.ttl_s,))]
+            for old_id in old:
+                conn.execute("DELETE FROM job_steps WHERE job_id = ?", (old_id,))
+                conn.execute("DELETE FROM jobs WHERE id = ?", (old_id,))
+
+    def start(self, job_id: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                (time.time(), job_id),
+            )
+
+    def add_step(self, job_id: str, step: Dict[str, Any]) -> int:
+        with self._lock:
+            conn = self._connect()
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_steps WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO job_steps (job_id, seq, step) VALUES (?, ?, ?)",
+                (job_id, seq, json.dumps(step, ensure_ascii=False)),
+            )
+            return seq
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (status, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None, error, job_id),
+            )
+
+    def get(self, job_id: str, after_seq: int = 0) -> Optional[Dict[str, Any]]:
+        """The job with its steps numbered above `after_seq`, or None."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id, status, trace_id, request, worker_pid, created_at, started_at, finished_at, result, error"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            steps = conn.execute(
+                "SELECT seq, step FROM job_steps WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq),
+            ).fetchall()
+
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "trace_id": row[2],
+            "request": json.loads(row[3]),
+            "worker_pid": row[4],
+            "created_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7],
+            "result": json.loads(row[8]) if row[8] else None,
+            "error": row[9],
+            "steps": [dict(json.loads(step), seq=seq) for seq, step in steps],
+        }
+
+    def interrupt_orphans(self) -> int:
+        """Marks unfinished jobs whose worker process is gone as interrupted."""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            orphans = [job_id for job_id, pid in rows if pid != os.getpid() and not _pid_alive(pid)]
+            for job_id in orphans:
+                conn.execute(
+                    "UPDATE jobs SET status = 'interrupted', finished_at = ?, error = ? WHERE id = ?",
+                    (time.time(), "worker stopped before the job finished", job_id),
+                )
+            return len(orphans)
+
+
+class JobManager:
+    """
+    Runs POST /agents/jobs requests on a bounded pool of background tasks
+    in this worker. Every step is written to the JobStore as soon as its
+    agent finishes, and the final RunAgentsResponse when the run ends.
+
+    With a `hub`, each running job is also a LiveRun under its trace_id,
+    pinned for as long as the job runs, so /agents/stream/{trace_id} can
+    watch it live and watchers coming and going never stop it.
+    """
+
+    def __init__(self, orchestrator, store: JobStore, workers: int, queue_max: int, hub: Optional[LiveRuns] = None):
+        self.orchestrator = orchestrator
+        self.store = store
+        self.hub = hub
+        self.workers = max(1, workers)
+        self._queue: "asyncio.Queue[tuple[str, str, RunAgentsRequest]]" = asyncio.Queue(maxsize=max(1, queue_max))
+        self._tasks: List[asyncio.Task] = []
+        self._active = 0
+        # Slots promised to submits still writing their row.
+        self._reserved = 0
+        # Jobs queued or running in this worker; only these can be waited on.
+        self._owned: Set[str] = set()
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        interrupted = await asyncio.to_thread(self.store.interrupt_orphans)
+        if interrupted:
+            logger.warning("marked %d orphaned job(s) as interrupted", interrupted)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Jobs that never got a worker.
+        while not self._queue.empty():
+            job_id, _, _ = self._queue.get_nowait()
+            await asyncio.to_thread(self.store.finish, job_id, "interrupted", None, "server shut down before the job started")
+            self._owned.discard(job_id)
+            self._notify(job_id)
+
+    async def submit(self, request: RunAgentsRequest) -> Dict[str, Any]:
+        # Reserve the slot before awaiting, or concurrent submits could all
+        # pass the check and overfill the queue.
+        if self._queue.qsize() + self._reserved >= self._queue.maxsize:
+            metrics.incr("jobs.rejected")
+            raise JobQueueFull(f"{self._queue.qsize()} jobs already waiting")
+
+        job_id = str(uuid.uuid4())
+        trace_id = str(uuid.uuid4())
+        self._reserved += 1
+        try:
+            await asyncio.to_thread(self.store.create, job_id, trace_id, request.model_dump(mode="json"))
+        finally:
+            self._reserved -= 1
+        self._owned.add(job_id)
+        self._queue.put_nowait((job_id, trace_id, request))
+        metrics.incr("jobs.submitted")
+        metrics.gauge("jobs.queued", self._queue.qsize())
+        return {"job_id": job_id, "status": "queued", "trace_id": trace_id}
+
+    async def get(self, job_id: str, after_seq: int = 0) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id, after_seq)
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """
+        Returns when a job run by this worker records progress, or after
+        `timeout` (jobs run by other workers are only seen by polling).
+        """
+        if job_id not in self._owned:
+            await asyncio.sleep(timeout)
+            return
+        # _run's last _notify drops the entry, so none outlives its job.
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, trace_id, request = await self._queue.get()
+            metrics.gauge("jobs.queued", self._queue.qsize())
+            try:
+                await self._run(job_id, trace_id, request)
+            except Exception as e:
+                # e.g. "database is locked" while recording the job: the
+                # worker must survive it, or the pool quietly shrinks.
+                logger.exception("job %s: worker error", job_id)
+                metrics.incr("jobs.worker_errors")
+                try:
+                    await asyncio.to_thread(self.store.finish, job_id, "failed", None, f"{type(e).__name__}: {e}")
+                except Exception:
+                    logger.exception("job %s: could not mark it failed", job_id)
+                self._owned.discard(job_id)
+                self._notify(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, trace_id: str, request: RunAgentsRequest) -> None:
+        await asyncio.to_thread(self.store.start, job_id)
+        self._notify(job_id)
+
+        live = self.hub.create(trace_id) if self.hub is not None else None
+        if live is not None:
+            live.pin()
+
+        async def emit(event: Dict[str, Any]) -> None:
+            if event["type"] == "agent_step":
+                await asyncio.to_thread(self.store.add_step, job_id, event["step"])
+                self._notify(job_id)
+                event = {**step_event(event["step"]), "trace_id": trace_id}
+            if live is not None:
+                live.publish({**event, "job_id": job_id})
+
+        self._active += 1
+        metrics.gauge("jobs.running", self._active)
+        started = time.perf_counter()
+        status, error = "interrupted", None
+        try:
+            result = await self.orchestrator.run(
+                goal=request.goal,
+                constraints=request.constraints,
+                context=request.context,
+                preferred_agents=request.preferred_agents,
+                timeout_s=request.timeout_s,
+                agent_timeouts=request.agent_timeouts,
+                emit=emit,
+                trace_id=trace_id,
+                max_timeout_s=settings.JOB_AGENT_TIMEOUT_S,
+            )
+        except asyncio.CancelledError:
+            error = "server shut down while the job was running"
+            await asyncio.to_thread(self.store.finish, job_id, status, None, error)
+            raise
+        except Exception as e:
+            logger.exception("job %s failed", job_id)
+            metrics.incr("jobs.failed")
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            await asyncio.to_thread(self.store.finish, job_id, status, None, error)
+        else:
+            metrics.incr("jobs.done")
+            status = "done"
+            await asyncio.to_thread(
+                self.store.finish, job_id, status, result.model_dump(mode="json", exclude={"steps"}), None
+            )
+        finally:
+            metrics.observe("jobs.duration_s", round(time.perf_counter() - started, 3))
+            self._active -= 1
+            metrics.gauge("jobs.running", self._active)
+            self._owned.discard(job_id)
+            self._notify(job_id)
+            if live is not None:
+                live.publish({"type": "done", "trace_id": trace_id, "job_id": job_id, "status": status, "error": error})
+                live.close()
+                live.unpin()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.metrics import metrics
+
+
+def cache_key(model: str, system: str, user: str, reasoning_effort: Optional[str]) -> str:
+    raw = json.dumps([model, system, user, reasoning_effort], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """
+    SQLite table shared by all gunicorn workers on the host.
+    WAL mode lets readers in one worker proceed while another writes.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_s: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Never reuse a connection inherited from the gunicorn master.
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_s:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0], row[1]
+
+    def put(self, key: str, value: str, created_at: float) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, created_at, created_at),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_s,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+
+class LLMCache:
+    """
+    Two-tier response cache: a per-worker in-memory LRU in front of an
+    on-disk SQLite tier. Both tiers honour the same TTL; each has its own
+    size cap (least recently used entries are evicted first).
+    """
+
+    def __init__(self, path: str, memory_entries: int, disk_entries: int, ttl_s: float):
+        self.ttl_s = ttl_s
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disk = _DiskTier(path, disk_entries, ttl_s) if path and disk_entries > 0 else None
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _record(self, outcome: str) -> None:
+        metrics.incr(f"llm_cache.{outcome}")
+        hits = metrics.get("llm_cache.hit.memory") + metrics.get("llm_cache.hit.disk")
+        total = hits + metrics.get("llm_cache.miss")
+        metrics.gauge("llm_cache.hit_ratio", round(hits / total, 4) if total else 0.0)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if time.time() - entry[1] <= self.ttl_s:
+                self._memory.move_to_end(key)
+                self._record("hit.memory")
+                return entry[0]
+            del self._memory[key]
+
+        if self._disk is not None:
+            try:
+                found = await asyncio.to_thread(self._disk.get, key)
+            except sqlite3.Error:
+                metrics.incr("llm_cache.disk_errors")
+                found = None
+            if found is not None:
+                self._remember(key, found[0], found[1])
+                self._record("hit.disk")
+                return found[0]
+
+        self._record("miss")
+        return None
+
+    async def put(self, key: str, value: str) -> None:
+        created_at = time.time()
+        self._remember(key, value, created_at)
+        metrics.incr("llm_cache.store")
+
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.put, key, value, created_at)
+            except sqlite3.Error:
+                metrics.incr("llm_cache.disk_errors")
+
+    async def delete(self, key: str) -> None:
+        self._memory.pop(key, None)
+
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.delete, key)
+            except sqlite3.Error:
+                metrics.incr("llm_cache.disk_errors")
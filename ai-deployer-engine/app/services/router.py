@@ -1,5 +1,36 @@
 from typing import List, Optional
 from app.models.agent_schemas import AgentName
+from app.utils.keywords import KeywordMatcher
+
+_VFT_KEYWORDS = [
+    "token",
+    "vft",
+    "fungible",
+    "deploy token",
+    "create token",
+    "mint",
+    "minting",
+    "erc20",
+    "asset",
+    "symbol",
+    "decimals",
+    "supply",
+]
+
+_LIQUIDITY_KEYWORDS = [
+    "liquidity",
+    "pool",
+    "amm",
+    "dex",
+    "swap",
+    "pair",
+    "price",
+    "seed",
+    "initial liquidity",
+]
+
+# Built once at import; matches on token boundaries ("pair" is not in "repair")
+KEYWORDS = KeywordMatcher({"vft_deployer": _VFT_KEYWORDS, "liquidity": _LIQUIDITY_KEYWORDS})
 
 
 class AgentRouter:
@@ -23,40 +54,11 @@ class AgentRouter:
                 ordered.append("liquidity")
             return ordered
 
-        g = (goal or "").lower()
-
         targets: List[AgentName] = []
 
-        vft_keywords = [
-            "token",
-            "vft",
-            "fungible",
-            "deploy token",
-            "create token",
-            "mint",
-            "erc20",
-            "asset",
-            "symbol",
-            "decimals",
-            "supply",
-        ]
-
-        wants_vft = any(k in g for k in vft_keywords)
-
-      
-        liquidity_keywords = [
-            "liquidity",
-            "pool",
-            "amm",
-            "dex",
-            "swap",
-            "pair",
-            "price",
-            "seed",
-            "initial liquidity",
-        ]
-
-        wants_liquidity = any(k in g for k in liquidity_keywords)
+        hits = KEYWORDS.groups(goal)
+        wants_vft = "vft_deployer" in hits
+        wants_liquidity = "liquidity" in hits
 
         if wants_vft:
             targets.append("vft_deployer")
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]", state: Any):
+        self.task = task
+        self.state = state
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+
+    The upstream call runs in its own task and every caller awaits it
+    through asyncio.shield, so a caller that gets cancelled (e.g. its HTTP
+    client disconnected) only detaches itself. The upstream call is
+    cancelled once its last waiter is gone.
+
+    A flight can carry shared `state` (e.g. a feed of partial output);
+    every caller's `follow` coroutine is run against the state of the
+    flight it joined while the call is in progress.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight[Any]] = {}
+
+    def _forget(self, key: str, flight: _Flight[Any]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        state: Any = None,
+        follow: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Tuple[T, bool]:
+        """Returns (result, coalesced); coalesced is True for followers."""
+        flight = self._flights.get(key)
+        coalesced = flight is not None
+
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()), state)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, key=key, flight=flight: self._forget(key, flight))
+            metrics.incr(f"{self.name}.leaders")
+        else:
+            metrics.incr(f"{self.name}.coalesced")
+
+        follower = asyncio.ensure_future(follow(flight.state)) if follow is not None else None
+
+        flight.waiters += 1
+        metrics.gauge(f"{self.name}.in_flight", len(self._flights))
+        try:
+            result = await asyncio.shield(flight.task)
+            if follower is not None:
+                await follower
+            return result, coalesced
+        finally:
+            if follower is not None and not follower.done():
+                follower.cancel()
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to receive the result.
+                self._forget(key, flight)
+                flight.task.cancel()
+                metrics.incr(f"{self.name}.cancelled")
+            metrics.gauge(f"{self.name}.in_flight", len(self._flights))
@@ -0,0 +1,203 @@
+"""
+Rule-based extraction of a VFT deployment spec from a free-text goal,
+in English or Spanish, e.g.
+
+    "deploy token Foo symbol FOO 18 decimals mint 1000000 to 0xabc..."
+    "despliega un token llamado Foo, símbolo FOO, 12 decimales,
+     acuña 1,5 millones para 0xabc..."
+
+Only fields that are stated unambiguously are returned; the agent asks
+the model for the rest.
+"""
+
+from __future__ import annotations
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Set
+
+VFT_FIELDS = ("admins", "name", "symbol", "decimals", "mint_amount", "mint_to")
+
+_ADDR = r"0x[0-9a-fA-F]{2,}"
+_Q = "\"'“”‘’`"
+
+_NAME_QUOTED = re.compile(
+    rf"\b(?:name|named|called|token|nombre|llamad[oa]|denominad[oa])\b\s*(?:is|es|:|=)?\s*[{_Q}]([^{_Q}]{{1,50}})[{_Q}]",
+    re.IGNORECASE,
+)
+# An unquoted name is a single word, and only counts when what follows it
+# clearly starts something else ("named Foo, symbol ..."); in "named My
+# Token" it is "My" plus more, so the name is left to the model.
+_NAME_END = (
+    r"(?![\w-])(?=\s*(?:$|[,;.:()!?]"
+    r"|(?:symbol|ticker|s[ií]mbolo|with|con|and|y|decimals?|decimales|mint\w*|acu[ñn]\w*|supply|to|para|admins?)\b"
+    r"|\d{1,2}\s*(?:decimals|decimales)\b))"
+)
+_NAME_WORD = re.compile(
+    r"\b(?:name|named|called|nombre|llamad[oa]|denominad[oa])\b\s*(?:is|es|:|=)?\s*([A-Za-z][\w-]{0,40})" + _NAME_END,
+    re.IGNORECASE,
+)
+_NAME_AFTER_TOKEN = re.compile(
+    r"\b(?:deploy|create|launch|mint|despliega|desplegar|crea|crear|lanza|lanzar)\s+"
+    r"(?:(?:a|an|the|new|un|una|el|nuevo|nueva)\s+)*(?:vft\s+)?token\s+([A-Za-z][\w-]{0,40})" + _NAME_END,
+    re.IGNORECASE,
+)
+_SYMBOL = re.compile(
+    r"\b(?:symbol|ticker|s[ií]mbolo)\b\s*(?:is|es|:|=)?\s*[\"'$]?([A-Za-z0-9]{1,11})\b",
+    re.IGNORECASE,
+)
+_SYMBOL_PAREN = re.compile(r"\(\s*\$?([A-Z][A-Z0-9]{1,10})\s*\)")
+_DECIMALS = re.compile(
+    r"\b(\d{1,2})\s*(?:decimals|decimales)\b"
+    r"|\b(?:decimals|decimales)\b\s*(?:of|de|is|es|:|=)?\s*(\d{1,2})\b",
+    re.IGNORECASE,
+)
+_AMOUNT = re.compile(
+    r"\b(?P<kw>mint_amount|mint\w*|acu[ñn]\w*|emit\w*|(?:total |initial )?supply|suministro(?: total| inicial)?)\b"
+    r"\s*(?:of|de|:|=)?\s*"
+    r"(?P<num>\d(?:[\d.,_]*\d)?(?:[eE]\d+)?)(?![xX])"
+    r"(?:\s*(?P<mult>mil millones|thousand|million|billion|millones|mill[oó]n|bill[oó]n|billones|mil|[kKmMbB])\b)?"
+    r"(?:\s*(?P<unit>base units?|unidades base|tokens?|units?|unidades|wei|raw))?",
+    re.IGNORECASE,
+)
+# Text right after an amount that means we did not understand it:
+# "10^6", "10**6", "1000000 2025", "1000abc".
+_AMOUNT_UNPARSED = re.compile(r"\s*[\^*\d]|\w")
+
+_MINT_TO = re.compile(
+    rf"\b(?:to|into|for|para|a|hacia|recipient|receiver|destinatario|mint_to)\b\s*"
+    rf"(?:(?:the\s+)?(?:address|wallet|direcci[oó]n|cuenta)\s*)?(?::|=)?\s*({_ADDR})",
+    re.IGNORECASE,
+)
+_ADMINS = re.compile(
+    rf"\b(?:admins?|administrador(?:es)?|administradora|owner|propietari[oa])\b\s*(?:is|are|es|son|:|=)?\s*"
+    rf"((?:{_ADDR})(?:\s*(?:,|and|y|&)\s*{_ADDR})*)",
+    re.IGNORECASE,
+)
+# A recipient only counts as a wallet when it follows a mint verb, so
+# "register liquidity for 0xabc" does not make 0xabc a wallet.
+_MINT_RECIPIENT = re.compile(r"\b(?:mint\w*|acu[ñn]\w*)\b[^.;]*?" + _MINT_TO.pattern, re.IGNORECASE)
+
+# Words that follow "token" in a sentence but are never its name.
+_NOT_A_NAME = {
+    "symbol", "ticker", "named", "called", "name", "with", "and", "for", "to", "of",
+    "simbolo", "símbolo", "llamado", "llamada", "nombre", "con", "y", "para", "de",
+}
+
+_MULTIPLIERS = {
+    "k": 10 ** 3, "thousand": 10 ** 3, "mil": 10 ** 3,
+    "m": 10 ** 6, "million": 10 ** 6, "millon": 10 ** 6, "millón": 10 ** 6, "millones": 10 ** 6,
+    "b": 10 ** 9, "billion": 10 ** 9, "mil millones": 10 ** 9,
+    # Spanish long scale: un billón is 10^12
+    "billon": 10 ** 12, "billón": 10 ** 12, "billones": 10 ** 12,
+}
+_RAW_UNITS = {"wei", "raw", "base unit", "base units", "unidades base"}
+
+
+def _parse_amount(num: str) -> Optional[Decimal]:
+    text = num.replace("_", "")
+    if re.fullmatch(r"\d{1,3}(\.\d{3}){2,}", text):
+        text = text.replace(".", "")  # 1.000.000
+    elif re.fullmatch(r"\d{1,3}\.\d{3}", text):
+        return None  # 1.000: a thousand in Spanish, one in English; ask the model
+    elif re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", text):
+        text = text.replace(",", "")  # 1,000,000.5
+    elif re.fullmatch(r"\d+,\d+", text):
+        text = text.replace(",", ".")  # 1,5 (decimal comma)
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() and abs(value.adjusted()) <= 100 else None
+
+
+def _mint_amount(goal: str, decimals: Optional[int]) -> Optional[str]:
+    m = _AMOUNT.search(goal)
+    if m is None or _AMOUNT_UNPARSED.match(goal, m.end()):
+        return None
+
+    value = _parse_amount(m.group("num"))
+    if value is None:
+        return None
+
+    mult = (m.group("mult") or "").lower()
+    if mult:
+        value *= _MULTIPLIERS[mult]
+
+    unit = (m.group("unit") or "").lower()
+    raw = m.group("kw").lower() == "mint_amount" or unit in _RAW_UNITS
+    if not raw:
+        # Whole tokens -> base units; without decimals we can't scale.
+        if decimals is None:
+            return None
+        value = value.scaleb(decimals)
+
+    if value <= 0 or value != value.to_integral_value():
+        return None
+    return str(int(value))
+
+
+def _name(goal: str) -> Optional[str]:
+    m = _NAME_QUOTED.search(goal)
+    if m:
+        return m.group(1).strip() or None
+    for pattern in (_NAME_WORD, _NAME_AFTER_TOKEN):
+        m = pattern.search(goal)
+        if m and m.group(1).lower() not in _NOT_A_NAME:
+            return m.group(1)
+    return None
+
+
+def extract_vft_spec(goal: str) -> Dict[str, Any]:
+    """
+    Returns the subset of VFT_FIELDS stated in `goal`. mint_amount is
+    in base units: whole-token amounts are scaled by 10**decimals with
+    exact integer arithmetic ("mint 1.5 million" at 18 decimals ->
+    "1500000000000000000000000").
+    """
+    spec: Dict[str, Any] = {}
+
+    name = _name(goal)
+    if name:
+        spec["name"] = name
+
+    m = _SYMBOL.search(goal) or _SYMBOL_PAREN.search(goal)
+    if m and m.group(1).lower() not in _NOT_A_NAME:
+        spec["symbol"] = m.group(1)
+
+    m = _DECIMALS.search(goal)
+    if m:
+        decimals = int(m.group(1) or m.group(2))
+        if decimals <= 18:
+            spec["decimals"] = decimals
+
+    amount = _mint_amount(goal, spec.get("decimals"))
+    if amount is not None:
+        spec["mint_amount"] = amount
+
+    m = _MINT_TO.search(goal)
+    if m:
+        spec["mint_to"] = m.group(1)
+
+    m = _ADMINS.search(goal)
+    if m:
+        spec["admins"] = re.findall(_ADDR, m.group(1))
+
+    # A goal with a single address means it plays every role.
+    addresses: List[str] = list(dict.fromkeys(re.findall(_ADDR, goal)))
+    if len(addresses) == 1:
+        spec.setdefault("mint_to", addresses[0])
+        spec.setdefault("admins", [addresses[0]])
+
+    return spec
+
+
+def goal_wallets(goal: str) -> Set[str]:
+    """
+    Addresses (lowercased) the goal names as the mint recipient or as
+    admins: wallets, never the token itself.
+    """
+    wallets = {m.group(1).lower() for m in _MINT_RECIPIENT.finditer(goal)}
+    for m in _ADMINS.finditer(goal):
+        wallets.update(a.lower() for a in re.findall(_ADDR, m.group(1)))
+    return wallets
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+PathPart = Union[str, int]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "watched", "key", "index", "expect_key")
+
+    def __init__(self, kind: str, path: List[PathPart], start: int, watched: bool):
+        self.kind = kind  # "obj" | "arr"
+        self.path = path
+        self.start = start
+        self.watched = watched
+        self.key: Optional[str] = None
+        self.index = -1
+        self.expect_key = kind == "obj"
+
+
+class PartialJSONParser:
+    """
+    Incremental scanner over a streamed JSON object.
+
+    Feed it text chunks as they arrive; every value whose path matches one
+    of `paths` is parsed and returned the moment it closes. Paths are
+    dotted keys where `*` matches any key or array index, e.g.
+    "tokenomics.distribution.*" or "files.*". Text before the first
+    '{' or '[' (prose, markdown fences) is ignored.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.patterns = [p.split(".") for p in paths]
+        self.done = False
+
+        # Unconsumed tail of the stream; _offset is the absolute index of _text[0]
+        self._text = ""
+        self._offset = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._string_start = 0
+
+        self._in_scalar = False
+        # (path, start) of a string/scalar value being watched
+        self._pending: Optional[Tuple[List[PathPart], int]] = None
+
+    def _matches(self, path: List[PathPart]) -> bool:
+        for pattern in self.patterns:
+            if len(pattern) == len(path) and all(p == "*" or p == str(part) for p, part in zip(pattern, path)):
+                return True
+        return False
+
+    def _child_path(self) -> List[PathPart]:
+        if not self._stack:
+            return []
+        top = self._stack[-1]
+        if top.kind == "arr":
+            top.index += 1
+            return top.path + [top.index]
+        return top.path + [top.key]
+
+    @staticmethod
+    def _emit(path: List[PathPart], raw: str, out: list) -> None:
+        try:
+            out.append((path, json.loads(raw)))
+        except ValueError:
+            pass
+
+    def _trim(self, text: str, consumed: int) -> None:
+        # Keep only what an open watched value (or a key) may still need.
+        keep = consumed
+        for frame in self._stack:
+            if frame.watched:
+                keep = min(keep, frame.start)
+        if self._pending is not None:
+            keep = min(keep, self._pending[1])
+        if self._in_string and self._string_is_key:
+            keep = min(keep, self._string_start)
+
+        self._text = text[keep - self._offset:]
+        self._offset = keep
+
+    def feed(self, chunk: str) -> List[Tuple[List[PathPart], Any]]:
+        out: List[Tuple[List[PathPart], Any]] = []
+        if self.done or not chunk:
+            return out
+
+        text = self._text + chunk
+        base = self._offset
+
+        i = base + len(self._text)
+        n = base + len(text)
+        while i < n and not self.done:
+            ch = text[i - base]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        raw_key = text[self._string_start - base:i + 1 - base]
+                        try:
+                            self._stack[-1].key = json.loads(raw_key)
+                        except ValueError:
+                            self._stack[-1].key = raw_key[1:-1]
+                    elif self._pending is not None:
+                        path, start = self._pending
+                        self._pending = None
+                        self._emit(path, text[start - base:i + 1 - base], out)
+                i += 1
+                continue
+
+            if self._in_scalar:
+                if ch not in _SCALAR_END:
+                    i += 1
+                    continue
+                self._in_scalar = False
+                if self._pending is not None:
+                    path, start = self._pending
+                    self._pending = None
+                    self._emit(path, text[start - base:i - base], out)
+
+            if not self._started:
+                if ch not in "{[":
+                    i += 1
+                    continue
+                self._started = True
+
+            if ch in _WHITESPACE:
+                pass
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+                top = self._stack[-1] if self._stack else None
+                self._string_is_key = top is not None and top.kind == "obj" and top.expect_key
+                if not self._string_is_key:
+                    path = self._child_path()
+                    if self._matches(path):
+                        self._pending = (path, i)
+            elif ch in "{[":
+                path = self._child_path()
+                self._stack.append(_Frame("obj" if ch == "{" else "arr", path, i, self._matches(path)))
+            elif ch in "}]":
+                if self._stack:
+                    frame = self._stack.pop()
+                    if frame.watched:
+                        self._emit(frame.path, text[frame.start - base:i + 1 - base], out)
+                if not self._stack:
+                    self.done = True
+            elif ch == ":":
+                if self._stack:
+                    self._stack[-1].expect_key = False
+            elif ch == ",":
+                if self._stack and self._stack[-1].kind == "obj":
+                    self._stack[-1].expect_key = True
+            else:
+                self._in_scalar = True
+                path = self._child_path()
+                if self._matches(path):
+                    self._pending = (path, i)
+
+            i += 1
+
+        self._trim(text, i)
+        return out
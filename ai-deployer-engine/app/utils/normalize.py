@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional, Union
+
+Number = Union[int, float]
+
+# Thousands-grouped integers ("1,000,000", "1_000", "1 000"). Anything
+# else with a comma ("1,5") is ambiguous and left alone.
+_GROUPED = re.compile(r"[+-]?\d{1,3}([,_ ])\d{3}(\1\d{3})*")
+_NUMERIC = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?")
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, str):
+        text = value.strip()
+        if _GROUPED.fullmatch(text):
+            text = re.sub(r"[,_ ]", "", text)
+        if not _NUMERIC.fullmatch(text):
+            return None
+        try:
+            d = Decimal(text)
+        except InvalidOperation:
+            return None
+        # "1e999999999" would expand into a gigantic int; uint256 tops out at ~1e77.
+        return d if abs(d.adjusted()) <= 100 else None
+    return None
+
+
+def as_int(value: Any) -> Optional[int]:
+    """
+    Exact integer for "18", 18.0, "1e18" or "1,000,000"; None when the
+    value is not a whole number (e.g. "1.5", "abc", True).
+    """
+    d = _to_decimal(value)
+    if d is None or not d.is_finite() or d != d.to_integral_value():
+        return None
+    return int(d)
+
+
+def as_number(value: Any) -> Optional[Number]:
+    """Number for "72", "12.5" or "40%"; ints stay ints."""
+    if isinstance(value, str) and value.strip().endswith("%"):
+        value = value.strip()[:-1]
+    d = _to_decimal(value)
+    if d is None or not d.is_finite():
+        return None
+    return int(d) if d == d.to_integral_value() else float(d)
+
+
+def uint_string(value: Any) -> Optional[str]:
+    """Canonical base-10 digits for a non-negative whole number, else None."""
+    n = as_int(value)
+    if n is None or n < 0:
+        return None
+    return str(n)
+
+
+def rescale_percents(values: List[Number], target: float = 100.0, decimals: int = 2) -> List[Number]:
+    """
+    Scales `values` so they sum to exactly `target` (at `decimals` places);
+    the rounding remainder goes to the largest share.
+    """
+    total = sum(values)
+    scaled = [round(v * target / total, decimals) for v in values]
+    largest = max(range(len(scaled)), key=lambda i: scaled[i])
+    scaled[largest] = round(scaled[largest] + target - sum(scaled), decimals)
+    return [int(v) if float(v).is_integer() else v for v in scaled]
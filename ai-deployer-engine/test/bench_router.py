@@ -0,0 +1,69 @@
+"""
+Micro-benchmark: AgentRouter.route vs the old substring scan.
+
+    PYTHONPATH=. python test/bench_router.py
+
+Prints the cost of one routing decision for both and the agent launches
+that the token-boundary matcher no longer makes.
+"""
+
+import timeit
+from collections import Counter
+
+from app.services import router as r
+
+GOALS = [
+    "Deploy token Foo symbol FOO 18 decimals mint 1000000 to 0xabc",
+    "Register liquidity for token 0xabc",
+    "Create a fungible token and seed an initial liquidity pool",
+    "Repair the failed deployment of my token",
+    "Despliega un token llamado Demo con 12 decimales",
+    "Mint 500 more to the treasury wallet",
+    "Add the pair to the DEX with a starting price",
+    "Impair nothing, just deploy the VFT",
+    "What is the best pricing strategy for my asset?",
+    "Deploy a token for the seeded rounds",
+]
+
+
+def legacy_route(goal):
+    """The substring scan AgentRouter.route used before KeywordMatcher."""
+    g = goal.lower()
+    targets = []
+    wants_vft = any(k in g for k in list(r._VFT_KEYWORDS))
+    wants_liquidity = any(k in g for k in list(r._LIQUIDITY_KEYWORDS))
+    if wants_vft:
+        targets.append("vft_deployer")
+    if wants_liquidity:
+        if "vft_deployer" not in targets:
+            targets.append("vft_deployer")
+        targets.append("liquidity")
+    return targets or ["vft_deployer"]
+
+
+def main():
+    router = r.AgentRouter()
+    n = 5000
+
+    old_s = timeit.timeit(lambda: [legacy_route(g) for g in GOALS], number=n) / (n * len(GOALS))
+    new_s = timeit.timeit(lambda: [router.route(g) for g in GOALS], number=n) / (n * len(GOALS))
+    print(f"route(): substring scan {old_s * 1e6:.1f} us, KeywordMatcher {new_s * 1e6:.1f} us per goal")
+
+    dropped, added = Counter(), Counter()
+    old_total = new_total = 0
+    for goal in GOALS:
+        old, new = set(legacy_route(goal)), set(router.route(goal))
+        old_total += len(old)
+        new_total += len(new)
+        dropped.update(old - new)
+        added.update(new - old)
+        if old != new:
+            print(f"  {goal!r}: -{sorted(old - new)} +{sorted(new - old)}")
+
+    print(f"agent launches over {len(GOALS)} goals: {old_total} -> {new_total}")
+    print(f"  no longer launched: {dict(dropped)}")
+    print(f"  newly launched: {dict(added)}")
+
+
+if __name__ == "__main__":
+    main()
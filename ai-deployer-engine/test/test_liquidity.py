@@ -0,0 +1,37 @@
+import asyncio
+
+from app.services.agent_base import AgentRequest
+from app.services.agents.liquidity import LiquidityAgent, _guess_token_from_context_or_goal
+
+
+def _req(goal, context=None):
+    return AgentRequest(trace_id="t", goal=goal, constraints=[], context=context or {}, artifacts={})
+
+
+def test_known_token_skips_the_model():
+    # No LLM client at all: the fast path must not touch it.
+    resp = asyncio.run(LiquidityAgent(None).run(_req("Register liquidity for token 0xabc")))
+
+    assert resp.result["ok"]
+    assert resp.result["liquidity"] == {"token": "0xabc", "registered_token": None}
+
+
+def test_context_token_wins_over_goal():
+    assert _guess_token_from_context_or_goal(_req("pool 0x01 and 0x02", {"token": "0xbeef"}), unambiguous=True) == "0xbeef"
+
+
+def test_several_addresses_are_ambiguous():
+    assert _guess_token_from_context_or_goal(_req("pool 0x01 against 0x02"), unambiguous=True) is None
+
+
+def test_mint_wallet_is_not_the_token():
+    req = _req("deploy token Foo, mint 1000 to 0xabc, then register liquidity")
+
+    assert _guess_token_from_context_or_goal(req) is None
+
+
+def test_goal_addresses_are_ignored_when_the_deployer_is_upstream():
+    req = _req("register liquidity for 0xabc")
+    req.artifacts["vft_deployer"] = {"ok": True, "vft": {"mint_to": "0xdef", "admins": ["0xdef"]}}
+
+    assert _guess_token_from_context_or_goal(req, unambiguous=True) is None
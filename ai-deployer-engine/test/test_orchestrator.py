@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from app.services.agents.liquidity import LiquidityAgent
+from app.services.agents.vft_deployer import VFTDeployerAgent
+from app.services.llm_client import LLMResult
+from app.services.orchestrator import Orchestrator
+from app.services.router import AgentRouter
+
+
+class _FakeLLM:
+    def __init__(self, payload):
+        self.text = json.dumps(payload)
+        self.calls = 0
+
+    async def acomplete(self, **kwargs) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text=self.text)
+
+    async def forget(self, res: LLMResult) -> None:
+        pass
+
+
+def test_liquidity_runs_after_the_deployer_and_sees_its_artifacts():
+    seen = {}
+    llm = _FakeLLM({"token": "0xfeed", "registered_token": None})
+    liquidity = LiquidityAgent(llm)
+    original = liquidity.run
+
+    async def spy(req):
+        seen.update(req.artifacts)
+        return await original(req)
+
+    liquidity.run = spy
+    agents = {"vft_deployer": VFTDeployerAgent(None), "liquidity": liquidity}
+    orch = Orchestrator(agents, AgentRouter())
+
+    resp = asyncio.run(orch.run(
+        "deploy token Foo symbol FOO 18 decimals mint 1000 to 0xabc, then seed a liquidity pool",
+        {},
+        {},
+        None,
+    ))
+
+    assert resp.targets == ["vft_deployer", "liquidity"]
+    assert seen["vft_deployer"]["vft"]["symbol"] == "FOO"
+    assert [list(s)[0] for s in resp.context["agent_summaries"]] == ["vft_deployer", "liquidity"]
+    # 0xabc is the mint wallet, not the token: the model has to be asked.
+    assert llm.calls == 1
+    assert resp.artifacts["liquidity"]["liquidity"]["token"] == "0xfeed"
@@ -0,0 +1,15 @@
+from app.services.router import AgentRouter
+
+
+def test_liquidity_needs_a_whole_word():
+    router = AgentRouter()
+
+    assert router.route("Repair the failed deployment of my token") == ["vft_deployer"]
+    assert router.route("Add the pair to the DEX") == ["vft_deployer", "liquidity"]
+
+
+def test_plural_and_phrase_keywords():
+    router = AgentRouter()
+
+    assert router.route("seed initial liquidity pools for the tokens") == ["vft_deployer", "liquidity"]
+    assert router.route("hello") == ["vft_deployer"]
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+from app.services.agent_base import AgentRequest
+from app.services.llm_client import LLMResult
+from app.services.agents.vft_deployer import VFTDeployerAgent
+from app.services.vft_spec import extract_vft_spec
+
+
+def test_english_goal_is_fully_extracted():
+    spec = extract_vft_spec("deploy token Foo symbol FOO 18 decimals mint 1000000 to 0xabc12")
+
+    assert spec == {
+        "name": "Foo",
+        "symbol": "FOO",
+        "decimals": 18,
+        "mint_amount": "1000000" + "0" * 18,
+        "mint_to": "0xabc12",
+        "admins": ["0xabc12"],
+    }
+
+
+def test_spanish_goal_with_decimal_comma_and_admin():
+    spec = extract_vft_spec(
+        'Despliega un token llamado "Mi Token", símbolo MTK, 12 decimales, '
+        "acuña 1,5 millones para 0xdef0 con administrador 0xabc1"
+    )
+
+    assert spec["name"] == "Mi Token"
+    assert spec["symbol"] == "MTK"
+    assert spec["mint_amount"] == "15" + "0" * 17
+    assert spec["mint_to"] == "0xdef0"
+    assert spec["admins"] == ["0xabc1"]
+
+
+def test_raw_amounts_are_not_scaled():
+    spec = extract_vft_spec("token Bar (BAR), decimals: 6, mint_amount 5000, mint_to: 0x1111, admins: 0x2222 and 0x3333")
+
+    assert spec["mint_amount"] == "5000"
+    assert spec["admins"] == ["0x2222", "0x3333"]
+
+
+def test_amount_needs_decimals_to_scale():
+    assert "mint_amount" not in extract_vft_spec("mint 1000 tokens to 0xabc")
+
+
+def test_fully_specified_goal_skips_the_model():
+    req = AgentRequest(
+        trace_id="t",
+        goal="create a token called Foo symbol FOO with 9 decimals, mint 2.5M tokens to 0xabc",
+        constraints=[],
+        context={},
+        artifacts={},
+    )
+    resp = asyncio.run(VFTDeployerAgent(None).run(req))
+
+    assert resp.result["ok"]
+    assert resp.result["model"] is None
+    assert resp.result["vft"]["mint_amount"] == "25" + "0" * 14
+
+
+def test_amounts_with_unparsed_suffixes_are_left_to_the_model():
+    assert "mint_amount" not in extract_vft_spec("token Foo, 18 decimals, mint 10^6 to 0xabc")
+    assert "mint_amount" not in extract_vft_spec("token Foo, 18 decimals, mint 10**6 to 0xabc")
+    assert "mint_amount" not in extract_vft_spec("token Foo, 18 decimals, supply 1000000 2025, to 0xabc")
+
+
+def test_single_dot_thousands_group_is_ambiguous():
+    goal = "despliega un token llamado Foo, símbolo FOO, 18 decimales, acuña {} tokens para 0xabc"
+
+    assert "mint_amount" not in extract_vft_spec(goal.format("1.000"))
+    assert extract_vft_spec(goal.format("1.5"))["mint_amount"] == "15" + "0" * 17
+    assert extract_vft_spec(goal.format("1.000.000"))["mint_amount"] == "1" + "0" * 24
+
+
+def test_unquoted_names_must_be_delimited():
+    assert "name" not in extract_vft_spec("deploy a token named My Token symbol MTK")
+    assert extract_vft_spec("deploy a token named MyToken, symbol MTK")["name"] == "MyToken"
+    assert extract_vft_spec('deploy a token named "My Token" symbol MTK')["name"] == "My Token"
+
+
+class _FakeLLM:
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def acomplete(self, **kwargs) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text=self.text)
+
+    async def forget(self, res: LLMResult) -> None:
+        pass
+
+
+def test_model_answer_is_not_overwritten_by_goal_hints():
+    vft = {
+        "admins": ["0xabc"],
+        "name": "My Token",
+        "symbol": "MTK",
+        "decimals": 18,
+        "mint_amount": "1000000" + "0" * 18,
+        "mint_to": "0xabc",
+    }
+    llm = _FakeLLM(json.dumps(vft))
+    req = AgentRequest(
+        trace_id="t",
+        goal="deploy token My symbol MTK, 18 decimals, mint 10^6 tokens to 0xabc",
+        constraints=[],
+        context={},
+        artifacts={},
+    )
+    resp = asyncio.run(VFTDeployerAgent(llm).run(req))
+
+    assert llm.calls == 1
+    assert resp.result["vft"] == vft
+    assert resp.result["hint_mismatches"] == ["name differs from the goal hint 'My'"]
+    assert resp.result["fixups"] == []